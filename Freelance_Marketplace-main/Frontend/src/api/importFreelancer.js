@@ -1,11 +1,27 @@
 import axios from "axios";
 
+// One poll a second: give up after two minutes (the job keeps its place on the server)
+const POLL_INTERVAL_MS = 1000;
+const MAX_POLLS = 120;
+
 export async function importFreelancerRating(username) {
   try {
     const res = await axios.post("/user/import_freelancer_rating", {
       username,
     });
-    return { ok: true, data: res.data };
+    // The import is queued server-side; poll the job until it settles
+    let data = res.data;
+    for (let polls = 0; data.status === "queued" || data.status === "running"; polls++) {
+      if (polls >= MAX_POLLS) {
+        return { ok: false, error: "The import is taking too long. Please try again later." };
+      }
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+      data = (await axios.get(`/user/import_jobs/${res.data.job_id}`)).data;
+    }
+    if (data.status === "failed") {
+      return { ok: false, error: data.error || "Import failed" };
+    }
+    return { ok: true, data };
   } catch (err) {
     return {
       ok: false,
@@ -7,6 +7,10 @@ import ReviewModal from './ReviewModal';
 
 const BIDS_PER_PAGE = 8;
 
+// Cleared once the server turns a stream away (204 from sync workers or a full
+// worker): the page then works without live updates for the rest of the visit.
+let liveUpdates = true;
+
 const AVAILABLE_SKILLS = [
   "Web Development", "App Development", "UI/UX Design", "Python", "Java",
   "React.js", "Node.js", "Data Analysis", "Content Writing", "Digital Marketing",
@@ -56,6 +60,26 @@ export default function ProjectDetailsPage() {
 
   useEffect(() => { fetchProject(); }, [id]);
 
+  // --- LIVE UPDATES (server-sent events instead of refetching) ---
+  useEffect(() => {
+    if (!liveUpdates) return undefined;
+    const source = new EventSource(`${axios.defaults.baseURL}/project/${id}/events`);
+    // Network errors retry (CONNECTING); a 204 or other refusal leaves the source CLOSED
+    source.onerror = () => { if (source.readyState === EventSource.CLOSED) liveUpdates = false; };
+    source.addEventListener('bid', (e) => {
+      const bid = JSON.parse(e.data);
+      setProject(p => p && !(p.bids || []).some(b => b.id === bid.id) ? { ...p, bids: [...(p.bids || []), bid] } : p);
+    });
+    source.addEventListener('status', (e) => {
+      const { project_id, ...changes } = JSON.parse(e.data);
+      setProject(p => p ? { ...p, ...changes } : p);
+    });
+    // Reviews carry nested users; a reset means updates were missed
+    source.addEventListener('review', () => fetchProject());
+    source.addEventListener('reset', () => fetchProject());
+    return () => source.close();
+  }, [id]);
+
   // --- HELPER VARIABLES ---
   const isClient = user && project && (
     (project.client_id && user.id === project.client_id) || 
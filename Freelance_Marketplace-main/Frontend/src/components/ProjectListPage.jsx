@@ -8,35 +8,42 @@ export default function ProjectListPage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   
-  // Pagination State
+  // Pagination State: the server pages by cursor, so keep one per visited page
+  const [cursors, setCursors] = useState([null]);
   const [currentPage, setCurrentPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
   const projectsPerPage = 9;
 
   const navigate = useNavigate();
 
   useEffect(() => {
+    let cancelled = false;
     const fetchProjects = async () => {
       try {
         setLoading(true);
-        const res = await axios.get('/projects');
+        const params = { limit: projectsPerPage };
+        if (cursors[currentPage - 1]) params.cursor = cursors[currentPage - 1];
+        const res = await axios.get('/projects', { params });
+        if (cancelled) return;
         if (Array.isArray(res.data)) {
           setProjects(res.data);
-          } else {
-    // This prevents the "j.map" crash
-      console.error("API Error: Expected array but got:", res.data);
-          setProjects([]); 
-    if (res.data.error) setError(res.data.error);
-}
-        setProjects(res.data);
+        } else {
+          // This prevents the "j.map" crash
+          console.error("API Error: Expected array but got:", res.data);
+          setProjects([]);
+          if (res.data.error) setError(res.data.error);
+        }
+        setNextCursor(res.headers['x-next-cursor'] || null);
       } catch (err) {
         console.error('Failed to fetch projects', err);
         setError('Failed to load projects.');
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
     fetchProjects();
-  }, []);
+    return () => { cancelled = true; };
+  }, [currentPage, cursors]);
 
   // --- HANDLE SEARCH REDIRECT ---
   const handleSearchFocus = (e) => {
@@ -53,12 +60,8 @@ export default function ProjectListPage() {
   };
 
   // Pagination Logic
-  const indexOfLastProject = currentPage * projectsPerPage;
-  const indexOfFirstProject = indexOfLastProject - projectsPerPage;
-  const currentProjects = projects.slice(indexOfFirstProject, indexOfLastProject);
-  const totalPages = Math.ceil(projects.length / projectsPerPage);
-
- const paginate = (pageNumber) => {
+  const paginate = (pageNumber) => {
+    if (pageNumber > cursors.length) setCursors([...cursors, nextCursor]);
     setCurrentPage(pageNumber);
     window.scrollTo({ top: 0, behavior: 'smooth' });
   };
@@ -92,17 +95,17 @@ export default function ProjectListPage() {
 
       {/* --- PROJECT GRID --- */}
       <div className="flex flex-wrap justify-center gap-8">
-        {currentProjects.length === 0 ? (
+        {projects.length === 0 ? (
           <p className="text-gray-300 text-lg">No projects available at the moment.</p>
         ) : (
-          currentProjects.map((project) => (
+          projects.map((project) => (
             <ProjectCard key={project.id} project={project} />
           ))
         )}
       </div>
 
       {/* --- PAGINATION CONTROLS --- */}
-      {projects.length > projectsPerPage && (
+      {(currentPage > 1 || nextCursor) && (
         <div className="flex justify-center mt-12 gap-2">
           <button
             onClick={() => paginate(currentPage - 1)}
@@ -115,26 +118,16 @@ export default function ProjectListPage() {
           >
             Prev
           </button>
-          
-          {[...Array(totalPages)].map((_, index) => (
-             <button
-               key={index}
-               onClick={() => paginate(index + 1)}
-               className={`px-4 py-2 rounded font-medium transition-colors ${
-                 currentPage === index + 1 
-                   ? 'bg-green-600 text-white shadow-md' 
-                   : 'bg-white text-gray-700 hover:bg-gray-100'
-               }`}
-             >
-               {index + 1}
-             </button>
-          ))}
+
+          <span className="px-4 py-2 rounded font-medium bg-green-600 text-white shadow-md">
+            {currentPage}
+          </span>
 
           <button
             onClick={() => paginate(currentPage + 1)}
-            disabled={currentPage === totalPages}
+            disabled={!nextCursor}
             className={`px-4 py-2 rounded font-medium transition-colors ${
-                currentPage === totalPages 
+                !nextCursor 
                 ? 'bg-white/10 text-gray-400 cursor-not-allowed' 
                 : 'bg-white text-green-800 hover:bg-gray-100'
             }`}
@@ -5,67 +5,66 @@ import { useLocation } from 'react-router-dom';
 
 export default function SearchPage() {
   // Data States
-  const [projects, setProjects] = useState([]); // All loaded projects
-  const [filteredProjects, setFilteredProjects] = useState([]); // Matched results
+  const [results, setResults] = useState([]); // Current page of matches
   const [searchTerm, setSearchTerm] = useState('');
-  const [loading, setLoading] = useState(true);
-  
-  // Pagination States
+  const [loading, setLoading] = useState(false);
+
+  // Pagination States: the server pages by cursor, so keep one per visited page
+  const [cursors, setCursors] = useState([null]);
   const [currentPage, setCurrentPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
   const projectsPerPage = 9;
 
   const location = useLocation();
 
-  // 1. Initial Fetch
   useEffect(() => {
     if (location.state && location.state.initialQuery) {
       setSearchTerm(location.state.initialQuery);
     }
-
-    const fetchProjects = async () => {
-      try {
-        const res = await axios.get('/projects');
-        setProjects(res.data);
-        // We do NOT set filteredProjects here initially, 
-        // because we want "No results" if search is empty.
-      } catch (err) {
-        console.error('Failed to fetch projects', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchProjects();
   }, [location.state]);
 
-  // 2. Search & Filter Logic
+  // 1. New search term: back to page 1
+  useEffect(() => {
+    setCursors([null]);
+    setCurrentPage(1);
+  }, [searchTerm]);
+
+  // 2. Fetch the current page from the full-text search endpoint (debounced while typing)
   useEffect(() => {
-    const term = searchTerm.toLowerCase().trim();
+    const term = searchTerm.trim();
 
     // Requirement: Ensure no results appear when nothing is searched
     if (!term) {
-      setFilteredProjects([]);
+      setResults([]);
+      setNextCursor(null);
       return;
     }
 
-    const results = projects.filter(project => {
-      return (
-        project.title.toLowerCase().includes(term) ||
-        project.description.toLowerCase().includes(term) ||
-        (project.required_skills && project.required_skills.toLowerCase().includes(term))
-      );
-    });
-
-    setFilteredProjects(results);
-    setCurrentPage(1); // Reset to page 1 on new search
-  }, [searchTerm, projects]);
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      setLoading(true);
+      try {
+        const params = { q: term, limit: projectsPerPage };
+        if (cursors[currentPage - 1]) params.cursor = cursors[currentPage - 1];
+        const res = await axios.get('/projects/search', { params });
+        if (cancelled) return;
+        setResults(res.data);
+        setNextCursor(res.headers['x-next-cursor'] || null);
+      } catch (err) {
+        console.error('Search failed', err);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm, currentPage, cursors]);
 
   // 3. Pagination Logic
-  const indexOfLastProject = currentPage * projectsPerPage;
-  const indexOfFirstProject = indexOfLastProject - projectsPerPage;
-  const currentProjects = filteredProjects.slice(indexOfFirstProject, indexOfLastProject);
-  const totalPages = Math.ceil(filteredProjects.length / projectsPerPage);
-
   const paginate = (pageNumber) => {
+    if (pageNumber > cursors.length) setCursors([...cursors, nextCursor]);
     setCurrentPage(pageNumber);
     window.scrollTo({ top: 0, behavior: 'smooth' });
   };
@@ -97,21 +96,21 @@ export default function SearchPage() {
 
       {/* --- Results Section --- */}
       <div className="container mx-auto py-12 px-4">
-        {loading ? (
-          <div className="text-center text-white mt-10">Loading projects...</div>
+        {loading && results.length === 0 ? (
+          <div className="text-center text-white mt-10">Searching projects...</div>
         ) : (
           <>
             {/* Result Count */}
             {searchTerm && (
               <p className="mb-6 text-gray-200 font-medium pl-4">
-                Found {filteredProjects.length} result{filteredProjects.length !== 1 && 's'} for "{searchTerm}"
+                {results.length > 0 ? `Best matches for "${searchTerm}"` : `No results for "${searchTerm}"`}
               </p>
             )}
             
             {/* Grid */}
             <div className="flex flex-wrap justify-center gap-8">
-              {currentProjects.length > 0 ? (
-                currentProjects.map((project) => (
+              {results.length > 0 ? (
+                results.map((project) => (
                   <ProjectCard key={project.id} project={project} />
                 ))
               ) : (
@@ -131,7 +130,7 @@ export default function SearchPage() {
             </div>
 
             {/* --- PAGINATION CONTROLS --- */}
-            {filteredProjects.length > projectsPerPage && (
+            {(currentPage > 1 || nextCursor) && (
               <div className="flex justify-center mt-16 gap-2">
                 <button
                   onClick={() => paginate(currentPage - 1)}
@@ -144,26 +143,16 @@ export default function SearchPage() {
                 >
                   Prev
                 </button>
-                
-                {[...Array(totalPages)].map((_, index) => (
-                  <button
-                    key={index}
-                    onClick={() => paginate(index + 1)}
-                    className={`px-4 py-2 rounded font-medium transition-colors ${
-                      currentPage === index + 1 
-                        ? 'bg-green-600 text-white shadow-md' 
-                        : 'bg-white text-gray-700 hover:bg-gray-100'
-                    }`}
-                  >
-                    {index + 1}
-                  </button>
-                ))}
+
+                <span className="px-4 py-2 rounded font-medium bg-green-600 text-white shadow-md">
+                  {currentPage}
+                </span>
 
                 <button
                   onClick={() => paginate(currentPage + 1)}
-                  disabled={currentPage === totalPages}
+                  disabled={!nextCursor}
                   className={`px-4 py-2 rounded font-medium transition-colors ${
-                      currentPage === totalPages 
+                      !nextCursor 
                       ? 'bg-white/10 text-gray-400 cursor-not-allowed' 
                       : 'bg-white text-green-800 hover:bg-gray-100'
                   }`}
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import axios from 'axios';
 import { useParams, Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext.jsx';
+import { importFreelancerRating } from '../api/importFreelancer';
 
 const AVAILABLE_SKILLS = [
   "Web Development", "App Development", "UI/UX Design", "Python", "Java",
@@ -27,6 +28,9 @@ export default function UserProfilePage() {
   const [freelancerImportName, setFreelancerImportName] = useState("");
   const [importStatus, setImportStatus] = useState(null);
 
+  // History lists arrive a page at a time: 'projects' | 'reviews' while the next page loads
+  const [loadingMore, setLoadingMore] = useState(null);
+
   // Compulsory Setup Flag
   const [isSetupRequired, setIsSetupRequired] = useState(false);
 
@@ -74,6 +78,38 @@ export default function UserProfilePage() {
 
   // --- Handlers ---
 
+  // Appends the next page of one history list; next_cursors says where each list continues
+  const loadMore = async (kind) => {
+    const listKey = kind === 'reviews' ? 'reviews_received' : profile.is_freelancer ? 'accepted_projects' : 'posted_projects';
+    setLoadingMore(kind);
+    try {
+      const res = await axios.get(`/user/${id}`, { params: { [`${kind}_cursor`]: profile.next_cursors[kind] } });
+      setProfile(prev => ({
+        ...prev,
+        [listKey]: [...(prev[listKey] || []), ...(res.data[listKey] || [])],
+        next_cursors: { ...prev.next_cursors, [kind]: res.data.next_cursors?.[kind] || null }
+      }));
+    } catch (err) {
+      console.error('Error loading more:', err);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const loadMoreButton = (kind) => profile.next_cursors?.[kind] && (
+    <div className="flex justify-center mt-6">
+      <button
+        onClick={() => loadMore(kind)}
+        disabled={loadingMore === kind}
+        className={`px-5 py-2 rounded-lg font-medium transition-colors ${
+          loadingMore === kind ? 'bg-gray-200 text-gray-500 cursor-not-allowed' : 'bg-indigo-600 text-white hover:bg-indigo-700'
+        }`}
+      >
+        {loadingMore === kind ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
+
   const handleSkillToggle = (skill) => {
     setSelectedSkills(prev => {
       if (prev.includes(skill)) return prev.filter(s => s !== skill);
@@ -99,23 +135,21 @@ export default function UserProfilePage() {
   const handleImportSubmit = async () => {
     if (!freelancerImportName.trim()) return;
     setImportStatus("Loading...");
-    try {
-      const res = await axios.post('/user/import_freelancer_rating', {
-        username: freelancerImportName.trim()
-      });
-      const data = res.data;
-      // Update local state immediately to lock the button
-      setProfile((prev) => ({ 
-        ...prev, 
-        avg_rating: data.rating, 
-        freelancer_username: freelancerImportName.trim(), 
-        external_reviews_count: data.reviews 
-      }));
-      setImportStatus(null);
-    } catch (err) {
-      const errorMsg = err.response?.data?.error || "Failed to import.";
-      setImportStatus("❌ " + errorMsg);
+    // Import runs as a background job; the helper polls it (a bounded number of times)
+    const result = await importFreelancerRating(freelancerImportName.trim());
+    if (!result.ok) {
+      setImportStatus("❌ " + (result.error || "Failed to import."));
+      return;
     }
+    const data = result.data;
+    // Update local state immediately to lock the button
+    setProfile((prev) => ({ 
+      ...prev, 
+      avg_rating: data.rating, 
+      freelancer_username: freelancerImportName.trim(), 
+      external_reviews_count: data.reviews 
+    }));
+    setImportStatus(null);
   };
 
   if (loading) return <div className="container mx-auto py-8 px-4 text-center">Loading profile...</div>;
@@ -359,6 +393,7 @@ export default function UserProfilePage() {
                 </div>
               )}
             </div>
+            {loadMoreButton('projects')}
           </div>
         </>
       )}
@@ -411,6 +446,7 @@ export default function UserProfilePage() {
               </div>
             )}
           </div>
+          {loadMoreButton('projects')}
         </div>
       )}
 
@@ -446,6 +482,7 @@ export default function UserProfilePage() {
               </div>
             )}
           </div>
+          {loadMoreButton('reviews')}
         </div>
       )}
 
@@ -1,3 +1,4 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
@@ -5,6 +6,9 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
 from sqlalchemy import MetaData
+from app.cache import RankingCache
+from app.db_pool import PoolMonitor, engine_options, dispose_after_fork, use_green_driver
+from app.instrumentation import Instrumentation
 
 # --- FIX: Define Naming Convention ---
 # This ensures all constraints (Foreign Keys, etc.) have explicit names,
@@ -24,6 +28,9 @@ db = SQLAlchemy(metadata=metadata)
 ma = Marshmallow()
 jwt = JWTManager()
 cors = CORS()
+ranking_cache = RankingCache()
+pool_monitor = PoolMonitor()
+request_metrics = Instrumentation()
 
 def create_app(config_class=Config):
     """
@@ -34,30 +41,149 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
 
     # Initialize extensions with the app
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
     db.init_app(app)
+    pool_monitor.init_app(app)
+    request_metrics.init_app(app)
     ma.init_app(app)
     jwt.init_app(app)
+    ranking_cache.init_app(app)
     
     # Enable CORS for the React frontend
     # Allow any origin during development
-    cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
+    cors.init_app(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor"])
+
+    # Token claims + identity cache (app/auth.py)
+    from app.auth import token_auth
+    token_auth.init_app(app)
+
+    # Server-sent events (app/events.py)
+    from app.events import event_broker
+    event_broker.init_app(app)
+
+    # Background import workers (threads start lazily on first job)
+    from app.jobs import import_queue
+    import_queue.init_app(app)
 
     # Import and register blueprints
     from app.routes import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
 
     # --- AUTO-INITIALIZE DATABASE ---
+    # Development convenience. Production sets DB_AUTO_UPGRADE=false and runs
+    # `flask upgrade-db` once per release, so booting a worker costs no
+    # schema introspection.
+    if app.config.get("DB_AUTO_UPGRADE", True):
+        with app.app_context():
+            from app.migrations import upgrade
+            upgrade()
+            print("Database tables checked/created.")
+
+    # gunicorn --preload forks workers from this process: don't let them share its connections
     with app.app_context():
-        from app import models
-        db.create_all()
-        print("Database tables checked/created.")
+        dispose_after_fork(db.engine)
+        # SERVER_MODE (see gunicorn.conf.py): under gevent the DB driver has to yield while it waits
+        if app.config.get("SERVER_MODE") == "gevent": use_green_driver(db.engine)
 
     # Add a CLI command
     @app.cli.command("init-db")
     def init_db_command():
+        # create_all, then the steps it can't do (search index, migrations' DDL), so
+        # a fresh database ends up with the same schema as an upgraded one
+        from app.migrations import upgrade
         with app.app_context():
-            from app import models
-            db.create_all()
+            upgrade()
         print("Initialized the database.")
 
+    @app.cli.command("upgrade-db")
+    def upgrade_db_command():
+        """Create missing tables and add columns introduced since the DB was created."""
+        from app.migrations import upgrade
+        applied = upgrade()
+        print(f"Applied {len(applied)} schema change(s): {', '.join(applied) or 'none'}")
+
+    @app.cli.command("run-import-jobs")
+    def run_import_jobs_command():
+        """Run queued external-profile imports that are due (e.g. after a restart)."""
+        from app.jobs import import_queue
+        print(f"Ran {import_queue.run_due()} import job(s).")
+
+    @app.cli.command("refresh-external-ratings")
+    @click.option("--ttl-hours", default=24.0, show_default=True, help="Refresh profiles last checked longer ago than this.")
+    @click.option("--concurrency", default=16, show_default=True, help="Parallel fetches.")
+    @click.option("--per-host-rps", default=10.0, show_default=True, help="Max requests per second to one host (0 = unlimited).")
+    @click.option("--batch-size", default=500, show_default=True, help="Rows per write-back transaction.")
+    @click.option("--limit", type=int, default=None, help="Refresh at most this many profiles.")
+    def refresh_external_ratings_command(ttl_hours, concurrency, per_host_rps, batch_size, limit):
+        """Re-fetch stale external profile ratings (conditional GETs, bounded concurrency)."""
+        from datetime import timedelta
+        from app.external.refresh import refresh_stale_profiles
+        stats = refresh_stale_profiles(timedelta(hours=ttl_hours), concurrency, per_host_rps, batch_size,
+                                       app.config["FREELANCER_PROFILE_URL"], limit)
+        print(f"Refreshed {stats['refreshed']}, unchanged {stats['not_modified']}, failed {stats['failed']} "
+              f"of {stats['stale']} stale profiles in {stats['seconds']}s.")
+
+    @app.cli.command("recompute-ratings")
+    def recompute_ratings_command():
+        """Rebuild every user's review counters and avg_rating from the review table."""
+        from app.ratings import recompute_all_ratings
+        from app.freelancer_stats import rebuild_freelancer_stats
+        updated = recompute_all_ratings()
+        rebuild_freelancer_stats()  # materialized from the ratings
+        print(f"Recomputed ratings for {updated} users.")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        """Re-fill the SQLite full-text index from the project table (Postgres maintains its own)."""
+        from app.search import rebuild_search_index
+        indexed = rebuild_search_index()
+        print("The database maintains this index itself; nothing to rebuild." if indexed is None
+              else f"Indexed {indexed} projects.")
+
+    @app.cli.command("rebuild-recommendations")
+    def rebuild_recommendations_command():
+        """Rebuild the open-project skill index used by /api/recommendations."""
+        from app.recommendations import rebuild_open_project_index
+        print(f"Indexed {rebuild_open_project_index()} open project skill postings.")
+
+    @app.cli.command("rebuild-freelancer-stats")
+    def rebuild_freelancer_stats_command():
+        """Rebuild freelancer_stats and the per-skill leaderboard from the user counters."""
+        from app.freelancer_stats import rebuild_freelancer_stats
+        print(f"Rebuilt stats for {rebuild_freelancer_stats()} freelancers.")
+
+    @app.cli.command("import-data")
+    @click.argument("kind", type=click.Choice(["projects", "bids"]))
+    @click.argument("source", type=click.File("r", encoding="utf-8"))
+    @click.option("--user-id", type=int, default=None, help="Owner of every row (default: each row's client_id / freelancer_id).")
+    @click.option("--chunk-size", type=int, default=None, help="Rows per transaction (default: BULK_CHUNK_SIZE).")
+    def import_data_command(kind, source, user_id, chunk_size):
+        """Bulk-load projects or bids from a JSON array or NDJSON file ('-' for stdin)."""
+        import time
+        from app.bulk import parse_rows, create_projects, place_bids
+        text = source.read()
+        try:
+            rows = parse_rows(text, ndjson=not text.lstrip().startswith("["))
+        except ValueError as e:
+            raise click.ClickException(f"Could not parse {source.name}: {e}")
+        started = time.perf_counter()
+        load = create_projects if kind == "projects" else place_bids
+        summary = load(rows, user_id, chunk_size or app.config["BULK_CHUNK_SIZE"])
+        seconds = time.perf_counter() - started
+        for result in summary["results"]:
+            if "error" in result: print(f"row {result['row']}: {result['error']}")
+        print(f"Imported {summary['created']} {kind}, {summary['failed']} failed, in {seconds:.2f}s "
+              f"({len(rows) / seconds if seconds else 0:.0f} rows/s).")
+
+    @app.cli.command("backfill-skills")
+    def backfill_skills_command():
+        """Populate skill tag tables from the legacy comma-separated columns."""
+        from app.skills import backfill_skill_tags
+        from app.recommendations import rebuild_open_project_index
+        from app.freelancer_stats import rebuild_freelancer_stats
+        projects, users, skills = backfill_skill_tags()
+        rebuild_open_project_index()  # postings are derived from the project tags
+        rebuild_freelancer_stats()  # and the leaderboard postings from the user tags
+        print(f"Tagged {projects} projects and {users} users with {skills} skills.")
+
     return app
\ No newline at end of file
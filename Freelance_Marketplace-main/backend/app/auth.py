@@ -0,0 +1,117 @@
+# app/auth.py
+
+import threading
+import time
+from collections import namedtuple
+
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
+from werkzeug.security import check_password_hash
+
+from app import db, jwt
+from app.cache import LRUCache
+from app.models import User
+
+# Access tokens carry the caller's role and auth_version as claims
+# ("role", "ver"), so routes that only authorize (ownership, client vs
+# freelancer) read the verified token instead of loading the User row; see
+# current_identity(). Every protected request still checks the token's
+# auth_version against the user's current one through a TTL'd LRU of
+# identities: a password change bumps auth_version and so revokes older
+# tokens. The cache is per process. The process that made the change drops
+# its entry at once, other workers within IDENTITY_CACHE_TTL seconds.
+
+Identity = namedtuple("Identity", "id is_freelancer auth_version")
+
+
+class LoginBusy(Exception):
+    """Every password-hash slot stayed taken for LOGIN_HASH_WAIT seconds."""
+
+
+class TokenAuth:
+    def __init__(self, app=None):
+        self.cache = LRUCache()
+        self.ttl = 60
+        self._hash_slots = threading.BoundedSemaphore(2)
+        self._reset_stats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.cache = LRUCache(app.config.get("IDENTITY_CACHE_SIZE", 10000))
+        self.ttl = app.config.get("IDENTITY_CACHE_TTL", 60)
+        # Password hashing is deliberately slow (~0.1s of CPU per scrypt
+        # check): cap concurrent checks so a login burst can't starve the
+        # other requests on this worker
+        self._hash_slots = threading.BoundedSemaphore(app.config.get("LOGIN_HASH_CONCURRENCY", 2))
+        self.hash_wait = app.config.get("LOGIN_HASH_WAIT", 5.0)
+        self.hash_method = app.config.get("PASSWORD_HASH_METHOD")
+        self._reset_stats()
+        jwt.token_in_blocklist_loader(self._revoked)
+        app.extensions["token_auth"] = self
+
+    def _reset_stats(self):
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "revoked": 0}
+
+    # --- tokens ---
+
+    @staticmethod
+    def issue_token(user):
+        claims = {"role": "freelancer" if user.is_freelancer else "client", "ver": user.auth_version or 0}
+        return create_access_token(identity=str(user.id), additional_claims=claims)
+
+    def _revoked(self, jwt_header, jwt_payload):
+        identity = self.lookup(int(jwt_payload["sub"]))
+        # Tokens from before the "ver" claim stay valid until they expire
+        revoked = identity is None or jwt_payload.get("ver", identity.auth_version) != identity.auth_version
+        if revoked: self._stats["revoked"] += 1
+        return revoked
+
+    def current_identity(self):
+        """The caller, from the verified token's claims (or the cache for older tokens); no query."""
+        claims = get_jwt()
+        if "role" not in claims:
+            return self.lookup(int(get_jwt_identity()))
+        return Identity(int(get_jwt_identity()), claims["role"] == "freelancer", claims["ver"])
+
+    # --- identity cache ---
+
+    def lookup(self, user_id):
+        """Identity for `user_id`, or None if there is no such user. At most one indexed query, then cached."""
+        entry = self.cache.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self._stats["hits"] += 1
+            return entry[0]
+        self._stats["misses"] += 1
+        row = db.session.execute(db.select(User.id, User.is_freelancer, User.auth_version).where(User.id == user_id)).first()
+        identity = Identity(row.id, row.is_freelancer, row.auth_version) if row else None
+        self.cache.set(user_id, (identity, time.monotonic() + self.ttl))
+        return identity
+
+    def invalidate(self, user_id):
+        self._stats["invalidations"] += 1
+        self.cache.delete(user_id)
+
+    def stats(self):
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["size"] = len(self.cache)
+        stats["maxsize"] = self.cache.maxsize
+        return stats
+
+    # --- passwords ---
+
+    def check_password(self, user, password):
+        """check_password_hash within the concurrency cap; raises LoginBusy if no slot frees up in time."""
+        if not self._hash_slots.acquire(timeout=self.hash_wait): raise LoginBusy()
+        try:
+            return check_password_hash(user.password_hash, password)
+        finally:
+            self._hash_slots.release()
+
+    def needs_rehash(self, user):
+        """True when the stored hash wasn't made with PASSWORD_HASH_METHOD (e.g. after tuning its cost)."""
+        return bool(self.hash_method) and user.password_hash.split("$", 1)[0] != self.hash_method
+
+
+token_auth = TokenAuth()
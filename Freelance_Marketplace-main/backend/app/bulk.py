@@ -0,0 +1,242 @@
+# app/bulk.py
+
+import json
+from datetime import datetime
+from numbers import Number
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import User, Project, Bid, project_skill
+from app.skills import parse_skills, skill_ids_by_name
+from app.search import index_projects
+from app.recommendations import index_open_projects
+from app.ranking_logic import invalidate_rankings
+from app.http_cache import bump_versions
+from app.events import bid_added
+
+# Batch writers behind POST /api/projects/batch, /api/bids/batch and the
+# import-data CLI. A batch is validated up front, the existence and role
+# rules run as a few set-based queries for the whole batch, and valid rows
+# are inserted with executemany in chunks of `chunk_size`, one transaction
+# per chunk. Every input row gets a result: {"row": i, "id": ...} or
+# {"row": i, "error": ...}, in input order.
+
+MAX_TITLE_LENGTH = Project.title.type.length
+
+
+class InvalidRow:
+    """Stands in for an NDJSON line that isn't valid JSON, so its row index is kept."""
+    def __init__(self, message):
+        self.message = message
+
+
+def parse_rows(text, ndjson=False):
+    """
+    A JSON array, or one JSON value per line (blank lines skipped).
+    Returns: list of rows (InvalidRow for unparseable NDJSON lines)
+    Raises: ValueError when a JSON body isn't an array of rows
+    """
+    if not ndjson:
+        rows = json.loads(text)
+        if not isinstance(rows, list): raise ValueError("Expected a JSON array")
+        return rows
+    rows = []
+    for line in text.splitlines():
+        if not line.strip(): continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError as e:
+            rows.append(InvalidRow(f"Invalid JSON: {e}"))
+    return rows
+
+
+def _number(value):
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+def _integer(value):
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit(): return int(value)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _text(value):
+    return isinstance(value, str) and bool(value.strip())
+
+
+def validate_project(row, owner_id=None):
+    """Returns: (insert values, None) or (None, error message)"""
+    if isinstance(row, InvalidRow): return None, row.message
+    if not isinstance(row, dict): return None, "Expected a JSON object"
+    if not _text(row.get("title")): return None, "title is required"
+    if len(row["title"]) > MAX_TITLE_LENGTH: return None, f"title is longer than {MAX_TITLE_LENGTH} characters"
+    if not _text(row.get("description")): return None, "description is required"
+    if not _number(row.get("budget")) or row["budget"] <= 0: return None, "budget must be a positive number"
+    deadline = _integer(row.get("deadline_days", 7))
+    if deadline is None: return None, "deadline_days must be an integer"
+    if deadline < 2: return None, "Minimum 2 days required"
+    skills = row.get("required_skills")
+    if skills is not None and not isinstance(skills, str): return None, "required_skills must be a comma-separated string"
+    client_id = owner_id if owner_id is not None else _integer(row.get("client_id"))
+    if client_id is None: return None, "client_id is required"
+    return {"title": row["title"], "description": row["description"], "budget": row["budget"], "status": "open",
+            "client_id": client_id, "required_skills": skills, "deadline_days": deadline}, None
+
+
+def validate_bid(row, owner_id=None):
+    """Returns: (insert values, None) or (None, error message)"""
+    if isinstance(row, InvalidRow): return None, row.message
+    if not isinstance(row, dict): return None, "Expected a JSON object"
+    project_id = _integer(row.get("project_id"))
+    if project_id is None: return None, "project_id is required"
+    if not _number(row.get("amount")) or row["amount"] <= 0: return None, "amount must be a positive number"
+    if not _text(row.get("proposal")): return None, "proposal is required"
+    timeline = row.get("proposed_timeline_days")
+    if timeline is not None:
+        timeline = _integer(timeline)
+        if timeline is None or timeline < 1: return None, "proposed_timeline_days must be a positive integer"
+    freelancer_id = owner_id if owner_id is not None else _integer(row.get("freelancer_id"))
+    if freelancer_id is None: return None, "freelancer_id is required"
+    return {"project_id": project_id, "freelancer_id": freelancer_id, "amount": row["amount"],
+            "proposal": row["proposal"], "proposed_timeline_days": timeline}, None
+
+
+def _validate(rows, validator, owner_id):
+    results, valid = [None] * len(rows), []
+    for i, row in enumerate(rows):
+        values, error = validator(row, owner_id)
+        if error: results[i] = {"row": i, "error": error}
+        else: valid.append((i, values))
+    return results, valid
+
+
+def _check_roles(valid, results, key, freelancer, message):
+    """Drops rows whose owner is unknown or has the wrong role (one query). Returns the remaining rows."""
+    owners = {values[key] for _, values in valid}
+    roles = dict(db.session.execute(db.select(User.id, User.is_freelancer).where(User.id.in_(owners))).all()) if owners else {}
+    kept = []
+    for i, values in valid:
+        role = roles.get(values[key])
+        if role is None: results[i] = {"row": i, "error": "Unknown user"}
+        elif role != freelancer: results[i] = {"row": i, "error": message}
+        else: kept.append((i, values))
+    return kept
+
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _insert(model, chunk):
+    """
+    executemany INSERT ... RETURNING id. Postgres batches it into multi-row
+    INSERTs; SQLite has no ordering sentinel, so SQLAlchemy runs it row by
+    row, still in-process and inside the chunk's one transaction.
+    Returns: ids in `chunk` order
+    """
+    stmt = db.insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.session.scalars(stmt, [values for _, values in chunk]))
+
+
+def summarize(results):
+    created = sum(1 for r in results if "id" in r)
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
+def create_projects(rows, owner_id=None, chunk_size=500):
+    """
+    Posts a batch of projects. `owner_id` (the API caller) overrides any
+    client_id in the rows; the importer leaves it None and takes theirs.
+    Returns: summarize() dict
+    """
+    results, valid = _validate(rows, validate_project, owner_id)
+    valid = _check_roles(valid, results, "client_id", False, "Only clients can post")
+
+    tags = {i: parse_skills(values["required_skills"]) for i, values in valid}
+    skill_ids = skill_ids_by_name(name for names in tags.values() for name in names)
+    db.session.commit()
+
+    for chunk in _chunks(valid, chunk_size):
+        ids = _insert(Project, chunk)
+        pairs = [{"project_id": pid, "skill_id": skill_ids[name]} for (i, _), pid in zip(chunk, ids) for name in tags[i]]
+        if pairs: db.session.execute(project_skill.insert(), pairs)
+        index_projects(ids)
+        index_open_projects(ids)
+        bump_versions(user_ids={values["client_id"] for _, values in chunk})  # clients' posted projects
+        db.session.commit()
+        for (i, _), pid in zip(chunk, ids):
+            results[i] = {"row": i, "id": pid}
+    return summarize(results)
+
+
+def _existing_bids(pairs):
+    """The (project_id, freelancer_id) pairs that already have a bid (one query)."""
+    if not pairs: return set()
+    found = db.session.execute(
+        db.select(Bid.project_id, Bid.freelancer_id)
+        .where(Bid.project_id.in_({p for p, _ in pairs}), Bid.freelancer_id.in_({f for _, f in pairs}))
+    ).all()
+    return {tuple(row) for row in found} & pairs
+
+
+def _commit_bids(chunk, results, clients):
+    """
+    Inserts one chunk in its own transaction, dropping rows a concurrent
+    request beat us to, then publishes a bid event per inserted row.
+    """
+    now = datetime.utcnow()
+    for _, values in chunk: values["created_at"] = now  # the column default, set here so the events carry it
+    while chunk:
+        try:
+            ids = _insert(Bid, chunk)
+            invalidate_rankings(project_ids={values["project_id"] for _, values in chunk})
+            bump_versions({values["project_id"] for _, values in chunk})
+            db.session.commit()
+        except IntegrityError:  # lost a race on uq_bid_project_id_freelancer_id
+            db.session.rollback()
+            raced = _existing_bids({(values["project_id"], values["freelancer_id"]) for _, values in chunk})
+            if not raced: raise
+            for i, values in chunk:
+                if (values["project_id"], values["freelancer_id"]) in raced:
+                    results[i] = {"row": i, "error": "Already bid"}
+            chunk = [(i, values) for i, values in chunk if results[i] is None]
+            continue
+        for (i, _), bid_id in zip(chunk, ids):
+            results[i] = {"row": i, "id": bid_id}
+        freelancer_ids = {values["freelancer_id"] for _, values in chunk}
+        freelancers = {row.id: row for row in db.session.execute(
+            db.select(User.id, User.username, User.avg_rating).where(User.id.in_(freelancer_ids)))}
+        for (_, values), bid_id in zip(chunk, ids):
+            bid_added(dict(values, id=bid_id), freelancers[values["freelancer_id"]], clients[values["project_id"]])
+        return
+
+
+def place_bids(rows, owner_id=None, chunk_size=500):
+    """
+    Places a batch of bids with place_bid's rules: freelancers only, open
+    projects only, one bid per freelancer per project. `owner_id` as for
+    create_projects.
+    Returns: summarize() dict
+    """
+    results, valid = _validate(rows, validate_bid, owner_id)
+    valid = _check_roles(valid, results, "freelancer_id", True, "Only freelancers can bid")
+
+    project_ids = {values["project_id"] for _, values in valid}
+    projects = db.session.execute(db.select(Project.id, Project.status, Project.client_id).where(Project.id.in_(project_ids))).all() if project_ids else []
+    status = {row.id: row.status for row in projects}
+    clients = {row.id: row.client_id for row in projects}
+    existing = _existing_bids({(values["project_id"], values["freelancer_id"]) for _, values in valid})
+    kept, seen = [], set()
+    for i, values in valid:
+        pair = (values["project_id"], values["freelancer_id"])
+        if pair[0] not in status: results[i] = {"row": i, "error": "Project not found"}
+        elif status[pair[0]] != 'open': results[i] = {"row": i, "error": "Project not open"}
+        elif pair in existing or pair in seen: results[i] = {"row": i, "error": "Already bid"}
+        else:
+            seen.add(pair)
+            kept.append((i, values))
+
+    for chunk in _chunks(kept, chunk_size):
+        _commit_bids(chunk, results, clients)
+    return summarize(results)
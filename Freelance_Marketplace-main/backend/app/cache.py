@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded, thread-safe in-process tier."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data: return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LocalSharedCache:
+    """In-memory stand-in for the shared tier, with the same TTL semantics."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None: return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisSharedCache:
+    """Shared tier across workers/nodes. Needs the optional `redis` package."""
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=ttl)
+
+    def clear(self):
+        pass  # keys expire via TTL; never flush a shared instance
+
+
+class RankingCache:
+    """
+    Two-tier cache for serialized /rank_bids responses.
+    Keys embed Project.ranking_version, so invalidation is a version bump in
+    the database and stale entries simply stop being read (and age out).
+
+    RANKING_CACHE_URL: unset = local LRU only, "local" = in-memory shared
+    stand-in, anything else = redis URL.
+    """
+
+    def __init__(self, app=None):
+        self.local = LRUCache()
+        self.shared = None
+        self.ttl = 3600
+        self.enabled = True
+        self._lock = threading.Lock()  # guards _stats: gthread workers serve requests concurrently
+        self._reset_stats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RANKING_CACHE_ENABLED", True)
+        self.local = LRUCache(app.config.get("RANKING_CACHE_SIZE", 1024))
+        self.ttl = app.config.get("RANKING_CACHE_TTL", 3600)
+        url = app.config.get("RANKING_CACHE_URL")
+        if url == "local":
+            self.shared = LocalSharedCache()
+        elif url:
+            self.shared = RedisSharedCache(url)
+        else:
+            self.shared = None
+        self._reset_stats()
+        app.extensions["ranking_cache"] = self
+
+    def _reset_stats(self):
+        with self._lock:
+            self._stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "sets": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def make_key(project_id, version, priority, top_k=None):
+        return f"rank:{project_id}:{version}:{priority}:{top_k or 'all'}"
+
+    def get(self, key):
+        if not self.enabled: return None
+        value = self.local.get(key)
+        if value is not None:
+            self._count("local_hits")
+            return value
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self._count("shared_hits")
+                self.local.set(key, value)
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        if not self.enabled: return
+        self._count("sets")
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None: self.shared.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        stats["local_size"] = len(self.local)
+        stats["local_maxsize"] = self.local.maxsize
+        stats["local_evictions"] = self.local.evictions
+        stats["shared_tier"] = type(self.shared).__name__ if self.shared is not None else None
+        return stats
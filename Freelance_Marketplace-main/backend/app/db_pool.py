@@ -0,0 +1,221 @@
+# app/db_pool.py
+
+import logging
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool, NullPool
+
+# Engine configuration from the DB_* settings in config.py, and per-process
+# pool metrics for GET /api/metrics/db_pool. Under gunicorn every worker has
+# its own pool, so each worker reports its own numbers (see "pid").
+
+logger = logging.getLogger(__name__)
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class _TimedCheckout:
+    """Pool mixin timing how long each checkout waits for a connection."""
+    monitor = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            if self.monitor: self.monitor.record_timeout()
+            raise
+        finally:
+            if self.monitor: self.monitor.record_wait(time.perf_counter() - start)
+
+    def recreate(self):  # engine.dispose() swaps in a fresh pool
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for `config`'s database. Anything already in
+    SQLALCHEMY_ENGINE_OPTIONS wins. In-memory SQLite is left to
+    Flask-SQLAlchemy's single shared connection.
+    """
+    options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    if config.get("DB_POOL") == "null":
+        # No app-side pool: each checkout opens a connection, e.g. to a local
+        # PgBouncer in transaction mode that does the pooling
+        options.setdefault("poolclass", TimedNullPool)
+    else:
+        options.setdefault("poolclass", TimedQueuePool)
+        options.setdefault("pool_size", config.get("DB_POOL_SIZE", 5))
+        options.setdefault("max_overflow", config.get("DB_MAX_OVERFLOW", 10))
+        options.setdefault("pool_timeout", config.get("DB_POOL_TIMEOUT", 30))
+        options.setdefault("pool_recycle", config.get("DB_POOL_RECYCLE", 1800))
+    options.setdefault("pool_pre_ping", config.get("DB_POOL_PRE_PING", True))
+
+    timeout_ms = config.get("DB_STATEMENT_TIMEOUT_MS")
+    if timeout_ms and url.get_backend_name() == "postgresql":
+        # Startup parameter: set once per connection, no extra round trip.
+        # Behind PgBouncer add "options" to ignore_startup_parameters and set
+        # the timeout on the database role instead.
+        connect_args = dict(options.get("connect_args") or {})
+        connect_args.setdefault("options", f"-c statement_timeout={int(timeout_ms)}")
+        options["connect_args"] = connect_args
+    return options
+
+
+_fork_engines = weakref.WeakSet()  # engines to reset in a forked child; weak, so old apps' engines can go
+_fork_hook = False
+
+
+def _dispose_in_child():
+    for engine in list(_fork_engines):
+        engine.dispose(close=False)
+
+
+def dispose_after_fork(engine):
+    """
+    Drops pooled connections a forked child inherits, e.g. under gunicorn
+    --preload where the master built the app (and may have run the schema
+    upgrade). The child connects afresh; close=False leaves the sockets the
+    parent still owns alone. One fork hook serves every engine, however many
+    apps the process creates.
+    """
+    global _fork_hook
+    _fork_engines.add(engine)
+    if not _fork_hook:
+        os.register_at_fork(after_in_child=_dispose_in_child)
+        _fork_hook = True
+
+
+def use_green_driver(engine):
+    """
+    For SERVER_MODE=gevent. psycopg2 waits on the server inside C, which would
+    stall every greenlet in the worker; with a wait callback it polls the
+    socket through select(), which gevent has patched, and yields instead.
+    SQLite stays blocking: its calls are local and short.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        raise RuntimeError("SERVER_MODE=gevent needs the gevent package") from None
+    if not monkey.is_module_patched("socket"):
+        logger.warning("SERVER_MODE=gevent but the stdlib isn't patched; serve with gunicorn's gevent worker")
+    if engine.dialect.driver == "psycopg2":
+        import psycopg2.extensions
+        import psycopg2.extras
+        psycopg2.extensions.set_wait_callback(psycopg2.extras.wait_select)
+
+
+class PoolMonitor:
+    """Counts pool events for one engine, thread-safe."""
+
+    def __init__(self, app=None):
+        self.engine = None
+        self._lock = threading.Lock()
+        self._fork_hook = False
+        self._reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app import db
+        with app.app_context():
+            self.engine = db.engine
+        self._reset()
+        if isinstance(self.engine.pool, _TimedCheckout): self.engine.pool.monitor = self
+        # Listening on the engine keeps these attached across dispose()
+        event.listen(self.engine, "checkout", self._on_checkout)
+        event.listen(self.engine, "checkin", self._on_checkin)
+        event.listen(self.engine, "connect", self._on_connect)
+        event.listen(self.engine, "invalidate", self._on_invalidate)
+        app.extensions["pool_monitor"] = self
+        if not self._fork_hook:  # a worker starts with its own counts, not the master's
+            os.register_at_fork(after_in_child=self._reset)
+            self._fork_hook = True
+
+    def _reset(self):
+        with self._lock:
+            self._counts = {"checkouts": 0, "checkins": 0, "connects": 0, "overflow_connects": 0,
+                            "timeouts": 0, "invalidated": 0}
+            self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+
+    def _bump(self, key):
+        with self._lock:
+            self._counts[key] += 1
+
+    def _on_checkout(self, dbapi_conn, record, proxy):
+        self._bump("checkouts")
+
+    def _on_checkin(self, dbapi_conn, record):
+        self._bump("checkins")
+
+    def _on_connect(self, dbapi_conn, record):
+        self._bump("connects")
+        pool = self.engine.pool
+        # QueuePool counts the new connection before opening it: > 0 means beyond pool_size
+        if isinstance(pool, QueuePool) and pool.overflow() > 0: self._bump("overflow_connects")
+
+    def _on_invalidate(self, dbapi_conn, record, exception):
+        self._bump("invalidated")
+
+    def record_timeout(self):
+        self._bump("timeouts")
+
+    def record_wait(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self._wait_buckets[bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+            self._wait_total += ms
+            self._wait_max = max(self._wait_max, ms)
+
+    def stats(self):
+        pool = self.engine.pool
+        with self._lock:
+            stats = dict(self._counts)
+            waits = sum(self._wait_buckets)
+            stats["wait_ms"] = {
+                "count": waits,
+                "total": round(self._wait_total, 3),
+                "avg": round(self._wait_total / waits, 3) if waits else 0.0,
+                "max": round(self._wait_max, 3),
+                # cumulative, Prometheus-style: checkouts that waited <= le ms
+                "buckets": {str(le): n for le, n in zip(WAIT_BUCKETS_MS + ("+Inf",), _cumulative(self._wait_buckets))},
+            }
+        stats["pid"] = os.getpid()
+        stats["pool"] = type(pool).__name__
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), checked_out=pool.checkedout(), idle=pool.checkedin(),
+                         overflow=max(pool.overflow(), 0), max_overflow=pool._max_overflow, timeout=pool.timeout())
+        else:
+            stats["checked_out"] = stats["checkouts"] - stats["checkins"]
+        return stats
+
+
+def _cumulative(counts):
+    total, out = 0, []
+    for n in counts:
+        total += n
+        out.append(total)
+    return out
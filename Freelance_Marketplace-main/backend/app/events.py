@@ -0,0 +1,329 @@
+# app/events.py
+
+import itertools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Server-sent events for project pages and users. Mutation routes publish
+# compact deltas after their commit:
+#
+#   bid      project:<id>, user:<client>      the new bid, with a freelancer summary
+#   status   project:<id>, user:<client>, user:<freelancer>
+#   review   project:<id>, user:<reviewee>
+#
+# The broker keeps a short ring buffer per channel and wakes that channel's
+# waiting streams, so a subscriber costs one parked thread/greenlet and no DB
+# connection. Streams resume from Last-Event-ID; when the events after it
+# have been dropped the stream sends "reset" instead (refetch, then carry on).
+# Idle streams get an id-only heartbeat so their Last-Event-ID stays current.
+#
+# EVENTS_URL picks where events travel: unset = this process only (fine for a
+# single worker), or a redis:// URL. With redis every publish is one XADD to a
+# capped stream, and each process runs a single listener thread that feeds
+# its local buffers, so events reach streams on every worker and ids (the
+# stream's) are valid for resuming on any of them.
+#
+# A stream holds its connection, and a thread or greenlet, for up to
+# EVENTS_MAX_STREAM seconds, so each process takes at most
+# EVENTS_MAX_SUBSCRIBERS of them: by default none under SERVER_MODE=sync, half
+# the threads under gthread and no cap under gevent. Past that the route
+# answers 204, which tells EventSource to stop reconnecting.
+
+STREAM_KEY = "marketplace:events"
+
+
+def _frame(event_id, kind, data):
+    return f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n"
+
+
+class _Channel:
+    __slots__ = ("events", "ready", "waiters", "dropped", "touched")
+
+    def __init__(self, lock, size):
+        self.events = deque(maxlen=size)  # (key, frame)
+        self.ready = threading.Condition(lock)
+        self.waiters = 0
+        self.dropped = None  # key of the newest event pushed out of `events`
+        self.touched = time.monotonic()
+
+
+class LocalEventBackend:
+    """Events stay in this process; ids are "<epoch>-<n>", the epoch changing per process."""
+    name = "local"
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.reset()
+
+    def reset(self):
+        self.epoch = secrets.token_hex(4)
+        self._counter = itertools.count(1)
+        self.broker._set_head(f"{self.epoch}-0", (0,))
+
+    def key(self, event_id):
+        epoch, _, n = event_id.partition("-")
+        return (int(n),) if epoch == self.epoch and n.isdigit() else None
+
+    def publish(self, channels, kind, data):
+        n = next(self._counter)
+        self.broker._dispatch(f"{self.epoch}-{n}", (n,), channels, kind, data)
+
+    def start(self):
+        pass
+
+
+class RedisEventBackend:
+    """Events go through a capped Redis stream. Needs the optional `redis` package."""
+    name = "redis"
+
+    def __init__(self, broker, url, maxlen):
+        import redis
+        self.broker = broker
+        self.maxlen = maxlen
+        self._client = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+        self.reset()
+
+    def reset(self):
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(event_id):
+        ms, _, seq = event_id.partition("-")
+        return (int(ms), int(seq)) if ms.isdigit() and seq.isdigit() else None
+
+    def publish(self, channels, kind, data):
+        fields = {"channels": ",".join(channels), "type": kind, "data": data}
+        try:
+            self._client.xadd(STREAM_KEY, fields, maxlen=self.maxlen, approximate=True)
+        except self._errors:
+            logger.exception("dropped %s event for %s", kind, fields["channels"])
+
+    def start(self):
+        """Starts this process's listener on the first subscribe, so nothing runs before a fork."""
+        with self._lock:
+            if self._thread is None:
+                self._mark_start()
+                self._thread = threading.Thread(target=self._listen, name="events-listener", daemon=True)
+                self._thread.start()
+
+    def _mark_start(self):
+        # Events before this point were never buffered here: resuming from them means a reset
+        ms = int(time.time() * 1000)
+        self.broker._set_head(f"{ms}-0", (ms, 0), floor=True)
+
+    def _listen(self):
+        last = "$"
+        while True:
+            try:
+                reply = self._client.xread({STREAM_KEY: last}, count=500, block=5000)
+            except self._errors:
+                logger.exception("events listener lost redis; resubscribing")
+                time.sleep(1)
+                self._mark_start()
+                last = "$"
+                continue
+            for _, entries in reply or ():
+                for event_id, fields in entries:
+                    last = event_id = event_id.decode()
+                    fields = {k.decode(): v.decode() for k, v in fields.items()}
+                    self.broker._dispatch(event_id, self.key(event_id), fields["channels"].split(","),
+                                          fields["type"], fields["data"])
+
+
+class EventBroker:
+    def __init__(self, app=None):
+        self.buffer = 100
+        self.retention = 300
+        self.heartbeat = 15
+        self.max_stream = 300
+        self.max_subscribers = None
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._fork_hook = False
+        self._reset_state()
+        self.backend = LocalEventBackend(self)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.buffer = app.config.get("EVENTS_BUFFER", 100)  # per channel
+        self.retention = app.config.get("EVENTS_RETENTION", 300)  # seconds an idle channel's events are kept
+        self.heartbeat = app.config.get("EVENTS_HEARTBEAT", 15)
+        self.max_stream = app.config.get("EVENTS_MAX_STREAM", 300)
+        self.max_subscribers = app.config.get("EVENTS_MAX_SUBSCRIBERS")
+        if self.max_subscribers is None:
+            mode = app.config.get("SERVER_MODE", "gthread")
+            self.max_subscribers = {"sync": 0, "gthread": app.config.get("SERVER_THREADS", 16) // 2}.get(mode)
+        self._reset_state()
+        url = app.config.get("EVENTS_URL")
+        if url and url != "local":
+            self.backend = RedisEventBackend(self, url, app.config.get("EVENTS_STREAM_MAXLEN", 10000))
+        else:
+            self.backend = LocalEventBackend(self)
+        if not self._fork_hook and hasattr(os, "register_at_fork"):
+            # A forked worker starts with no subscribers, a new id epoch and no listener
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook = True
+        app.extensions["event_broker"] = self
+
+    def _reset_state(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._head = (None, (0,))
+        self._floor = (0,)
+        self._stats = {"published": 0, "delivered_frames": 0, "resets": 0, "streams_opened": 0, "streams_refused": 0}
+        self._subscribers = 0
+        self._dispatches = 0
+
+    def _after_fork(self):
+        self._reset_state()
+        self.backend.reset()
+
+    # --- publishing ---
+
+    def publish(self, channels, kind, data):
+        """Sends `data` (JSON-serializable) as a `kind` event on each of `channels`. Call after the commit."""
+        self._stats["published"] += 1
+        self.backend.publish(list(channels), kind, json.dumps(data, separators=(",", ":"), default=str))
+
+    def _set_head(self, event_id, key, floor=False):
+        with self._lock:
+            self._head = (event_id, key)
+            if floor: self._floor = max(self._floor, key)
+
+    def _dispatch(self, event_id, key, channels, kind, data):
+        frame = _frame(event_id, kind, data)
+        with self._lock:
+            self._head = (event_id, key)
+            for name in channels:
+                channel = self._channels.get(name)
+                if channel is None:
+                    channel = self._channels[name] = _Channel(self._lock, self.buffer)
+                if len(channel.events) == channel.events.maxlen:
+                    channel.dropped = channel.events[0][0]
+                channel.events.append((key, frame))
+                channel.touched = time.monotonic()
+                if channel.waiters: channel.ready.notify_all()
+            self._dispatches += 1
+            if self._dispatches % 1000 == 0: self._prune()
+
+    def _prune(self):
+        """Forgets channels nobody is watching whose last event is older than EVENTS_RETENTION (lock held)."""
+        cutoff = time.monotonic() - self.retention
+        for name in [name for name, c in self._channels.items() if not c.waiters and c.touched < cutoff]:
+            channel = self._channels.pop(name)
+            if channel.events: self._floor = max(self._floor, channel.events[-1][0])
+
+    # --- subscribing ---
+
+    def reserve(self):
+        """
+        Takes one of this process's EVENTS_MAX_SUBSCRIBERS stream slots (check
+        and count under one lock, so concurrent requests can't overshoot).
+        Returns False, counting the refusal, when none is free. The caller
+        release()s the slot once the response is closed.
+        """
+        with self._lock:
+            if self.max_subscribers is not None and self._subscribers >= self.max_subscribers:
+                self._stats["streams_refused"] += 1
+                return False
+            self._subscribers += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._subscribers -= 1
+
+    def stream(self, channel_name, last_event_id=None):
+        """
+        Generator of text/event-stream chunks for one channel. Replays what
+        followed `last_event_id` (or sends "reset" when that is gone), then
+        waits for new events, with heartbeats, for up to EVENTS_MAX_STREAM
+        seconds; EventSource reconnects by itself and resumes. Runs in a
+        reserve()d slot.
+        """
+        self.backend.start()
+        deadline = time.monotonic() + self.max_stream
+        self._stats["streams_opened"] += 1
+        with self._lock:
+            channel = self._channels.get(channel_name)
+            if channel is None:
+                channel = self._channels[channel_name] = _Channel(self._lock, self.buffer)
+            channel.waiters += 1
+            head_id, cursor = self._head
+            frames = ["retry: 3000\n\n"]
+            if last_event_id:
+                key = self.backend.key(last_event_id)
+                if key is None or key < self._floor or (channel.dropped is not None and key <= channel.dropped):
+                    self._stats["resets"] += 1
+                    frames.append(_frame(head_id, "reset", "{}"))
+                else:
+                    frames.extend(frame for k, frame in channel.events if k > key)
+        try:
+            yield "".join(frames)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: return
+                with self._lock:
+                    frames = [frame for k, frame in channel.events if k > cursor]
+                    if not frames:
+                        channel.ready.wait(min(self.heartbeat, remaining))
+                        frames = [frame for k, frame in channel.events if k > cursor]
+                    head_id, cursor = self._head
+                    channel.touched = time.monotonic()
+                self._stats["delivered_frames"] += len(frames)
+                # An id-only message moves the client's Last-Event-ID up to where this stream has read
+                yield "".join(frames) if frames else f"id: {head_id}\n\n"
+        finally:
+            with self._lock:
+                channel.waiters -= 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, backend=self.backend.name, channels=len(self._channels),
+                         subscribers=self._subscribers, max_subscribers=self.max_subscribers, buffered=sum(len(c.events) for c in self._channels.values()))
+        stats["pid"] = os.getpid()
+        return stats
+
+
+# --- deltas published by the mutation routes ---
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def bid_added(bid, freelancer, client_id):
+    """`bid` is a Bid or its insert values; `freelancer` any object/row with id, username, avg_rating."""
+    get = bid.get if isinstance(bid, dict) else lambda name: getattr(bid, name)
+    data = {"id": get("id"), "amount": float(get("amount")), "proposal": get("proposal"), "created_at": _iso(get("created_at")),
+            "proposed_timeline_days": get("proposed_timeline_days"), "project_id": get("project_id"),
+            "freelancer_id": freelancer.id,
+            "freelancer": {"id": freelancer.id, "username": freelancer.username, "avg_rating": freelancer.avg_rating}}
+    event_broker.publish([f"project:{data['project_id']}", f"user:{client_id}"], "bid", data)
+
+
+def status_changed(project):
+    data = {"project_id": project.id, "status": project.status, "freelancer_id": project.freelancer_id,
+            "accepted_bid_id": project.accepted_bid_id, "started_at": _iso(project.started_at),
+            "completed_at": _iso(project.completed_at)}
+    channels = [f"project:{project.id}", f"user:{project.client_id}"]
+    if project.freelancer_id: channels.append(f"user:{project.freelancer_id}")
+    event_broker.publish(channels, "status", data)
+
+
+def review_posted(review):
+    data = {"id": review.id, "rating": review.rating, "comment": review.comment, "created_at": _iso(review.created_at),
+            "project_id": review.project_id, "reviewer_id": review.reviewer_id, "reviewee_id": review.reviewee_id}
+    event_broker.publish([f"project:{review.project_id}", f"user:{review.reviewee_id}"], "review", data)
+
+
+event_broker = EventBroker()
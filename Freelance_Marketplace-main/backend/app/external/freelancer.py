@@ -1,38 +1,161 @@
 # app/external/freelancer.py
 
-import requests, re
-from bs4 import BeautifulSoup
+import re
+import threading
+from html.parser import HTMLParser
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.instrumentation import timed
+
+PROFILE_URL = "https://www.freelancer.com/u/{username}"
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
     "Accept": "text/html,application/xhtml+xml"
 }
 
-def fetch_freelancer_rating(username: str):
+POOL_MAXSIZE = 32  # keep >= the bulk refresh concurrency
+CHUNK_SIZE = 16 * 1024
+MAX_PAGE_BYTES = 2 * 1024 * 1024  # stop reading pathological pages here
+DRAIN_MAX_BYTES = 64 * 1024  # finish short remainders so the connection can be reused
+
+# e.g. "4.9 · 149 Reviews", "4.8 (203 reviews)", "4.7 / 98 reviews"
+RATING_REVIEWS_RE = re.compile(r"([0-9]\.[0-9])\s*[\·\(\-/ ]\s*([0-9,]+)\s*[Rr]eview")
+RATING_ONLY_RE = re.compile(r"([0-9]\.[0-9])\s*(?:rating|star)")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """One pooled, keep-alive Session per process (created lazily, after fork)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Incremental equivalent of BeautifulSoup's get_text(" ", strip=True):
+    visible text nodes, stripped, joined by single spaces. Script/style skipped.
+    """
+    SKIP = {"script", "style", "template"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._pending = []  # a text node can arrive split across feed() calls
+        self._skip_depth = 0
+
+    def _flush(self):
+        if self._pending:
+            data = "".join(self._pending).strip()
+            self._pending = []
+            if data: self.parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in self.SKIP: self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in self.SKIP and self._skip_depth: self._skip_depth -= 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth: self._pending.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_rating(chunks):
     """
+    Feeds HTML chunks to the parser and stops at the first rating/review match.
     Returns: { "rating": float|null, "reviews": int|null, "raw": str }
     """
-    url = f"https://www.freelancer.com/u/{username}"
+    parser = _TextExtractor()
+    text = ""
+    joined = 0
 
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=8)
-        html = resp.text
-    except:
-        return None  # network error
+    def extend():
+        # Append newly parsed text and search it, re-checking a small overlap
+        # so a match spanning two chunks is still found
+        nonlocal text, joined
+        new = parser.parts[joined:]
+        if not new: return None
+        start = max(0, len(text) - 64)
+        text = " ".join([text, *new]) if text else " ".join(new)
+        joined = len(parser.parts)
+        return RATING_REVIEWS_RE.search(text, start)
 
-    soup = BeautifulSoup(html, "html.parser")
-    text = soup.get_text(" ", strip=True)
+    m = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        m = extend()
+        if m: break
+    else:
+        parser.close()
+        m = extend()
 
-    # e.g. "4.9 · 149 Reviews", "4.8 (203 reviews)", "4.7 / 98 reviews"
-    m = re.search(r"([0-9]\.[0-9])\s*[\·\(\-/ ]\s*([0-9,]+)\s*[Rr]eview", text)
     if m:
-        rating = float(m.group(1))
-        reviews = int(m.group(2).replace(",", ""))
-        return {"rating": rating, "reviews": reviews, "raw": text}
+        return {"rating": float(m.group(1)), "reviews": int(m.group(2).replace(",", "")), "raw": text}
 
-    # fallback: rating only
-    m2 = re.search(r"([0-9]\.[0-9])\s*(?:rating|star)", text.lower())
+    # fallback: rating only (needs the whole page, as before)
+    m2 = RATING_ONLY_RE.search(text.lower())
     if m2:
         return {"rating": float(m2.group(1)), "reviews": None, "raw": text}
 
     return {"rating": None, "reviews": None, "raw": text}
+
+
+def _iter_page(resp):
+    received = 0
+    for chunk in resp.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=True):
+        if not chunk: continue
+        received += len(chunk)
+        yield chunk
+        if received >= MAX_PAGE_BYTES: break
+
+
+@timed("external")
+def fetch_freelancer_rating(username: str, url_template: str = PROFILE_URL, etag: str = None, last_modified: str = None):
+    """
+    Returns: { "rating": float|null, "reviews": int|null, "raw": str, "etag": str|null, "last_modified": str|null }
+    With `etag`/`last_modified` from an earlier fetch the request is conditional,
+    and an unchanged page returns { "not_modified": True, "etag": ..., "last_modified": ... }.
+    `url_template` lets tests point the scraper at a local stub server.
+    """
+    url = url_template.format(username=username)
+    headers = {}
+    if etag: headers["If-None-Match"] = etag
+    if last_modified: headers["If-Modified-Since"] = last_modified
+
+    try:
+        with get_session().get(url, timeout=8, stream=True, headers=headers) as resp:
+            validators = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+            if resp.status_code == 304:
+                return {"not_modified": True, **validators}
+            if resp.encoding is None: resp.encoding = "utf-8"
+            result = extract_rating(_iter_page(resp))
+            # An unread body forces urllib3 to close the socket; if only a little
+            # is left, reading it keeps the pooled keep-alive connection
+            resp.raw.read(DRAIN_MAX_BYTES, decode_content=False)
+            return {**result, **validators}
+    except (requests.RequestException, UnicodeDecodeError):
+        return None  # network error
@@ -0,0 +1,96 @@
+# app/external/refresh.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from app import db
+from app.models import ExternalProfile
+from app.external.freelancer import fetch_freelancer_rating, PROFILE_URL
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        if not self.interval: return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _write_batch(updates):
+    """Applies fetched results with one executemany UPDATE per kind of change."""
+    table = ExternalProfile.__table__
+    refreshed = [u for u in updates if not u.get("not_modified")]
+    unchanged = [u for u in updates if u.get("not_modified")]
+    by_id = table.c.id == db.bindparam("_id")
+    if refreshed:
+        db.session.execute(
+            table.update().where(by_id).values(
+                rating=db.bindparam("_rating"), reviews=db.bindparam("_reviews"), raw_compressed=db.bindparam("_raw"),
+                raw_data=None, etag=db.bindparam("_etag"), last_modified=db.bindparam("_last_modified"),
+                last_checked=db.bindparam("_checked"),
+            ),
+            [{"_id": u["id"], "_rating": u["rating"], "_reviews": u["reviews"], "_raw": ExternalProfile.compress_raw(u.get("raw")),
+              "_etag": u["etag"], "_last_modified": u["last_modified"], "_checked": u["checked"]} for u in refreshed],
+        )
+    if unchanged:
+        db.session.execute(
+            table.update().where(by_id).values(last_checked=db.bindparam("_checked")),
+            [{"_id": u["id"], "_checked": u["checked"]} for u in unchanged],
+        )
+    db.session.commit()
+
+
+def refresh_stale_profiles(ttl=timedelta(hours=24), concurrency=16, per_host_rps=10.0, batch_size=500,
+                           url_template=PROFILE_URL, limit=None):
+    """
+    Re-fetches every ExternalProfile last checked before now - ttl.
+    Fetches run on a bounded thread pool with per-host spacing and conditional
+    GETs; results are written back from this thread in batches. Profiles that
+    fail to fetch keep their old last_checked so the next run retries them.
+    Returns: dict of counts and elapsed seconds
+    """
+    cutoff = datetime.utcnow() - ttl
+    query = (db.select(ExternalProfile.id, ExternalProfile.external_username, ExternalProfile.etag, ExternalProfile.last_modified)
+             .where(db.or_(ExternalProfile.last_checked < cutoff, ExternalProfile.last_checked.is_(None)))
+             .order_by(ExternalProfile.last_checked))
+    if limit: query = query.limit(limit)
+    stale = db.session.execute(query).all()
+    db.session.commit()  # don't hold a read transaction open while fetching
+
+    limiter = HostRateLimiter(per_host_rps)
+
+    def fetch(row):
+        limiter.wait(urlsplit(url_template.format(username=row.external_username)).netloc)
+        return row.id, fetch_freelancer_rating(row.external_username, url_template, row.etag, row.last_modified)
+
+    stats = {"stale": len(stale), "refreshed": 0, "not_modified": 0, "failed": 0}
+    started = time.perf_counter()
+    pending = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="refresh") as pool:
+        for future in as_completed([pool.submit(fetch, row) for row in stale]):
+            profile_id, result = future.result()
+            if result is None:
+                stats["failed"] += 1
+                continue
+            stats["not_modified" if result.get("not_modified") else "refreshed"] += 1
+            pending.append({"id": profile_id, "checked": datetime.utcnow(), **result})
+            if len(pending) >= batch_size:
+                _write_batch(pending)
+                pending = []
+    if pending: _write_batch(pending)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,107 @@
+# app/freelancer_stats.py
+
+from sqlalchemy import or_, and_
+
+from app import db
+from app.models import User, Skill, FreelancerStats, user_skill, freelancer_skill_score
+from app.pagination import encode_rank_cursor, decode_rank_cursor
+from app.ranking_logic import BASE_WEIGHTS
+from app.skills import normalize_skill
+
+# Materialized freelancer stats. The counters themselves live on User and
+# move with SQL-side increments (ratings.apply_review, workflow.record_*);
+# freelancer_stats copies them per freelancer, with a leaderboard score, and
+# freelancer_skill_score posts that score under each of their skill tags.
+# That gives:
+#   - GET /api/freelancers/top[?skill=]: one index range per page, no scan of user
+#   - bid ranking: bids and their bidders' features in one query (ranking_logic)
+# Routes call refresh_freelancer_stats after changing a freelancer's counters
+# or skills, in the same transaction. The counter UPDATE has already locked
+# the user row, so concurrent refreshes of one freelancer run one after the other.
+
+# The freelancer-side signals of the bid ranking: avg_rating (0-5) and the
+# completion / on-time percentages. Score is 0-10.
+LEADERBOARD_WEIGHTS = {k: BASE_WEIGHTS[k] for k in ("rating", "completion_rate", "on_time_rate")}
+
+
+def _score():
+    total = sum(LEADERBOARD_WEIGHTS.values())
+    weighted = (LEADERBOARD_WEIGHTS["rating"] * db.func.coalesce(User.avg_rating, 0.0) / 5.0
+                + LEADERBOARD_WEIGHTS["completion_rate"] * db.func.coalesce(User.completion_rate, 0.0) / 100.0
+                + LEADERBOARD_WEIGHTS["on_time_rate"] * db.func.coalesce(User.on_time_rate, 0.0) / 100.0)
+    # numeric cast: Postgres only rounds numerics to a given scale
+    return db.cast(db.func.round(db.cast(weighted * 10.0 / total, db.Numeric), 4), db.Float)
+
+
+STATS_COLUMNS = ["user_id", "username", "skills", "avg_rating", "review_count", "completion_rate", "on_time_rate",
+                 "portfolio_score", "projects_completed", "on_time_count", "delayed_count", "score"]
+POSTING_COLUMNS = ["skill_id", "user_id", "score"]
+
+
+def _stats():
+    zero = lambda col: db.func.coalesce(col, 0)
+    return db.select(User.id, User.username, User.skills, zero(User.avg_rating), User.review_count, zero(User.completion_rate),
+                     zero(User.on_time_rate), zero(User.portfolio_score), User.projects_completed, zero(User.on_time_count),
+                     zero(User.delayed_count), _score()).where(User.is_freelancer.is_(True))
+
+
+def _postings():
+    return (db.select(user_skill.c.skill_id, FreelancerStats.user_id, FreelancerStats.score)
+            .join(FreelancerStats, FreelancerStats.user_id == user_skill.c.user_id))
+
+
+def refresh_freelancer_stats(user_ids):
+    """
+    Re-derives the stats rows and skill postings of these users from User and
+    user_skill; clients end up with none. Four statements whatever the number
+    of users. Caller commits.
+    """
+    ids = list({i for i in user_ids if i is not None})
+    if not ids: return
+    db.session.flush()  # pending User / skill tag changes must be visible to the SELECTs below
+    stats = FreelancerStats.__table__
+    db.session.execute(freelancer_skill_score.delete().where(freelancer_skill_score.c.user_id.in_(ids)))
+    db.session.execute(stats.delete().where(stats.c.user_id.in_(ids)))
+    db.session.execute(stats.insert().from_select(STATS_COLUMNS, _stats().where(User.id.in_(ids))))
+    db.session.execute(freelancer_skill_score.insert().from_select(POSTING_COLUMNS, _postings().where(user_skill.c.user_id.in_(ids))))
+
+
+def rebuild_freelancer_stats(conn=None):
+    """
+    Rebuilds both tables from user/user_skill in four statements.
+    Returns: number of freelancers written
+    """
+    own_transaction = conn is None
+    conn = conn or db.session.connection()
+    stats = FreelancerStats.__table__
+    conn.execute(freelancer_skill_score.delete())
+    conn.execute(stats.delete())
+    written = conn.execute(stats.insert().from_select(STATS_COLUMNS, _stats())).rowcount
+    conn.execute(freelancer_skill_score.insert().from_select(POSTING_COLUMNS, _postings()))
+    if own_transaction: db.session.commit()
+    return written
+
+
+def top_freelancers(skill=None, cursor=None, limit=20):
+    """
+    Freelancers by score, best first, optionally only those tagged `skill`.
+    Keyset pagination on (score, user_id) with search's rank cursors.
+    Returns: (list of FreelancerStats, next_cursor|None)
+    """
+    query = db.select(FreelancerStats)
+    if skill:
+        skill_id = db.session.scalar(db.select(Skill.id).where(Skill.name == normalize_skill(skill)))
+        if skill_id is None: return [], None
+        postings = freelancer_skill_score.c
+        query = query.join(freelancer_skill_score, postings.user_id == FreelancerStats.user_id).where(postings.skill_id == skill_id)
+        score, user_id = postings.score, postings.user_id
+    else:
+        score, user_id = FreelancerStats.score, FreelancerStats.user_id
+    if cursor:
+        last_score, last_id = decode_rank_cursor(cursor)
+        query = query.where(or_(score < last_score, and_(score == last_score, user_id < last_id)))
+    rows = db.session.scalars(query.order_by(score.desc(), user_id.desc()).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_rank_cursor(rows[-1].score, rows[-1].user_id)
@@ -0,0 +1,96 @@
+# app/http_cache.py
+
+import hashlib
+
+from flask import request, current_app
+
+from app import db
+from app.models import User, Project, Bid, Review, ExternalProfile
+
+# Strong ETags for the public read endpoints, built from version stamps
+# (Project.version, User.version) rather than from the response body, so a
+# matching If-None-Match is answered with one small query and no
+# serialization. Every write that changes what those endpoints show must
+# call bump_versions() in its transaction.
+
+FEED_CACHE_CONTROL = "public, max-age=5, stale-while-revalidate=30"  # polled; a few seconds stale is fine
+DETAILS_CACHE_CONTROL = "public, no-cache"  # bids arrive at any time: always revalidate (cheap 304)
+PROFILE_CACHE_CONTROL = "public, no-cache"
+
+
+def make_etag(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def bump_versions(project_ids=(), user_ids=()):
+    """Marks projects/users as changed, in the caller's transaction."""
+    for model, ids in ((Project, project_ids), (User, user_ids)):
+        ids = {i for i in ids if i is not None}
+        if not ids: continue
+        db.session.execute(
+            db.update(model).where(model.id.in_(ids)).values(version=model.version + 1),
+            execution_options={"synchronize_session": False},
+        )
+
+
+def _users_version(*id_selects):
+    # Versions only grow, so the sum over a fixed set of users changes
+    # whenever any of them does; the set itself only changes together with
+    # a bumped project/user version
+    return db.select(db.func.coalesce(db.func.sum(User.version), 0)).where(User.id.in_(db.union(*id_selects))).scalar_subquery()
+
+
+def project_etag(project_id):
+    """Covers the project, its bids and reviews, and every user embedded in them. None if missing."""
+    related = _users_version(
+        db.select(Project.client_id).where(Project.id == project_id),
+        db.select(Project.freelancer_id).where(Project.id == project_id),
+        db.select(Bid.freelancer_id).where(Bid.project_id == project_id),
+        db.select(Review.reviewer_id).where(Review.project_id == project_id),
+        db.select(Review.reviewee_id).where(Review.project_id == project_id),
+    )
+    row = db.session.execute(db.select(Project.version, related).where(Project.id == project_id)).first()
+    return make_etag("project", project_id, *row) if row else None
+
+
+def profile_etag(user_id):
+    """
+    Covers the user, their external profile and the users embedded in their
+    history (clients of accepted projects, reviewers). The history itself is
+    covered by User.version, which project and review writes bump.
+    """
+    counterparts = _users_version(
+        db.select(Project.client_id).where(Project.freelancer_id == user_id),
+        db.select(Review.reviewer_id).where(Review.reviewee_id == user_id),
+    )
+    row = db.session.execute(
+        db.select(User.version, ExternalProfile.external_username, ExternalProfile.rating, ExternalProfile.reviews, counterparts)
+        .outerjoin(ExternalProfile, db.and_(ExternalProfile.user_id == User.id, ExternalProfile.provider == 'freelancer'))
+        .where(User.id == user_id)
+    ).first()
+    return make_etag("user", user_id, request.query_string, *row) if row else None
+
+
+def not_modified(etag, cache_control):
+    """Returns: a 304 response if the client already holds `etag`, else None."""
+    if etag is None or not request.if_none_match.contains_weak(etag): return None
+    return cached(current_app.response_class(status=304), etag, cache_control)
+
+
+def cached(resp, etag, cache_control):
+    if etag is not None: resp.set_etag(etag)
+    resp.headers["Cache-Control"] = cache_control
+    return resp
+
+
+def feed_stamp_query(query, only):
+    """The feed page query narrowed to the columns its ETag is built from."""
+    columns = [Project.id, Project.created_at, Project.version]
+    if "client" in only:
+        return query.outerjoin(Project.client).with_entities(*columns, User.version)
+    return query.with_entities(*columns)
+
+
+def feed_etag(only, stamps):
+    """`stamps`: rows of feed_stamp_query, or the same tuples taken from loaded projects."""
+    return make_etag("feed", only, request.query_string, *(tuple(s) for s in stamps))
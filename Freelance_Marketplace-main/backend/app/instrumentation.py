@@ -0,0 +1,295 @@
+# app/instrumentation.py
+
+import functools
+import hmac
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request, has_request_context, current_app, jsonify
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+try:
+    import pyinstrument
+except ImportError:  # optional: PROFILER=pyinstrument falls back to cProfile
+    pyinstrument = None
+
+# Opt-in request instrumentation (INSTRUMENTATION_ENABLED). When on:
+#   - per-route latency histograms and request counts
+#   - per-request SQL query count and DB time (cursor execute events)
+#   - time in named sections: "serialize" (marshmallow, compiled dumpers,
+#     JSON encoding), "ranking", "external" (profile scraper); see timed()
+#   - a warning on the "app.slow_queries" logger for statements slower than
+#     SLOW_QUERY_MS
+#   - a Server-Timing header on every response
+#   - `X-Profile: <PROFILE_TOKEN>` captures a cProfile/pyinstrument profile
+#     of that request (sampled at PROFILE_SAMPLE_RATE) into PROFILE_DIR
+# all exported as Prometheus text at GET /metrics, which like the other stats
+# routes needs METRICS_TOKEN (see metrics_endpoint). Numbers are per process:
+# under gunicorn, scrape every worker or aggregate downstream. When off,
+# nothing is registered and timed() is a single global check.
+
+slow_query_log = logging.getLogger("app.slow_queries")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+BACKGROUND = "-"  # route label for work outside a request (jobs, CLI)
+
+_active = None  # the enabled Instrumentation, if any
+_local = threading.local()
+
+
+def metrics_endpoint(view):
+    """
+    For views of operational stats (/metrics, /api/metrics/*): 404 unless
+    METRICS_TOKEN is set, then 403 without "X-Metrics-Token: <token>".
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get("METRICS_TOKEN")
+        if not token: return jsonify({"msg": "Not found"}), 404
+        if not hmac.compare_digest(request.headers.get("X-Metrics-Token", ""), token):
+            return jsonify({"msg": "Forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def timed(section):
+    """Adds the wrapped call's time to `section`. Re-entrant: nested calls (e.g. nested schemas) count once."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            monitor = _active
+            if monitor is None: return fn(*args, **kwargs)
+            sections = _local.__dict__.setdefault("sections", set())
+            if section in sections: return fn(*args, **kwargs)
+            sections.add(section)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                sections.discard(section)
+                monitor.record_section(section, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with encoding counted as "serialize"."""
+    dumps = timed("serialize")(DefaultJSONProvider.dumps)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        row = self.series.get(labels)
+        if row is None:
+            row = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra: pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Instrumentation:
+    """Collects and exports request/DB metrics for one app (see module comment)."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        global _active
+        self.enabled = app.config.get("INSTRUMENTATION_ENABLED", False)
+        app.extensions["instrumentation"] = self
+        if not self.enabled:
+            _active = None
+            return
+        self.slow_query_seconds = app.config.get("SLOW_QUERY_MS", 250) / 1000
+        self.profile_token = app.config.get("PROFILE_TOKEN")
+        self.profile_rate = app.config.get("PROFILE_SAMPLE_RATE", 1.0)
+        self.profiler = app.config.get("PROFILER", "cprofile")
+        self.profile_dir = app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles")
+        self._reset()
+
+        from app import db
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        if type(app.json) is DefaultJSONProvider:
+            provider = TimedJSONProvider(app)
+            provider.__dict__.update(app.json.__dict__)
+            app.json = provider
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule("/metrics", "metrics", metrics_endpoint(self._metrics_view))
+        _active = self
+
+    def _reset(self):
+        with self._lock:
+            self.latency = Histogram(LATENCY_BUCKETS)  # (route, method)
+            self.queries = Histogram(QUERY_COUNT_BUCKETS)  # (route, method)
+            self.requests = {}  # (route, method, status) -> count
+            self.db_seconds = {}  # (route,) -> seconds
+            self.section_seconds = {}  # (route, section) -> seconds
+            self.slow_queries = {}  # (route,) -> count
+
+    # --- recording ---
+
+    @staticmethod
+    def _stats():
+        return g.get("_request_stats") if has_request_context() else None
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = self._stats()
+        route = stats["route"] if stats else BACKGROUND
+        if stats:
+            stats["queries"] += 1
+            stats["db"] += elapsed
+        else:
+            self._add(self.db_seconds, (route,), elapsed)
+        if elapsed >= self.slow_query_seconds:
+            self._add(self.slow_queries, (route,), 1)
+            slow_query_log.warning("slow query %.1fms [%s] %s", elapsed * 1000, route, " ".join(statement.split())[:2000])
+
+    def record_section(self, section, seconds):
+        stats = self._stats()
+        if stats:
+            stats["sections"][section] = stats["sections"].get(section, 0.0) + seconds
+        else:
+            self._add(self.section_seconds, (BACKGROUND, section), seconds)
+
+    def _add(self, counter, key, value):
+        with self._lock:
+            counter[key] = counter.get(key, 0) + value
+
+    def _before_request(self):
+        rule = request.url_rule
+        g._request_stats = {"route": rule.rule if rule else "unmatched", "start": time.perf_counter(),
+                            "queries": 0, "db": 0.0, "sections": {}}
+        if self.profile_token and request.headers.get("X-Profile") == self.profile_token:
+            self._start_profile()
+
+    def _after_request(self, response):
+        stats = g.pop("_request_stats", None)
+        if stats is None: return response
+        profile = g.pop("_profile", None)
+        if profile is not None: response.headers["X-Profile-Saved"] = self._save_profile(profile, stats["route"])
+        elapsed = time.perf_counter() - stats["start"]
+        route, method = stats["route"], request.method
+        with self._lock:
+            self.latency.observe((route, method), elapsed)
+            self.queries.observe((route, method), stats["queries"])
+            key = (route, method, str(response.status_code))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.db_seconds[(route,)] = self.db_seconds.get((route,), 0) + stats["db"]
+            for section, seconds in stats["sections"].items():
+                self.section_seconds[(route, section)] = self.section_seconds.get((route, section), 0) + seconds
+        timing = [f'db;dur={stats["db"] * 1000:.1f};desc="{stats["queries"]} queries"']
+        timing += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stats["sections"].items()]
+        timing.append(f"total;dur={elapsed * 1000:.1f}")
+        response.headers["Server-Timing"] = ", ".join(timing)
+        return response
+
+    # --- profiling ---
+
+    def _start_profile(self):
+        if random.random() >= self.profile_rate or not self._profile_lock.acquire(blocking=False): return
+        if self.profiler == "pyinstrument" and pyinstrument is not None:
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g._profile = profiler
+
+    def _save_profile(self, profiler, route):
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{route.strip('/').replace('/', '_').replace('<', '').replace('>', '') or 'root'}"
+            if pyinstrument is not None and isinstance(profiler, pyinstrument.Profiler):
+                profiler.stop()
+                name += ".html"
+                with open(os.path.join(self.profile_dir, name), "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+            else:
+                profiler.disable()
+                name += ".prof"
+                profiler.dump_stats(os.path.join(self.profile_dir, name))  # open with pstats / snakeviz
+            return name
+        finally:
+            self._profile_lock.release()
+
+    # --- export ---
+
+    def _metrics_view(self):
+        return self.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+    def render(self):
+        """Prometheus text exposition format."""
+        out = []
+
+        def histogram(name, help_text, hist, names):
+            out.append(f"# HELP {name} {help_text}\n# TYPE {name} histogram")
+            for labels, row in sorted(hist.series.items()):
+                total = 0
+                for le, n in zip(hist.buckets + ("+Inf",), row[:-1]):
+                    total += n
+                    bound = f'le="{le}"'
+                    out.append(f"{name}_bucket{_labels(names, labels, bound)} {total}")
+                out.append(f"{name}_sum{_labels(names, labels)} {row[-1]}")
+                out.append(f"{name}_count{_labels(names, labels)} {total}")
+
+        def counter(name, help_text, values, names, kind="counter"):
+            out.append(f"# HELP {name} {help_text}\n# TYPE {name} {kind}")
+            for labels, value in sorted(values.items()):
+                out.append(f"{name}{_labels(names, labels)} {value}")
+
+        with self._lock:
+            histogram("http_request_duration_seconds", "Request latency by route.", self.latency, ("route", "method"))
+            histogram("http_request_db_queries", "SQL statements per request by route.", self.queries, ("route", "method"))
+            counter("http_requests_total", "Requests by route and status.", self.requests, ("route", "method", "status"))
+            counter("db_query_seconds_total", "Time in SQL statements by route.", self.db_seconds, ("route",))
+            counter("app_section_seconds_total", "Time in instrumented sections by route.", self.section_seconds, ("route", "section"))
+            counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS by route.", self.slow_queries, ("route",))
+
+        from app import pool_monitor
+        if pool_monitor.engine is not None:
+            pool = pool_monitor.stats()
+            gauges = {k: pool[k] for k in ("checked_out", "idle", "overflow") if k in pool}
+            counter("db_pool_connections", "Pool connections by state.", {(k,): v for k, v in gauges.items()}, ("state",), "gauge")
+            counter("db_pool_events_total", "Pool events.", {(k,): pool[k] for k in
+                    ("checkouts", "connects", "overflow_connects", "timeouts", "invalidated")}, ("event",))
+            wait = pool["wait_ms"]
+            out.append("# HELP db_pool_wait_seconds Time waiting for a pooled connection.\n# TYPE db_pool_wait_seconds histogram")
+            for le, n in wait["buckets"].items():
+                bound = le if le == "+Inf" else int(le) / 1000
+                out.append(f'db_pool_wait_seconds_bucket{{le="{bound}"}} {n}')
+            out.append(f"db_pool_wait_seconds_sum {wait['total'] / 1000}")
+            out.append(f"db_pool_wait_seconds_count {wait['count']}")
+        return "\n".join(out) + "\n"
@@ -0,0 +1,191 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import User, ExternalProfile, ImportJob
+from app.ranking_logic import invalidate_rankings
+from app.http_cache import bump_versions
+from app.freelancer_stats import refresh_freelancer_stats
+
+# The job table is the queue: any process can enqueue, and a job is claimed
+# with a conditional UPDATE so two workers (threads or gunicorn processes)
+# never run the same attempt. A claim is a lease of IMPORT_LEASE seconds: a
+# 'running' job whose process died (crash, restart, deploy) is due again once
+# its lease is over. Retry timers live in the process that scheduled them, so
+# each worker reschedules the table's unfinished jobs when it starts
+# (ImportQueue.resume, called from gunicorn.conf.py).
+
+ACTIVE_STATUSES = ('queued', 'running')
+DEFAULT_LEASE = 300  # seconds; well above one attempt (a fetch times out after 8s)
+
+
+def due_clause(now, lease=DEFAULT_LEASE):
+    """Jobs an attempt may start on: queued and due, or running on an expired lease."""
+    return db.or_(
+        db.and_(ImportJob.status == 'queued', ImportJob.next_attempt_at <= now),
+        db.and_(ImportJob.status == 'running',
+                db.or_(ImportJob.claimed_at.is_(None), ImportJob.claimed_at <= now - timedelta(seconds=lease))),
+    )
+
+
+def due_at(job, lease=DEFAULT_LEASE):
+    """When `job` can next be claimed (None once it has settled)."""
+    if job.status == 'queued': return job.next_attempt_at or job.created_at
+    if job.status == 'running': return job.claimed_at + timedelta(seconds=lease) if job.claimed_at else job.created_at
+    return None
+
+
+def claim_job(job_id, lease=DEFAULT_LEASE):
+    now = datetime.utcnow()
+    claimed = db.session.execute(
+        db.update(ImportJob)
+        .where(ImportJob.id == job_id, due_clause(now, lease))
+        .values(status='running', attempts=ImportJob.attempts + 1, claimed_at=now),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.session.commit()
+    return db.session.get(ImportJob, job_id) if claimed else None
+
+
+def record_import(job, result):
+    """Same side effects the inline import route used to have."""
+    user = db.session.get(User, job.user_id)
+    if not ExternalProfile.query.filter_by(user_id=job.user_id, provider=job.provider).first():
+        db.session.add(ExternalProfile(user_id=job.user_id, provider=job.provider, external_username=job.external_username,
+                                       rating=result["rating"], reviews=result["reviews"], raw_text=result.get("raw", ""),
+                                       etag=result.get("etag"), last_modified=result.get("last_modified")))
+        if result["rating"] and user and (not user.avg_rating or user.avg_rating == 0.0):
+            user.avg_rating = float(result["rating"])
+            invalidate_rankings(freelancer_id=user.id)
+            refresh_freelancer_stats([user.id])
+            bump_versions(user_ids=[user.id])
+
+    job.status = 'succeeded'
+    job.rating = result["rating"]
+    job.reviews = result["reviews"]
+    job.error = None
+    job.finished_at = datetime.utcnow()
+
+
+def run_import_job(job_id, url_template=None, max_attempts=3, backoff=2.0, lease=DEFAULT_LEASE):
+    """
+    Runs one attempt of a due job (url_template defaults to the scraper's PROFILE_URL).
+    Returns: seconds until the retry is due, or None when the job is settled
+    (or was claimed by someone else).
+    """
+    job = claim_job(job_id, lease)
+    if job is None: return None
+
+    # Imported here: the scraping stack (requests, urllib3) only loads in a
+    # process that actually runs an import
+    from app.external.freelancer import fetch_freelancer_rating, PROFILE_URL
+    try:
+        result = fetch_freelancer_rating(job.external_username, url_template or PROFILE_URL)
+    except Exception:
+        result = None
+
+    if result is not None:
+        record_import(job, result)
+        db.session.commit()
+        return None
+
+    job.error = "Unable to fetch profile"
+    if job.attempts >= max_attempts:
+        job.status = 'failed'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return None
+
+    delay = backoff * 2 ** (job.attempts - 1)
+    job.status = 'queued'
+    job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+    db.session.commit()
+    return delay
+
+
+class ImportQueue:
+    """
+    Small in-process worker pool for ImportJob rows. Threads start lazily on
+    the first submit, so nothing is spawned before gunicorn forks.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get("IMPORT_WORKERS", 2)
+        self.max_attempts = app.config.get("IMPORT_MAX_ATTEMPTS", 3)
+        self.backoff = app.config.get("IMPORT_RETRY_BACKOFF", 2.0)
+        self.url_template = app.config.get("FREELANCER_PROFILE_URL")
+        self.lease = app.config.get("IMPORT_LEASE", DEFAULT_LEASE)
+        app.extensions["import_queue"] = self
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="import-job")
+            return self._executor
+
+    def submit(self, job_id, delay=0):
+        if delay:
+            timer = threading.Timer(delay, self.submit, args=(job_id,))
+            timer.daemon = True
+            timer.start()
+            return
+        self._pool().submit(self._run, job_id)
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                delay = run_import_job(job_id, self.url_template, self.max_attempts, self.backoff, self.lease)
+            finally:
+                db.session.remove()
+        if delay is not None:
+            self.submit(job_id, delay)
+
+    def submit_if_due(self, job):
+        """Submits `job` when an attempt may start now, e.g. its timer died with another process."""
+        due = due_at(job, self.lease)
+        if due is not None and due <= datetime.utcnow():
+            self.submit(job.id)
+
+    def resume(self):
+        """
+        Schedules every unfinished job in the table on this process's pool:
+        queued ones when their attempt is due, running ones when their lease
+        runs out. Call when a worker starts. Returns the number scheduled.
+        """
+        with self.app.app_context():
+            try:
+                jobs = db.session.scalars(db.select(ImportJob).where(ImportJob.status.in_(ACTIVE_STATUSES))).all()
+                now = datetime.utcnow()
+                for job in jobs:
+                    self.submit(job.id, max(0.0, (due_at(job, self.lease) - now).total_seconds()))
+                return len(jobs)
+            finally:
+                db.session.remove()
+
+    def run_due(self):
+        """
+        Synchronously runs every job whose attempt is due, including running
+        ones on an expired lease. Returns the number attempted.
+        """
+        due = db.session.scalars(db.select(ImportJob.id).where(due_clause(datetime.utcnow(), self.lease))).all()
+        for job_id in due:
+            run_import_job(job_id, self.url_template, self.max_attempts, self.backoff, self.lease)
+        return len(due)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+import_queue = ImportQueue()
@@ -0,0 +1,144 @@
+from sqlalchemy import inspect, text
+from app import db
+
+# Lightweight schema upgrades for databases created before a model change.
+# db.create_all() only creates missing tables, so new columns on existing
+# tables are added here. Every step checks the live schema first, making
+# `flask upgrade-db` safe to run repeatedly and on fresh databases.
+
+
+def add_column(table, column, ddl, backfill=None):
+    """
+    `ddl` is raw SQL or a SQLAlchemy type (compiled for the live dialect).
+    `backfill(conn)` runs once, right after the column is added.
+    """
+    def step(conn):
+        if column in {c["name"] for c in inspect(conn).get_columns(table)}: return False
+        sql_type = ddl if isinstance(ddl, str) else ddl.compile(dialect=conn.dialect)
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {sql_type}'))
+        if backfill: backfill(conn)
+        return True
+    step.__name__ = f"add_column:{table}.{column}"
+    return step
+
+
+def create_index(index):
+    """
+    Creates a model-declared index on an existing table. Unique indexes
+    refuse to build over duplicate rows, so those are reported up front.
+    """
+    def step(conn):
+        table = index.table
+        if index.name in {i["name"] for i in inspect(conn).get_indexes(table.name)}: return False
+        if index.unique:
+            cols = [c for c in index.columns]
+            dupes = conn.execute(
+                db.select(db.func.count()).select_from(
+                    db.select(*cols).group_by(*cols).having(db.func.count() > 1).subquery()
+                )
+            ).scalar()
+            if dupes:
+                raise RuntimeError(f"{index.name}: {dupes} duplicate {tuple(c.name for c in cols)} groups in '{table.name}'; "
+                                   f"remove them before upgrading")
+        index.create(conn)
+        return True
+    step.__name__ = f"create_index:{index.name}"
+    return step
+
+
+def _recompute_ratings(conn):
+    from app.ratings import recompute_all_ratings
+    recompute_all_ratings(conn)
+
+
+def _compress_raw_data(conn, batch_size=500):
+    # Moves legacy raw_data text into the capped, compressed column
+    from app.models import ExternalProfile
+    table = ExternalProfile.__table__
+    rows = conn.execute(db.select(table.c.id, table.c.raw_data).where(table.c.raw_data.isnot(None))).all()
+    stmt = table.update().where(table.c.id == db.bindparam("_id")).values(raw_compressed=db.bindparam("_raw"), raw_data=None)
+    for i in range(0, len(rows), batch_size):
+        conn.execute(stmt, [{"_id": r.id, "_raw": ExternalProfile.compress_raw(r.raw_data)} for r in rows[i:i + batch_size]])
+
+
+def create_search_index(conn):
+    """Full-text index for app.search: FTS5 table on SQLite, tsvector + GIN on Postgres."""
+    from app.search import FTS_TABLE, TS_CONFIG, rebuild_search_index
+    if conn.dialect.name == "sqlite":
+        if FTS_TABLE in inspect(conn).get_table_names(): return False
+        conn.execute(text(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, description, tokenize='porter unicode61')"))
+        rebuild_search_index(conn)
+        return True
+    if conn.dialect.name == "postgresql":
+        if "search_vector" in {c["name"] for c in inspect(conn).get_columns("project")}: return False
+        conn.execute(text(
+            "ALTER TABLE project ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{TS_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'B')) STORED"
+        ))
+        conn.execute(text("CREATE INDEX ix_project_search_vector ON project USING GIN (search_vector)"))
+        return True
+    return False  # other dialects search without an index
+
+
+def populate_skill_tags(conn):
+    """Fills project_skill / user_skill (created empty by create_all) from the legacy comma strings."""
+    from app.models import Project, User, project_skill
+    from app.skills import backfill_skill_tags
+    if conn.execute(db.select(project_skill.c.project_id).limit(1)).first(): return False
+    if not (conn.execute(db.select(Project.id).where(Project.required_skills.isnot(None), Project.required_skills != '').limit(1)).first()
+            or conn.execute(db.select(User.id).where(User.skills.isnot(None), User.skills != '').limit(1)).first()): return False
+    projects, users, _ = backfill_skill_tags(conn=conn)
+    return projects + users > 0
+
+
+def populate_recommendation_index(conn):
+    """Fills open_project_skill (created empty by create_all) for databases with existing projects."""
+    from app.models import open_project_skill, project_skill
+    from app.recommendations import rebuild_open_project_index
+    if conn.execute(db.select(open_project_skill.c.project_id).limit(1)).first(): return False
+    if not conn.execute(db.select(project_skill.c.project_id).limit(1)).first(): return False
+    return rebuild_open_project_index(conn) > 0
+
+
+def populate_freelancer_stats(conn):
+    """Fills freelancer_stats / freelancer_skill_score (created empty by create_all) for databases with freelancers."""
+    from app.models import User, FreelancerStats
+    from app.freelancer_stats import rebuild_freelancer_stats
+    if conn.execute(db.select(FreelancerStats.user_id).limit(1)).first(): return False
+    if not conn.execute(db.select(User.id).where(User.is_freelancer.is_(True)).limit(1)).first(): return False
+    return rebuild_freelancer_stats(conn) > 0
+
+
+STEPS = [
+    add_column("project", "ranking_version", "INTEGER NOT NULL DEFAULT 0"),
+    add_column("user", "review_count", "INTEGER NOT NULL DEFAULT 0"),
+    add_column("user", "rating_sum", "INTEGER NOT NULL DEFAULT 0", backfill=_recompute_ratings),
+    add_column("external_profile", "raw_compressed", db.LargeBinary(), backfill=_compress_raw_data),
+    add_column("external_profile", "etag", "VARCHAR(255)"),
+    add_column("external_profile", "last_modified", "VARCHAR(64)"),
+    add_column("project", "version", "INTEGER NOT NULL DEFAULT 0"),
+    add_column("user", "version", "INTEGER NOT NULL DEFAULT 0"),
+    add_column("user", "auth_version", "INTEGER NOT NULL DEFAULT 0"),
+    add_column("import_job", "claimed_at", db.DateTime()),
+    create_search_index,
+    populate_skill_tags,  # the two below read the tags
+    populate_recommendation_index,
+    populate_freelancer_stats,
+]
+
+
+def upgrade():
+    """
+    Creates missing tables, then applies pending steps.
+    Returns: list of step names that changed the schema
+    """
+    from app import models  # noqa: F401  (register tables on the metadata)
+    db.create_all()
+    applied = []
+    with db.engine.begin() as conn:
+        # Declared indexes go last so they can cover columns added above
+        index_steps = [create_index(ix) for table in db.metadata.sorted_tables for ix in sorted(table.indexes, key=lambda i: i.name)]
+        for step in STEPS + index_steps:
+            if step(conn): applied.append(step.__name__)
+    return applied
@@ -1,7 +1,62 @@
+import zlib
 from datetime import datetime
 from app import db 
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# --- Skill tag association tables ---
+# PK covers lookups by owner; the reversed index serves "which projects have skill X"
+project_skill = db.Table(
+    'project_skill',
+    db.Column('project_id', db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_project_skill_skill_id_project_id', 'skill_id', 'project_id'),
+)
+
+user_skill = db.Table(
+    'user_skill',
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_user_skill_skill_id_user_id', 'skill_id', 'user_id'),
+)
+
+# Inverted index of *open* projects for recommendations: one posting per
+# (skill, project) carrying the project-side scoring inputs, so scoring a
+# freelancer reads only the postings of their skills. Clustered by skill on
+# SQLite. Kept in step by app.recommendations.index_open_project.
+open_project_skill = db.Table(
+    'open_project_skill',
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('project_id', db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_count', db.Integer, nullable=False),
+    db.Column('budget', db.Float, nullable=False),
+    db.Column('deadline_days', db.Integer, nullable=True),
+    db.Column('client_id', db.Integer, nullable=False),
+    db.Index('ix_open_project_skill_project_id', 'project_id'),
+    sqlite_with_rowid=False,
+)
+
+# Per-skill leaderboard postings for GET /api/freelancers/top: one row per
+# (skill, freelancer) carrying the freelancer's FreelancerStats.score, so a
+# page is one range of (skill_id, score). Kept in step by
+# app.freelancer_stats.refresh_freelancer_stats.
+freelancer_skill_score = db.Table(
+    'freelancer_skill_score',
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('score', db.Float, nullable=False),
+    db.Index('ix_freelancer_skill_score_skill_id_score', 'skill_id', 'score', 'user_id'),
+    db.Index('ix_freelancer_skill_score_user_id', 'user_id'),
+)
+
+
+class Skill(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False) # canonical lowercase
+
+    def __repr__(self):
+        return f'<Skill {self.name}>'
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -17,6 +72,12 @@ class User(db.Model):
     on_time_rate = db.Column(db.Float, default=0.0)
     portfolio_score = db.Column(db.Float, default=0.0)
 
+    # Running review aggregates; avg_rating is derived from these on each new review
+    review_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    version = db.Column(db.Integer, default=0, nullable=False) # bumped when public profile data changes (ETags)
+    auth_version = db.Column(db.Integer, default=0, nullable=False) # bumped on password change; revokes older access tokens
+
     # --- Performance Counters (NEW) ---
     projects_accepted = db.Column(db.Integer, default=0, nullable=False)
     projects_completed = db.Column(db.Integer, default=0, nullable=False)
@@ -29,9 +90,10 @@ class User(db.Model):
     bids = db.relationship('Bid', back_populates='freelancer', lazy='dynamic', cascade="all, delete-orphan", foreign_keys='Bid.freelancer_id')
     reviews_given = db.relationship('Review', foreign_keys='Review.reviewer_id', back_populates='reviewer', lazy='dynamic')
     reviews_received = db.relationship('Review', foreign_keys='Review.reviewee_id', back_populates='reviewee', lazy='dynamic')
+    skill_tags = db.relationship('Skill', secondary=user_skill, lazy='select')
 
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, method=None):
+        self.password_hash = generate_password_hash(password, method) if method else generate_password_hash(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -40,7 +102,42 @@ class User(db.Model):
         return f'<User {self.username}>'
 
 
+
+class FreelancerStats(db.Model):
+    """
+    Materialized copy of a freelancer's ranking inputs plus a leaderboard
+    score (app/freelancer_stats.py). The User counters stay the source of
+    truth; this row is re-derived from them in the same transaction.
+    """
+    __table_args__ = (
+        db.Index('ix_freelancer_stats_score', 'score', 'user_id'), # leaderboard without a skill filter
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    username = db.Column(db.String(80), nullable=False)
+    skills = db.Column(db.Text, nullable=True)
+    avg_rating = db.Column(db.Float, nullable=False, default=0.0)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    completion_rate = db.Column(db.Float, nullable=False, default=0.0)
+    on_time_rate = db.Column(db.Float, nullable=False, default=0.0)
+    portfolio_score = db.Column(db.Float, nullable=False, default=0.0)
+    projects_completed = db.Column(db.Integer, nullable=False, default=0)
+    on_time_count = db.Column(db.Integer, nullable=False, default=0)
+    delayed_count = db.Column(db.Integer, nullable=False, default=0)
+    score = db.Column(db.Float, nullable=False, default=0.0)
+
+    id = db.synonym('user_id')  # stands in for the User when ranking bids
+
+    def __repr__(self):
+        return f'<FreelancerStats {self.username}>'
+
+
 class Project(db.Model):
+    __table_args__ = (
+        db.Index('ix_project_status_created_at', 'status', 'created_at', 'id'), # open-project feed
+        db.Index('ix_project_client_id_created_at', 'client_id', 'created_at'), # client's posted projects
+        db.Index('ix_project_freelancer_id', 'freelancer_id'),
+        db.Index('ix_project_accepted_bid_id', 'accepted_bid_id'), # freelancer's accepted projects
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -48,6 +145,8 @@ class Project(db.Model):
     status = db.Column(db.String(20), default='open', nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     required_skills = db.Column(db.Text, nullable=True)
+    ranking_version = db.Column(db.Integer, default=0, nullable=False) # bumped when ranking inputs change
+    version = db.Column(db.Integer, default=0, nullable=False) # bumped when the project's public data changes (ETags)
 
     # --- Timeline Fields (NEW) ---
     deadline_days = db.Column(db.Integer, default=7) # Set by client
@@ -63,12 +162,18 @@ class Project(db.Model):
     bids = db.relationship('Bid', back_populates='project', lazy='dynamic', cascade="all, delete-orphan", foreign_keys='Bid.project_id')
     reviews = db.relationship('Review', back_populates='project', lazy='dynamic', cascade="all, delete-orphan")
     accepted_bid = db.relationship('Bid', foreign_keys=[accepted_bid_id], uselist=False, post_update=True)
+    skill_tags = db.relationship('Skill', secondary=project_skill, lazy='select')
 
     def __repr__(self):
         return f'<Project {self.title}>'
 
 
 class Bid(db.Model):
+    __table_args__ = (
+        # One bid per freelancer per project; also serves every lookup by project_id
+        db.Index('uq_bid_project_id_freelancer_id', 'project_id', 'freelancer_id', unique=True),
+        db.Index('ix_bid_freelancer_id', 'freelancer_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Float, nullable=False)
     proposal = db.Column(db.Text, nullable=False)
@@ -84,8 +189,19 @@ class Bid(db.Model):
     def __repr__(self):
         return f'<Bid {self.amount} on Project {self.project_id}>'
 
+# Deferred so it only runs when a list view asks for it via undefer()
+Project.bid_count = db.column_property(
+    db.select(db.func.count(Bid.id)).where(Bid.project_id == Project.id).correlate_except(Bid).scalar_subquery(),
+    deferred=True
+)
+
 
 class Review(db.Model):
+    __table_args__ = (
+        # One review per reviewer per project
+        db.Index('uq_review_project_id_reviewer_id', 'project_id', 'reviewer_id', unique=True),
+        db.Index('ix_review_reviewee_id_created_at', 'reviewee_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     rating = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text, nullable=True)
@@ -104,6 +220,10 @@ class Review(db.Model):
 
 class ExternalProfile(db.Model):
     __tablename__ = "external_profile"
+    __table_args__ = (
+        db.Index('ix_external_profile_user_id_provider', 'user_id', 'provider'),
+        db.Index('ix_external_profile_last_checked', 'last_checked'), # stale-profile refresh
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     provider = db.Column(db.String(50), nullable=False)
@@ -111,5 +231,53 @@ class ExternalProfile(db.Model):
     rating = db.Column(db.Float)
     reviews = db.Column(db.Integer)
     last_checked = db.Column(db.DateTime, default=datetime.utcnow)
-    raw_data = db.Column(db.Text)
-    user = db.relationship("User", backref=db.backref("external_profiles", lazy=True))
\ No newline at end of file
+    # HTTP validators from the last fetch, sent back on refresh as a conditional GET
+    etag = db.Column(db.String(255), nullable=True)
+    last_modified = db.Column(db.String(64), nullable=True)
+    # Scraped page text: deferred so profile reads never load it, zlib-compressed
+    # and capped at RAW_MAX_CHARS. raw_data is the legacy uncompressed column.
+    raw_data = db.deferred(db.Column(db.Text))
+    raw_compressed = db.deferred(db.Column(db.LargeBinary))
+    user = db.relationship("User", backref=db.backref("external_profiles", lazy=True))
+
+    RAW_MAX_CHARS = 16 * 1024
+
+    @staticmethod
+    def compress_raw(text):
+        return zlib.compress(text[:ExternalProfile.RAW_MAX_CHARS].encode("utf-8")) if text else None
+
+    @property
+    def raw_text(self):
+        if self.raw_compressed is not None:
+            return zlib.decompress(self.raw_compressed).decode("utf-8")
+        return self.raw_data
+
+    @raw_text.setter
+    def raw_text(self, text):
+        self.raw_compressed = self.compress_raw(text)
+        self.raw_data = None
+
+
+class ImportJob(db.Model):
+    """Background import of an external profile rating (see app/jobs.py)."""
+    __tablename__ = "import_job"
+    __table_args__ = (
+        db.Index('ix_import_job_user_id_status', 'user_id', 'status'),
+        db.Index('ix_import_job_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    provider = db.Column(db.String(50), nullable=False)
+    external_username = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), default='queued', nullable=False) # queued | running | succeeded | failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime, nullable=True) # start of the running attempt's lease
+    error = db.Column(db.Text, nullable=True)
+    rating = db.Column(db.Float, nullable=True)
+    reviews = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.provider}:{self.external_username} {self.status}>'
@@ -0,0 +1,71 @@
+import base64
+from datetime import datetime
+from sqlalchemy import or_, and_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(key, row_id):
+    return base64.urlsafe_b64encode(f"{key}|{row_id}".encode()).decode().rstrip("=")
+
+
+def _decode(cursor, parse_key):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return parse_key(key), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+
+
+def encode_cursor(created_at, row_id):
+    return _encode(created_at.isoformat(), row_id)
+
+
+def decode_cursor(cursor):
+    """
+    Returns: (created_at: datetime, id: int)
+    """
+    return _decode(cursor, datetime.fromisoformat)
+
+
+def encode_rank_cursor(score, row_id):
+    return _encode(repr(float(score)), row_id)  # repr round-trips the float exactly
+
+
+def decode_rank_cursor(cursor):
+    """
+    Returns: (score: float, id: int)
+    """
+    return _decode(cursor, float)
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        limit = int(value) if value is not None else default
+    except ValueError:
+        limit = default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, created_col, id_col, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Newest-first keyset pagination on (created_at, id).
+    Returns: (rows, next_cursor|None)
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.filter(or_(created_col < ts, and_(created_col == ts, id_col < row_id)))
+
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
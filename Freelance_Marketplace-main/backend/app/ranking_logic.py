@@ -1,4 +1,7 @@
-from app.models import User
+import numpy as np
+from app import db
+from app.models import User, Bid, Project, FreelancerStats
+from app.instrumentation import timed
 
 BASE_WEIGHTS = {
     "price": 0.25, "rating": 0.25, "completion_rate": 0.15,
@@ -47,63 +50,158 @@ def compute_features_for_bid(bid, freelancer, project):
     features["skill_match"] = jaccard_skill_match(p_skills, f_skills)
     return features
 
-def calculate_ranked_bids(project, bids, priority='balanced'):
-    per_bid_data = []
+def invalidate_rankings(project_id=None, freelancer_id=None, project_ids=()):
+    """
+    Bumps Project.ranking_version for one project (or several, `project_ids`)
+    and/or every project the freelancer has bid on, so cached rankings for
+    them are no longer read. Runs in the caller's transaction; caller commits.
+    """
+    bump = {"ranking_version": Project.ranking_version + 1}
+    if project_id is not None:
+        db.session.execute(db.update(Project).where(Project.id == project_id).values(bump),
+                           execution_options={"synchronize_session": False})
+    if project_ids:
+        db.session.execute(db.update(Project).where(Project.id.in_(set(project_ids))).values(bump),
+                           execution_options={"synchronize_session": False})
+    if freelancer_id is not None:
+        bid_projects = db.select(Bid.project_id).where(Bid.freelancer_id == freelancer_id)
+        db.session.execute(db.update(Project).where(Project.id.in_(bid_projects)).values(bump),
+                           execution_options={"synchronize_session": False})
+
+def load_bids_for_ranking(project_id):
+    """
+    All bids of a project paired with their bidders' FreelancerStats rows (the
+    ranking features), in a single query. A bidder without a stats row (table
+    not rebuilt yet) is paired with their User instead.
+    Returns: list of (Bid, FreelancerStats | User)
+    """
+    rows = db.session.execute(
+        db.select(Bid, FreelancerStats).outerjoin(FreelancerStats, FreelancerStats.user_id == Bid.freelancer_id)
+        .where(Bid.project_id == project_id)
+    ).all()
+    users = load_freelancers([bid for bid, stats in rows if stats is None])
+    return [(bid, stats if stats is not None else users.get(bid.freelancer_id)) for bid, stats in rows]
+
+def load_freelancers(bids):
+    """
+    Maps freelancer_id -> User. Uses eager-loaded `bid.freelancer` where present
+    and fetches the rest with one IN query instead of one get() per bidder.
+    """
     freelancers = {}
-    
+    missing = set()
     for bid in bids:
-        if bid.freelancer_id not in freelancers:
-            freelancers[bid.freelancer_id] = User.query.get(bid.freelancer_id)
-        freelancer = freelancers[bid.freelancer_id]
-        if not freelancer: continue
-        features = compute_features_for_bid(bid, freelancer, project)
-        per_bid_data.append({"bid": bid, "freelancer": freelancer, "features": features})
-
-    if not per_bid_data: return {"ranked_bids": [], "weights_applied": {}}
-
-    # Normalize
-    prices = [b["features"]["price"] for b in per_bid_data]
-    timelines = [b["features"]["timeline"] for b in per_bid_data]
-    ratings = [b["features"]["rating"] for b in per_bid_data]
-    on_time = [b["features"]["on_time_rate"] for b in per_bid_data]
-    skills = [b["features"]["skill_match"] for b in per_bid_data]
-
-    norm_price = normalize_feature_list(prices, invert=True)
-    norm_timeline = normalize_feature_list(timelines, invert=True)
-    norm_rating = normalize_feature_list(ratings)
-    norm_on_time = normalize_feature_list(on_time)
-    norm_skills = normalize_feature_list(skills)
+        # Loaded relationships live in the instance dict; reading it avoids a lazy load
+        freelancer = bid.__dict__.get('freelancer')
+        if freelancer is None:
+            missing.add(bid.freelancer_id)
+        else:
+            freelancers[bid.freelancer_id] = freelancer
+    missing -= freelancers.keys()
+    if missing:
+        freelancers.update({u.id: u for u in User.query.filter(User.id.in_(missing))})
+    return freelancers
 
-    weights = adjust_weights_for_priority(priority)
-    results = []
+# --- Vectorized engine ---
+# Same arithmetic as the per-bid helpers above, applied column-wise so
+# scores are bit-for-bit identical to the scalar path.
+
+def normalize_column(values, invert=False):
+    lo, hi = values.min(), values.max()
+    if hi == lo: return np.full(values.shape, 0.5)
+    scaled = (values - lo) / (hi - lo)
+    return 1 - scaled if invert else scaled
+
+def skill_match_column(project, freelancers):
+    """
+    Jaccard overlap per freelancer via bitsets over the project's skills,
+    which are parsed once instead of once per bid.
+    """
+    p_skills = project.required_skills.split(',') if project.required_skills else []
+    if not p_skills: return np.full(len(freelancers), 0.5)
+    bits = {s: 1 << i for i, s in enumerate({s.strip().lower() for s in p_skills})}
 
-    for i, b_data in enumerate(per_bid_data):
-        score = (
-            weights["price"] * norm_price[i] +
-            weights["rating"] * norm_rating[i] +
-            weights["timeline"] * norm_timeline[i] +
-            weights["on_time_rate"] * norm_on_time[i] +
-            weights["skill_match"] * norm_skills[i]
-        ) * 10
+    # Keyed on the raw skills string: bidders with identical skill lists share one parse
+    cache = {}
+    pairs = []
+    for freelancer in freelancers:
+        raw = freelancer.skills
+        if raw not in cache:
+            fs = {s.strip() for s in raw.lower().split(',')} if raw else set()
+            mask = 0
+            for s in fs: mask |= bits.get(s, 0)
+            common = mask.bit_count()
+            cache[raw] = (common, len(bits) + len(fs) - common)
+        pairs.append(cache[raw])
+    counts = np.array(pairs, dtype=float)
+    return counts[:, 0] / counts[:, 1]
 
+def top_k_order(scores, k=None):
+    """
+    Indices of the k best scores, highest first, ties kept in input order
+    (matches a stable descending sort). Uses argpartition when k < n.
+    """
+    key = -scores
+    candidates = np.arange(len(scores))
+    if k is not None and k < len(scores):
+        kth = key[np.argpartition(key, k - 1)[k - 1]]
+        candidates = np.flatnonzero(key <= kth)
+    order = candidates[np.lexsort((candidates, key[candidates]))]
+    return order if k is None else order[:k]
+
+def bidder_pairs(bids):
+    """(bid, freelancer) pairs from Bids, or the pairs load_bids_for_ranking already made."""
+    if bids and isinstance(bids[0], tuple):
+        return [(bid, freelancer) for bid, freelancer in bids if freelancer is not None]
+    freelancers = load_freelancers(bids)
+    return [(bid, freelancers[bid.freelancer_id]) for bid in bids if freelancers.get(bid.freelancer_id)]
+
+@timed("ranking")
+def calculate_ranked_bids(project, bids, priority='balanced', top_k=None):
+    """`bids`: Bids, or load_bids_for_ranking's (bid, freelancer stats) pairs."""
+    rows = bidder_pairs(bids)
+    if not rows: return {"ranked_bids": [], "weights_applied": {}}
+    users = [f for _, f in rows]
+
+    # One pass over the ORM objects, then everything is column arithmetic
+    columns = np.array([
+        (b.amount, b.proposed_timeline_days or 30, f.avg_rating or 0, f.on_time_rate or 0)
+        for b, f in rows
+    ], dtype=float)
+    prices, timelines, on_time = columns[:, 0], columns[:, 1], columns[:, 3]
+    ratings = columns[:, 2] / 5.0
+    skills = skill_match_column(project, users)
+
+    weights = adjust_weights_for_priority(priority)
+    scores = (
+        weights["price"] * normalize_column(prices, invert=True) +
+        weights["rating"] * normalize_column(ratings) +
+        weights["timeline"] * normalize_column(timelines, invert=True) +
+        weights["on_time_rate"] * normalize_column(on_time) +
+        weights["skill_match"] * normalize_column(skills)
+    ) * 10
+
+    # Python's round(), not np.round: the two disagree on some halfway cases
+    rounded = np.array([round(s, 1) for s in scores.tolist()])
+    results = []
+    for i in top_k_order(rounded, top_k).tolist():
+        bid, freelancer = rows[i]
         # CORRECT SERIALIZATION FOR FRONTEND
         results.append({
-            "id": b_data["bid"].id,
-            "amount": b_data["bid"].amount,
-            "proposal": b_data["bid"].proposal,
-            "proposed_timeline_days": b_data["bid"].proposed_timeline_days,
-            "created_at": b_data["bid"].created_at,
+            "id": bid.id,
+            "amount": bid.amount,
+            "proposal": bid.proposal,
+            "proposed_timeline_days": bid.proposed_timeline_days,
+            "created_at": bid.created_at,
             "freelancer": {
-                "id": b_data["freelancer"].id,
-                "username": b_data["freelancer"].username,
-                "avg_rating": b_data["freelancer"].avg_rating,
+                "id": freelancer.id,
+                "username": freelancer.username,
+                "avg_rating": freelancer.avg_rating,
                 # Stats
-                "on_time_count": b_data["freelancer"].on_time_count,
-                "delayed_count": b_data["freelancer"].delayed_count,
-                "projects_completed": b_data["freelancer"].projects_completed
+                "on_time_count": freelancer.on_time_count,
+                "delayed_count": freelancer.delayed_count,
+                "projects_completed": freelancer.projects_completed
             },
-            "score": round(score, 1)
+            "score": rounded[i].item()
         })
 
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return {"weights_applied": weights, "ranked_bids": results}
\ No newline at end of file
+    return {"weights_applied": weights, "ranked_bids": results}
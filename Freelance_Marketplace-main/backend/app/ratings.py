@@ -0,0 +1,45 @@
+from app import db
+from app.models import User, Review
+
+
+def rounded_average(total, count):
+    # Float division, then NUMERIC so round(x, 2) works on Postgres as well as SQLite
+    return db.func.round(db.cast(db.cast(total, db.Float) / count, db.Numeric), 2)
+
+
+def apply_review(reviewee_id, rating):
+    """
+    Folds one new review into the reviewee's running counters with a single
+    SQL-side UPDATE, so concurrent reviews can't lose increments.
+    Runs in the caller's transaction (same one as the Review insert).
+    """
+    new_count = User.review_count + 1
+    new_sum = User.rating_sum + rating
+    db.session.execute(
+        db.update(User).where(User.id == reviewee_id).values(
+            review_count=new_count,
+            rating_sum=new_sum,
+            avg_rating=rounded_average(new_sum, new_count),
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def recompute_all_ratings(conn=None):
+    """
+    Repair path: rebuilds every user's counters from the review table in one
+    set-based UPDATE. Users without reviews keep their avg_rating (it may be
+    seeded from an imported external rating).
+    """
+    count_q = db.select(db.func.count(Review.id)).where(Review.reviewee_id == User.id).scalar_subquery()
+    sum_q = db.select(db.func.coalesce(db.func.sum(Review.rating), 0)).where(Review.reviewee_id == User.id).scalar_subquery()
+    stmt = db.update(User.__table__).values(
+        review_count=count_q,
+        rating_sum=sum_q,
+        avg_rating=db.case((count_q > 0, rounded_average(sum_q, count_q)), else_=User.avg_rating),
+    )
+    if conn is not None:  # migration backfill: runs before later columns (e.g. version) exist
+        return conn.execute(stmt).rowcount
+    result = db.session.execute(stmt.values(version=User.version + 1))  # cached profiles/projects are stale
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,114 @@
+# app/recommendations.py
+
+from statistics import median
+
+from app import db
+from app.models import User, Project, Bid, project_skill, open_project_skill
+
+# Open projects for a freelancer, scored on the same signals the bid ranking
+# uses (compute_features_for_bid), seen from the freelancer's side:
+#   skill_match    Jaccard overlap of project and freelancer skill tags
+#   budget_fit     project budget against the freelancer's usual bid amount
+#   timeline_fit   project deadline against their usual proposed timeline
+#   client_rating  the client's avg_rating / 5
+# Candidates come from open_project_skill, so a query reads only the postings
+# of the freelancer's own skills, never the whole project table.
+
+RECOMMENDATION_WEIGHTS = {"skill_match": 0.5, "budget_fit": 0.2, "timeline_fit": 0.1, "client_rating": 0.2}
+NEUTRAL = 0.5  # fit when the freelancer has no bid history yet
+HISTORY_BIDS = 20
+DEFAULT_DEADLINE_DAYS = 7
+
+
+def index_open_project(project):
+    """
+    Re-posts one project in the open-project index: its postings are replaced,
+    or just removed once it is no longer open. Call after any change to its
+    status, skills, budget or deadline. Caller commits.
+    """
+    db.session.flush()  # ids for a new project / newly created skills
+    # Re-read from the table rather than `project`: a concurrent workflow
+    # transition may have closed it since this request loaded it
+    index_open_projects([project.id])
+
+
+def _postings():
+    """(skill_id, project_id, skill_count, budget, deadline_days, client_id) of every open project's tags."""
+    skill_count = (db.select(db.func.count()).select_from(project_skill.alias("tags"))
+                   .where(db.literal_column("tags.project_id") == Project.id).scalar_subquery())
+    return (db.select(project_skill.c.skill_id, Project.id, skill_count, Project.budget, Project.deadline_days, Project.client_id)
+            .join(Project, Project.id == project_skill.c.project_id).where(Project.status == 'open'))
+
+
+POSTING_COLUMNS = ["skill_id", "project_id", "skill_count", "budget", "deadline_days", "client_id"]
+
+
+def index_open_projects(project_ids):
+    """Set-based index_open_project for bulk writers: re-posts these projects from the table. Caller commits."""
+    if not project_ids: return
+    ids = list(project_ids)
+    db.session.execute(open_project_skill.delete().where(open_project_skill.c.project_id.in_(ids)))
+    db.session.execute(open_project_skill.insert().from_select(POSTING_COLUMNS, _postings().where(Project.id.in_(ids))))
+
+
+def rebuild_open_project_index(conn=None):
+    """
+    Rebuilds the whole index from project/project_skill in two statements.
+    Returns: number of postings written
+    """
+    own_transaction = conn is None
+    conn = conn or db.session.connection()
+    conn.execute(open_project_skill.delete())
+    written = conn.execute(open_project_skill.insert().from_select(POSTING_COLUMNS, _postings())).rowcount
+    if own_transaction: db.session.commit()
+    return written
+
+
+def freelancer_profile(user):
+    """
+    Returns: (skill_ids, typical bid amount | None, typical timeline days | None)
+    from the user's tags and their most recent bids.
+    """
+    recent = db.session.execute(
+        db.select(Bid.amount, Bid.proposed_timeline_days).where(Bid.freelancer_id == user.id)
+        .order_by(Bid.id.desc()).limit(HISTORY_BIDS)
+    ).all()
+    amounts = [a for a, _ in recent if a]
+    days = [d for _, d in recent if d]
+    return ([s.id for s in user.skill_tags], median(amounts) if amounts else None, median(days) if days else None)
+
+
+def fit(value, typical):
+    """1.0 at or above `typical`, scaling down linearly below it; NEUTRAL without history."""
+    if typical is None: return db.literal(NEUTRAL)
+    return db.case((value >= typical, 1.0), else_=value * 1.0 / typical)
+
+
+def recommend_projects(user, limit=20):
+    """
+    Best open projects for `user` that they haven't bid on, highest score first.
+    Returns: list of rows (project_id, score, skill_match, budget_fit, timeline_fit, client_rating)
+    """
+    skill_ids, typical_amount, typical_days = freelancer_profile(user)
+    if not skill_ids: return []
+
+    ops = open_project_skill.c
+    candidates = (
+        db.select(ops.project_id, db.func.count().label("common"), ops.skill_count, ops.budget, ops.deadline_days, ops.client_id)
+        .where(ops.skill_id.in_(skill_ids), ops.client_id != user.id,
+               ops.project_id.not_in(db.select(Bid.project_id).where(Bid.freelancer_id == user.id)))
+        .group_by(ops.project_id, ops.skill_count, ops.budget, ops.deadline_days, ops.client_id)
+        .subquery("candidates")
+    )
+    c = candidates.c
+    features = {
+        "skill_match": c.common * 1.0 / (c.skill_count + len(skill_ids) - c.common),
+        "budget_fit": fit(c.budget, typical_amount),
+        "timeline_fit": fit(db.func.coalesce(c.deadline_days, DEFAULT_DEADLINE_DAYS), typical_days),
+        "client_rating": db.func.coalesce(User.avg_rating, 0.0) / 5.0,
+    }
+    score = sum((RECOMMENDATION_WEIGHTS[k] * features[k] for k in RECOMMENDATION_WEIGHTS), db.literal(0.0))
+    stmt = (db.select(c.project_id, score.label("score"), *(v.label(k) for k, v in features.items()))
+            .join(User, User.id == c.client_id)
+            .order_by(db.desc("score"), c.project_id.desc()).limit(limit))
+    return db.session.execute(stmt).all()
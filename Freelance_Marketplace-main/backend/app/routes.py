@@ -1,13 +1,30 @@
-from flask import Blueprint, request, jsonify
-from app import db
-from app.models import User, Project, Bid, Review, ExternalProfile
-from app.schemas import UserSchema, ProjectSchema, BidSchema, ReviewSchema
-from werkzeug.security import generate_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from sqlalchemy import or_
-from app.ranking_logic import calculate_ranked_bids
-from app.external.freelancer import fetch_freelancer_rating
-from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app, make_response
+from app import db, ranking_cache, pool_monitor
+from app.models import User, Project, Bid, Review, ExternalProfile, ImportJob
+from app.schemas import (UserSchema, ProjectSchema, BidSchema, ReviewSchema, ProjectListSchema, ProjectSummarySchema, ReviewSummarySchema,
+                         FreelancerStatsSchema)
+from app.pagination import keyset_page, parse_limit, InvalidCursor
+from app.skills import sync_skill_tags, filter_by_skills
+from app.search import parse_terms, search_query, ranked_page, index_project
+from app.recommendations import recommend_projects, index_open_project
+from app.freelancer_stats import refresh_freelancer_stats, top_freelancers
+from app.ratings import apply_review
+from app.serializers import fast_dump, json_response
+from app.bulk import parse_rows, create_projects, place_bids
+from app.auth import token_auth, LoginBusy
+from app.instrumentation import metrics_endpoint
+from app.events import event_broker, bid_added, status_changed, review_posted
+from app.workflow import transition, conflict_message, record_acceptance, record_completion
+from app.http_cache import (bump_versions, not_modified, cached, project_etag, profile_etag, feed_stamp_query, feed_etag,
+                            FEED_CACHE_CONTROL, DETAILS_CACHE_CONTROL, PROFILE_CACHE_CONTROL)
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only, undefer
+from functools import lru_cache
+from app.ranking_logic import calculate_ranked_bids, load_bids_for_ranking, invalidate_rankings
+from app.jobs import import_queue, ACTIVE_STATUSES
+from datetime import datetime
 
 # Initialize Schemas
 user_schema = UserSchema()
@@ -18,21 +35,48 @@ bid_schema = BidSchema()
 bids_schema = BidSchema(many=True)
 review_schema = ReviewSchema()
 reviews_schema = ReviewSchema(many=True)
+profile_user_schema = UserSchema(exclude=("reviews_received",))
+project_summaries_schema = ProjectSummarySchema(many=True)
+project_details_schema = ProjectSchema(exclude=("bids", "reviews"))  # the route dumps those lists itself
+review_summaries_schema = ReviewSummarySchema(many=True)
+leaderboard_schema = FreelancerStatsSchema(many=True)
 
 api_bp = Blueprint('api', __name__)
 
+FEED_FIELDS = ProjectListSchema.Meta.fields
+
+@lru_cache(maxsize=64)
+def feed_schema(only):
+    return ProjectListSchema(many=True, only=only)
+
 def get_user_from_jwt():
     user_id = get_jwt_identity()
     return User.query.get(user_id)
 
-def update_user_ranking(user_id):
-    user = User.query.get(user_id)
-    if not user: return
-    reviews = user.reviews_received.all()
-    if reviews:
-        total_rating = sum(r.rating for r in reviews)
-        user.avg_rating = round(total_rating / len(reviews), 2)
-    db.session.commit()
+def update_user_ranking(user_id, rating):
+    # Incremental: no review rescan, no commit of its own (caller's transaction)
+    apply_review(user_id, rating)
+    invalidate_rankings(freelancer_id=user_id)
+    refresh_freelancer_stats([user_id])
+
+def batch_rows():
+    """
+    Rows of a batch request: a JSON array, or NDJSON (application/x-ndjson).
+    Returns: (rows, None) or (None, error response)
+    """
+    ndjson = request.mimetype in ("application/x-ndjson", "application/ndjson")
+    try:
+        rows = parse_rows(request.get_data(as_text=True), ndjson)
+    except ValueError:
+        return None, (jsonify({"msg": "Expected a JSON array or NDJSON rows"}), 400)
+    if len(rows) > current_app.config["BULK_MAX_ROWS"]:
+        return None, (jsonify({"msg": f"At most {current_app.config['BULK_MAX_ROWS']} rows per request"}), 413)
+    return rows, None
+
+def batch_response(summary):
+    # 201 all created, 207 some rows failed, 400 none created
+    status = 201 if not summary["failed"] else 207 if summary["created"] else 400
+    return jsonify(summary), status
 
 # --- AUTH ---
 @api_bp.route('/auth/register', methods=['POST'])
@@ -41,8 +85,11 @@ def register():
     if User.query.filter_by(email=data['email']).first() or User.query.filter_by(username=data['username']).first():
         return jsonify({"msg": "Email or username already exists"}), 400
     new_user = User(username=data['username'], email=data['email'], is_freelancer=data.get('is_freelancer', False))
-    new_user.set_password(data['password'])
+    new_user.set_password(data['password'], current_app.config.get('PASSWORD_HASH_METHOD'))
     db.session.add(new_user)
+    if new_user.is_freelancer:
+        db.session.flush()  # id
+        refresh_freelancer_stats([new_user.id])
     db.session.commit()
     return user_schema.dump(new_user), 201
 
@@ -50,54 +97,95 @@ def register():
 def login():
     data = request.get_json()
     user = User.query.filter_by(email=data['email']).first()
-    if user and user.check_password(data['password']):
-        access_token = create_access_token(identity=str(user.id))
-        return jsonify(access_token=access_token, user=user_schema.dump(user)), 200
+    try:
+        valid = user is not None and token_auth.check_password(user, data['password'])
+    except LoginBusy:
+        return jsonify({"msg": "Too many logins in progress, try again shortly"}), 429, {"Retry-After": "1"}
+    if valid:
+        if token_auth.needs_rehash(user):  # PASSWORD_HASH_METHOD changed since this hash was made
+            user.set_password(data['password'], current_app.config['PASSWORD_HASH_METHOD'])
+            db.session.commit()
+        return jsonify(access_token=token_auth.issue_token(user), user=user_schema.dump(user)), 200
     return jsonify({"msg": "Bad username or password"}), 401
 
 # --- USER ---
 @api_bp.route('/user/<int:id>', methods=['GET'])
 def get_user_profile(id):
-    user = User.query.get_or_404(id)
-    user_data = user_schema.dump(user)
+    etag = profile_etag(id)
+    resp = not_modified(etag, PROFILE_CACHE_CONTROL)
+    if resp: return resp
+
+    # Three queries regardless of history size: user + external profile,
+    # one page of projects (client joined), one page of reviews (reviewer + project joined)
+    row = db.session.query(User, ExternalProfile).outerjoin(
+        ExternalProfile, and_(ExternalProfile.user_id == User.id, ExternalProfile.provider == 'freelancer')
+    ).filter(User.id == id).first()
+    if not row: return jsonify({"msg": "Not found"}), 404
+    user, ext = row
+    user_data = fast_dump(profile_user_schema, user)
     
     # Inject External Profile
-    ext = ExternalProfile.query.filter_by(user_id=user.id, provider='freelancer').first()
     if ext:
         user_data['freelancer_username'] = ext.external_username
         user_data['external_rating'] = ext.rating
         user_data['external_reviews_count'] = ext.reviews
-    
-    if user.is_freelancer:
-        accepted_projects = Project.query.join(Bid, Project.accepted_bid_id == Bid.id).filter(Bid.freelancer_id == user.id).order_by(Project.created_at.desc()).all()
-        user_data['accepted_projects'] = projects_schema.dump(accepted_projects)
-    else:
-        posted_projects = user.projects_as_client.order_by(Project.created_at.desc()).all()
-        user_data['posted_projects'] = projects_schema.dump(posted_projects)
-        
-    user_data['reviews_received'] = reviews_schema.dump(user.reviews_received.order_by(Review.created_at.desc()).all())
-    return jsonify(user_data), 200
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        projects_query = Project.query.options(joinedload(Project.client))
+        if user.is_freelancer:
+            projects_query = projects_query.join(Bid, Project.accepted_bid_id == Bid.id).filter(Bid.freelancer_id == user.id)
+        else:
+            projects_query = projects_query.filter(Project.client_id == user.id)
+        projects, projects_cursor = keyset_page(projects_query, Project.created_at, Project.id, request.args.get('projects_cursor'), limit)
+
+        reviews_query = Review.query.filter(Review.reviewee_id == user.id).options(
+            joinedload(Review.reviewer), joinedload(Review.project).load_only(Project.id, Project.title)
+        )
+        reviews, reviews_cursor = keyset_page(reviews_query, Review.created_at, Review.id, request.args.get('reviews_cursor'), limit)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    user_data['accepted_projects' if user.is_freelancer else 'posted_projects'] = fast_dump(project_summaries_schema, projects)
+    user_data['reviews_received'] = fast_dump(review_summaries_schema, reviews)
+    user_data['next_cursors'] = {"projects": projects_cursor, "reviews": reviews_cursor}
+    return cached(json_response(user_data), etag, PROFILE_CACHE_CONTROL)
 
 @api_bp.route('/user/profile', methods=['GET', 'PUT'])
 @jwt_required()
 def my_profile():
-    user = get_user_from_jwt()
     if request.method == 'GET':
-        # Re-use logic from get_user_profile but for current user
-        return get_user_profile(user.id)
+        # Re-use logic from get_user_profile but for current user; this URL
+        # is the same for every user, so it must never sit in a shared cache
+        resp = make_response(get_user_profile(token_auth.current_identity().id))
+        if resp.status_code in (200, 304):  # errors (bad cursor, 404) pass through as they are
+            resp.headers['Cache-Control'] = "private, no-cache"
+            resp.vary.add('Authorization')
+        return resp
 
     if request.method == 'PUT':
+        user = get_user_from_jwt()
         data = request.get_json()
         user.bio = data.get('bio', user.bio)
-        user.skills = data.get('skills', user.skills)
-        if 'password' in data: user.set_password(data['password'])
+        if 'skills' in data:
+            user.skills = data['skills']
+            sync_skill_tags(user, user.skills)
+            invalidate_rankings(freelancer_id=user.id)
+            refresh_freelancer_stats([user.id])  # skills feed the ranking and the per-skill leaderboard
+        if 'password' in data:
+            user.set_password(data['password'], current_app.config.get('PASSWORD_HASH_METHOD'))
+            user.auth_version = (user.auth_version or 0) + 1  # revokes every token issued before
+        bump_versions(user_ids=[user.id])
         db.session.commit()
-        return user_schema.dump(user), 200
+        token_auth.invalidate(user.id)
+        body = user_schema.dump(user)
+        if 'password' in data: body['access_token'] = token_auth.issue_token(user)  # the caller's own token was just revoked
+        return body, 200
 
 @api_bp.route("/user/import_freelancer_rating", methods=["POST"])
 @jwt_required()
 def import_freelancer_rating():
-    user = get_user_from_jwt()
+    user = token_auth.current_identity()
     data = request.get_json() or {}
     freelancer_name = data.get("username")
     if not freelancer_name: return jsonify({"error": "username is required"}), 400
@@ -105,32 +193,115 @@ def import_freelancer_rating():
     existing = ExternalProfile.query.filter_by(user_id=user.id, provider="freelancer").first()
     if existing: return jsonify({"ok": False, "error": "Already imported."}), 400
 
-    result = fetch_freelancer_rating(freelancer_name)
-    if not result: return jsonify({"error": "Unable to fetch profile"}), 404
+    # Scraping runs on the import worker pool; the client polls the job
+    job = ImportJob.query.filter(ImportJob.user_id == user.id, ImportJob.provider == "freelancer", ImportJob.status.in_(ACTIVE_STATUSES)).first()
+    if not job:
+        job = ImportJob(user_id=user.id, provider="freelancer", external_username=freelancer_name)
+        db.session.add(job)
+        db.session.commit()
+        import_queue.submit(job.id)
+    else:
+        import_queue.submit_if_due(job)  # its timer or worker may be gone
+    return jsonify({"ok": True, "job_id": job.id, "status": job.status}), 202
 
-    new_ext = ExternalProfile(user_id=user.id, provider="freelancer", external_username=freelancer_name, rating=result["rating"], reviews=result["reviews"], raw_data=result.get("raw", ""))
-    db.session.add(new_ext)
-    if result["rating"] and (not user.avg_rating or user.avg_rating == 0.0):
-        user.avg_rating = float(result["rating"])
-    db.session.commit()
-    return jsonify({"ok": True, "rating": result["rating"]}), 200
+@api_bp.route("/user/import_jobs/<int:job_id>", methods=["GET"])
+@jwt_required()
+def import_job_status(job_id):
+    user = token_auth.current_identity()
+    job = ImportJob.query.get_or_404(job_id)
+    if job.user_id != user.id: return jsonify({"msg": "Not authorized"}), 403
+    return jsonify({
+        "job_id": job.id, "status": job.status, "attempts": job.attempts,
+        "rating": job.rating, "reviews": job.reviews, "error": job.error
+    }), 200
 
 # --- PROJECTS ---
 @api_bp.route('/projects', methods=['GET'])
 def get_projects():
     try:
-        skill_query = request.args.get('skill')
+        # ?skill=python,flask or repeated ?skill=; ?match=all requires every tag
+        skill_query = [s for arg in request.args.getlist('skill') for s in arg.split(',')]
+        requested = request.args.get('fields')
+        only = tuple(sorted({f.strip() for f in requested.split(',') if f.strip()})) if requested else FEED_FIELDS
+        unknown = set(only) - set(FEED_FIELDS)
+        if unknown: return jsonify({"error": f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+
         query = Project.query.filter_by(status='open')
         if skill_query:
-            query = query.filter(Project.required_skills.like(f"%{skill_query}%"))
-        return projects_schema.dump(query.order_by(Project.created_at.desc()).all()), 200
+            query = filter_by_skills(query, skill_query, match_all=request.args.get('match') == 'all')
+        cursor, limit = request.args.get('cursor'), parse_limit(request.args.get('limit'))
+
+        # Revalidation: the same page, but only ids and version stamps
+        if request.if_none_match:
+            stamps, _ = keyset_page(feed_stamp_query(query, only), Project.created_at, Project.id, cursor, limit)
+            resp = not_modified(feed_etag(only, stamps), FEED_CACHE_CONTROL)
+            if resp: return resp
+
+        # One SELECT per page: client joined in, bid count as a correlated subquery
+        columns = [getattr(Project, f) for f in only if f not in ("client", "bid_count")]
+        query = query.options(load_only(Project.id, Project.created_at, Project.version, *columns))
+        if "client" in only: query = query.options(joinedload(Project.client))
+        if "bid_count" in only: query = query.options(undefer(Project.bid_count))
+
+        projects, next_cursor = keyset_page(query, Project.created_at, Project.id, cursor, limit)
+        if "client" in only:
+            stamps = [(p.id, p.created_at, p.version, p.client.version) for p in projects]
+        else:
+            stamps = [(p.id, p.created_at, p.version) for p in projects]
+        resp = cached(json_response(fast_dump(feed_schema(only), projects)), feed_etag(only, stamps), FEED_CACHE_CONTROL)
+        if next_cursor: resp.headers['X-Next-Cursor'] = next_cursor
+        return resp, 200
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api_bp.route('/projects/search', methods=['GET'])
+def search_projects():
+    # ?q=words (all must match, last one as a prefix), best match first.
+    # Filters: min_budget, max_budget, status (default open; "any" for all), skill/match as in the feed
+    terms = parse_terms(request.args.get('q'))
+    if not terms: return jsonify({"error": "q is required"}), 400
+    try:
+        query, score = search_query(terms)
+        statuses = [s for s in request.args.get('status', 'open').split(',') if s]
+        if 'any' not in statuses: query = query.filter(Project.status.in_(statuses))
+        min_budget, max_budget = request.args.get('min_budget', type=float), request.args.get('max_budget', type=float)
+        if min_budget is not None: query = query.filter(Project.budget >= min_budget)
+        if max_budget is not None: query = query.filter(Project.budget <= max_budget)
+        skill_query = [s for arg in request.args.getlist('skill') for s in arg.split(',')]
+        if skill_query:
+            query = filter_by_skills(query, skill_query, match_all=request.args.get('match') == 'all')
+
+        query = query.options(joinedload(Project.client), undefer(Project.bid_count))
+        rows, next_cursor = ranked_page(query, score, request.args.get('cursor'), parse_limit(request.args.get('limit')))
+        resp = json_response(fast_dump(feed_schema(FEED_FIELDS), [project for project, _ in rows]))
+        if next_cursor: resp.headers['X-Next-Cursor'] = next_cursor
+        return resp, 200
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+@api_bp.route('/recommendations', methods=['GET'])
+@jwt_required()
+def recommendations():
+    user = get_user_from_jwt()  # scored against the full profile
+    if not user.is_freelancer: return jsonify({"msg": "Only freelancers get recommendations"}), 403
+    rows = recommend_projects(user, parse_limit(request.args.get('limit')))
+    projects = Project.query.filter(Project.id.in_([r.project_id for r in rows])) \
+        .options(joinedload(Project.client), undefer(Project.bid_count)).all()
+    entries = dict(zip((p.id for p in projects), fast_dump(feed_schema(FEED_FIELDS), projects)))
+    results = []
+    for row in rows:
+        entry = entries[row.project_id]
+        entry["score"] = round(row.score * 10, 1)
+        entry["match"] = {k: round(getattr(row, k), 2) for k in ("skill_match", "budget_fit", "timeline_fit", "client_rating")}
+        results.append(entry)
+    return json_response(results)
+
 @api_bp.route('/projects', methods=['POST'])
 @jwt_required()
 def create_project():
-    user = get_user_from_jwt()
+    user = token_auth.current_identity()
     if user.is_freelancer: return jsonify({"msg": "Only clients can post"}), 403
     data = request.get_json()
     
@@ -146,39 +317,71 @@ def create_project():
         required_skills=data.get('required_skills'),
         deadline_days=deadline
     )
+    sync_skill_tags(new_project, new_project.required_skills)
     db.session.add(new_project)
+    index_project(new_project)
+    index_open_project(new_project)
+    bump_versions(user_ids=[user.id])  # client's posted projects
     db.session.commit()
     return project_schema.dump(new_project), 201
 
+@api_bp.route('/projects/batch', methods=['POST'])
+@jwt_required()
+def create_projects_batch():
+    user = token_auth.current_identity()
+    if user.is_freelancer: return jsonify({"msg": "Only clients can post"}), 403
+    rows, error = batch_rows()
+    if error: return error
+    return batch_response(create_projects(rows, user.id, current_app.config["BULK_CHUNK_SIZE"]))
+
 # --- REPLACE THE OLD 'project_handler' WITH THESE TWO FUNCTIONS ---
 
 @api_bp.route('/project/<int:id>', methods=['GET'])
 @jwt_required(optional=True)  # Allows guests to view projects
 def get_project_details(id):
-    project = Project.query.get_or_404(id)
-    return project_schema.dump(project), 200
+    etag = project_etag(id)
+    resp = not_modified(etag, DETAILS_CACHE_CONTROL)
+    if resp: return resp
+
+    project = Project.query.options(joinedload(Project.client), joinedload(Project.freelancer)).get_or_404(id)
+    # bids/reviews are dynamic relationships (no eager loading): one query each,
+    # authors joined in, dumped from these lists rather than through the relationship
+    bids = Bid.query.filter_by(project_id=id).options(joinedload(Bid.freelancer)).order_by(Bid.id).all()
+    reviews = Review.query.filter_by(project_id=id).options(joinedload(Review.reviewer), joinedload(Review.reviewee)).order_by(Review.id).all()
+    project_data = fast_dump(project_details_schema, project)
+    project_data['bids'] = fast_dump(bids_schema, bids)
+    project_data['reviews'] = fast_dump(reviews_schema, reviews)
+    return cached(json_response(project_data), etag, DETAILS_CACHE_CONTROL)
 
 @api_bp.route('/project/<int:id>', methods=['PUT'])
 @jwt_required()  # <--- STRICT: Only logged-in users can edit
 def update_project_details(id):
     project = Project.query.get_or_404(id)
-    user = get_user_from_jwt()
+    user = token_auth.current_identity()
 
     if project.client_id != user.id:
         return jsonify({"msg": "Not authorized"}), 403
 
     data = request.get_json()
+    # Status only moves through the workflow routes (accept_bid, complete, ...)
+    if data.get('status', project.status) != project.status:
+        return jsonify({"msg": "Status can't be edited directly"}), 409
     
     # Update fields
     project.title = data.get('title', project.title)
     project.description = data.get('description', project.description)
     project.budget = data.get('budget', project.budget)
-    project.status = data.get('status', project.status)
-    project.required_skills = data.get('required_skills', project.required_skills)
+    if 'required_skills' in data:
+        project.required_skills = data['required_skills']
+        sync_skill_tags(project, project.required_skills)
+        invalidate_rankings(project_id=project.id)
     
     if 'deadline_days' in data:
         project.deadline_days = int(data['deadline_days'])
 
+    if 'title' in data or 'description' in data: index_project(project)
+    index_open_project(project)
+    bump_versions([project.id], [project.client_id, project.freelancer_id])
     db.session.commit()
     return project_schema.dump(project), 200
 
@@ -186,7 +389,7 @@ def update_project_details(id):
 @api_bp.route('/project/<int:id>/bid', methods=['POST'])
 @jwt_required()
 def place_bid(id):
-    user = get_user_from_jwt()
+    user = token_auth.current_identity()
     project = Project.query.get_or_404(id)
     if not user.is_freelancer: return jsonify({"msg": "Only freelancers can bid"}), 403
     if project.status != 'open': return jsonify({"msg": "Project not open"}), 400
@@ -197,72 +400,177 @@ def place_bid(id):
     data = request.get_json()
     new_bid = Bid(amount=data['amount'], proposal=data['proposal'], project_id=id, freelancer_id=user.id, proposed_timeline_days=data.get('proposed_timeline_days'))
     db.session.add(new_bid)
-    db.session.commit()
-    return bid_schema.dump(new_bid), 201
+    invalidate_rankings(project_id=id)
+    bump_versions([id])
+    client_id = project.client_id
+    try:
+        db.session.commit()
+    except IntegrityError: # concurrent duplicate caught by uq_bid_project_id_freelancer_id
+        db.session.rollback()
+        return jsonify({"msg": "Already bid"}), 400
+    body = bid_schema.dump(new_bid)
+    bid_added(new_bid, new_bid.freelancer, client_id)
+    return body, 201
+
+@api_bp.route('/bids/batch', methods=['POST'])
+@jwt_required()
+def place_bids_batch():
+    user = token_auth.current_identity()
+    if not user.is_freelancer: return jsonify({"msg": "Only freelancers can bid"}), 403
+    rows, error = batch_rows()
+    if error: return error
+    return batch_response(place_bids(rows, user.id, current_app.config["BULK_CHUNK_SIZE"]))
 
 @api_bp.route('/project/<int:id>/accept_bid', methods=['POST'])
 @jwt_required()
 def accept_bid(id):
     project = Project.query.get_or_404(id)
-    user = get_user_from_jwt()
+    user = token_auth.current_identity()
     if project.client_id != user.id: return jsonify({"msg": "Not authorized"}), 403
     
     data = request.get_json()
-    bid = Bid.query.get_or_404(data.get('bid_id'))
-    
-    freelancer = User.query.get(bid.freelancer_id)
-    if freelancer: freelancer.projects_accepted += 1
+    bid = Bid.query.filter_by(id=data.get('bid_id'), project_id=project.id).first_or_404()
     
-    project.freelancer_id = bid.freelancer_id
-    project.status = 'in_progress'
-    project.accepted_bid_id = bid.id
-    project.started_at = datetime.utcnow() # START TIMER
+    # Only the first accept of an open project gets past this
+    if not transition(project, "accept_bid", freelancer_id=bid.freelancer_id, accepted_bid_id=bid.id,
+                      started_at=datetime.utcnow()):  # START TIMER
+        return jsonify({"msg": conflict_message("accept_bid")}), 409
+    record_acceptance(bid.freelancer_id)
+    invalidate_rankings(project_id=project.id)
+    bump_versions([project.id], [project.client_id, bid.freelancer_id])
+    index_open_project(project)  # no longer open: drops out of recommendations
     
     db.session.commit() 
+    status_changed(project)
     return project_schema.dump(project), 200
 
 @api_bp.route('/project/<int:id>/complete', methods=['POST'])
 @jwt_required()
 def freelancer_complete_project(id):
     project = Project.query.get_or_404(id)
-    user = get_user_from_jwt()
+    user = token_auth.current_identity()
     if project.freelancer_id != user.id: return jsonify({"msg": "Not authorized"}), 403
     
-    project.completed_at = datetime.utcnow()
-    
-    # Calculate On-Time vs Delayed
-    if project.started_at and project.deadline_days:
-        expected = project.started_at + timedelta(days=project.deadline_days)
-        if project.completed_at <= expected:
-            user.on_time_count += 1
-        else:
-            user.delayed_count += 1
-        
-        total = user.on_time_count + user.delayed_count
-        if total > 0:
-            user.on_time_rate = round((user.on_time_count / total) * 100, 1)
+    # Submit work for review; on-time vs delayed is counted once the client approves
+    if not transition(project, "submit_work", completed_at=datetime.utcnow()):
+        return jsonify({"msg": conflict_message("submit_work")}), 409
+    bump_versions([project.id], [project.client_id, user.id])
+    db.session.commit()
+    status_changed(project)
+    return project_schema.dump(project), 200
+
+@api_bp.route('/project/<int:id>/request_revision', methods=['POST'])
+@jwt_required()
+def request_revision(id):
+    project = Project.query.get_or_404(id)
+    user = token_auth.current_identity()
+    if project.client_id != user.id: return jsonify({"msg": "Not authorized"}), 403
 
-    project.status = 'pending_review'
+    if not transition(project, "request_revision"):
+        return jsonify({"msg": conflict_message("request_revision")}), 409
+    bump_versions([project.id], [project.client_id, project.freelancer_id])
     db.session.commit()
+    status_changed(project)
     return project_schema.dump(project), 200
 
+@api_bp.route('/project/<int:id>/accept', methods=['POST'])
+@jwt_required()
+def approve_work(id):
+    project = Project.query.get_or_404(id)
+    user = token_auth.current_identity()
+    if project.client_id != user.id: return jsonify({"msg": "Not authorized"}), 403
+
+    if not transition(project, "approve_work"):
+        return jsonify({"msg": conflict_message("approve_work")}), 409
+    record_completion(project)
+    invalidate_rankings(freelancer_id=project.freelancer_id)
+    refresh_freelancer_stats([project.freelancer_id])
+    bump_versions([project.id], [project.client_id, project.freelancer_id])
+    db.session.commit()
+    status_changed(project)
+    return project_schema.dump(project), 200
+
+@api_bp.route('/freelancers/top', methods=['GET'])
+def freelancer_leaderboard():
+    # ?skill=python (one tag), keyset-paginated with ?cursor= / X-Next-Cursor, best score first
+    try:
+        rows, next_cursor = top_freelancers(request.args.get('skill'), request.args.get('cursor'),
+                                            parse_limit(request.args.get('limit')))
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    resp = json_response(fast_dump(leaderboard_schema, rows))
+    if next_cursor: resp.headers['X-Next-Cursor'] = next_cursor
+    return resp, 200
+
 @api_bp.route('/rank_bids', methods=['POST'])
 def rank_bids():
     data = request.get_json()
     project = Project.query.get(data.get('project_id'))
     if not project: return jsonify({"error": "Project not found"}), 404
-    bids = Bid.query.filter_by(project_id=project.id).all()
-    
-    ranking_data = calculate_ranked_bids(project, bids, data.get('priority', 'balanced'))
-    if "error" in ranking_data: return jsonify(ranking_data), 404
-    return jsonify(ranking_data), 200
+    priority = data.get('priority', 'balanced')
+    top_k = data.get('limit')  # omitted/null = every bid
+    if isinstance(top_k, str) and top_k.strip().isdigit(): top_k = int(top_k)
+    if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    # Cached as the serialized body; the key carries the project's ranking_version
+    key = ranking_cache.make_key(project.id, project.ranking_version, priority, top_k)
+    body = ranking_cache.get(key)
+    if body is None:
+        bids = load_bids_for_ranking(project.id)
+        ranking_data = calculate_ranked_bids(project, bids, priority, top_k)
+        if "error" in ranking_data: return jsonify(ranking_data), 404
+        body = jsonify(ranking_data).get_data()
+        ranking_cache.set(key, body)
+    return current_app.response_class(body, mimetype='application/json'), 200
+
+@api_bp.route('/rank_bids/cache_stats', methods=['GET'])
+@metrics_endpoint
+def rank_bids_cache_stats():
+    return jsonify(ranking_cache.stats()), 200
+
+@api_bp.route('/metrics/db_pool', methods=['GET'])
+@metrics_endpoint
+def db_pool_stats():
+    return jsonify(pool_monitor.stats()), 200
+
+@api_bp.route('/metrics/identity_cache', methods=['GET'])
+@metrics_endpoint
+def identity_cache_stats():
+    return jsonify(token_auth.stats()), 200
+
+@api_bp.route('/metrics/events', methods=['GET'])
+@metrics_endpoint
+def events_stats():
+    return jsonify(event_broker.stats()), 200
+
+# --- LIVE UPDATES (server-sent events, app/events.py) ---
+def event_stream(channel):
+    if not event_broker.reserve():
+        return '', 204  # sync workers, or this worker's streams are full: EventSource stops reconnecting
+    # The generator runs after the request context is gone: it never touches the DB
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    response = current_app.response_class(event_broker.stream(channel, last_event_id), mimetype='text/event-stream',
+                                          headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(event_broker.release)  # also when the stream never started
+    return response
+
+@api_bp.route('/project/<int:id>/events', methods=['GET'])
+def project_events(id):
+    if db.session.get(Project, id) is None: return jsonify({"msg": "Project not found"}), 404
+    return event_stream(f"project:{id}")
+
+@api_bp.route('/user/events', methods=['GET'])
+@jwt_required(locations=["headers", "query_string"])  # EventSource can't set headers: ?jwt=<access token>
+def user_events():
+    return event_stream(f"user:{token_auth.current_identity().id}")
 
 # --- REVIEWS (POST ONLY AFTER COMPLETION) ---
 @api_bp.route('/project/<int:id>/review', methods=['POST'])
 @jwt_required()
 def post_review(id):
     project = Project.query.get_or_404(id)
-    user = get_user_from_jwt()
+    user = token_auth.current_identity()
     data = request.get_json()
     
     # Check if project is truly completed by client (or pending review if allowing early reviews)
@@ -282,6 +590,12 @@ def post_review(id):
 
     review = Review(rating=data['rating'], comment=data.get('comment'), project_id=id, reviewer_id=user.id, reviewee_id=reviewee_id)
     db.session.add(review)
-    db.session.commit()
-    update_user_ranking(reviewee_id)
+    update_user_ranking(reviewee_id, review.rating)
+    bump_versions([id], [reviewee_id])
+    try:
+        db.session.commit()
+    except IntegrityError: # concurrent duplicate caught by uq_review_project_id_reviewer_id
+        db.session.rollback()
+        return jsonify({"msg": "Already reviewed"}), 400
+    review_posted(review)
     return review_schema.dump(review), 201
\ No newline at end of file
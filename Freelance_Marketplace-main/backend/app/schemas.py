@@ -1,8 +1,15 @@
 from app import ma
-from app.models import User, Project, Bid, Review
+from app.models import User, Project, Bid, Review, FreelancerStats
+from app.instrumentation import timed
 from marshmallow import fields
 
-class UserPublicSchema(ma.SQLAlchemyAutoSchema):
+class AutoSchema(ma.SQLAlchemyAutoSchema):
+    """Base for the schemas below: dumps count as "serialize" time when instrumentation is on."""
+    @timed("serialize")
+    def dump(self, obj, *, many=None):
+        return super().dump(obj, many=many)
+
+class UserPublicSchema(AutoSchema):
     class Meta:
         model = User
         fields = (
@@ -12,7 +19,12 @@ class UserPublicSchema(ma.SQLAlchemyAutoSchema):
             "on_time_count", "delayed_count", "projects_completed"
         )
 
-class BidSchema(ma.SQLAlchemyAutoSchema):
+class UserSummarySchema(AutoSchema):
+    class Meta:
+        model = User
+        fields = ("id", "username", "avg_rating")
+
+class BidSchema(AutoSchema):
     freelancer = fields.Nested(UserPublicSchema)
     class Meta:
         model = Bid
@@ -20,7 +32,7 @@ class BidSchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
         fields = ("id", "amount", "proposal", "created_at", "proposed_timeline_days", "project_id", "freelancer", "freelancer_id")
 
-class ReviewSchema(ma.SQLAlchemyAutoSchema):
+class ReviewSchema(AutoSchema):
     reviewer = fields.Nested(UserPublicSchema)
     reviewee = fields.Nested(UserPublicSchema)
     class Meta:
@@ -29,7 +41,7 @@ class ReviewSchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
         fields = ("id", "rating", "comment", "created_at", "project_id", "reviewer", "reviewee", "reviewer_id", "reviewee_id")
 
-class ProjectSchema(ma.SQLAlchemyAutoSchema):
+class ProjectSchema(AutoSchema):
     client = fields.Nested(UserPublicSchema)
     freelancer = fields.Nested(UserPublicSchema, allow_none=True)
     bids = fields.Nested(BidSchema, many=True)
@@ -45,10 +57,49 @@ class ProjectSchema(ma.SQLAlchemyAutoSchema):
             "deadline_days", "started_at", "completed_at"
         )
 
-class UserSchema(ma.SQLAlchemyAutoSchema):
+# Lightweight feed entry: no nested bids/reviews, just a count
+class ProjectListSchema(AutoSchema):
+    client = fields.Nested(UserSummarySchema)
+    bid_count = fields.Integer()
+    class Meta:
+        model = Project
+        include_fk = True
+        fields = (
+            "id", "title", "description", "budget", "status", "created_at",
+            "required_skills", "client", "client_id", "deadline_days", "bid_count"
+        )
+
+# --- Profile history entries: summaries only, nothing nested beyond one level ---
+class ProjectSummarySchema(AutoSchema):
+    client = fields.Nested(UserSummarySchema)
+    class Meta:
+        model = Project
+        include_fk = True
+        fields = (
+            "id", "title", "status", "budget", "created_at", "deadline_days",
+            "started_at", "completed_at", "client", "client_id", "freelancer_id"
+        )
+
+class ReviewSummarySchema(AutoSchema):
+    reviewer = fields.Nested(UserSummarySchema)
+    project = fields.Nested(ProjectSummarySchema, only=("id", "title"))
+    class Meta:
+        model = Review
+        include_fk = True
+        fields = ("id", "rating", "comment", "created_at", "project_id", "project", "reviewer", "reviewer_id", "reviewee_id")
+
+# Leaderboard entry (/api/freelancers/top): the materialized stats row
+class FreelancerStatsSchema(AutoSchema):
+    id = fields.Integer(attribute="user_id")
+    class Meta:
+        model = FreelancerStats
+        fields = ("id", "username", "skills", "avg_rating", "review_count", "completion_rate", "on_time_rate",
+                  "projects_completed", "on_time_count", "delayed_count", "score")
+
+class UserSchema(AutoSchema):
     reviews_received = fields.Nested(ReviewSchema, many=True)
     class Meta:
         model = User
         load_instance = True
-        exclude = ("password_hash",)
+        exclude = ("password_hash", "version", "auth_version")
     password = fields.String(load_only=True)
\ No newline at end of file
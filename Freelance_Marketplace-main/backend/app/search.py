@@ -0,0 +1,123 @@
+# app/search.py
+
+import re
+
+from sqlalchemy import or_, and_
+
+from app import db
+from app.pagination import encode_rank_cursor, decode_rank_cursor
+from app.models import Project
+
+# Full-text search over Project.title/description.
+#   Postgres: a generated, weighted tsvector column (project.search_vector)
+#             with a GIN index; the database keeps it current on every write.
+#   SQLite:   an FTS5 table (project_fts, rowid = project.id) that the write
+#             routes refresh through index_project() in their transaction.
+# Both are created by upgrade-db (see migrations.create_search_index).
+# Other dialects fall back to unindexed LIKE matching, newest first.
+
+FTS_TABLE = "project_fts"
+TS_CONFIG = "english"
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0  # bm25 column weights (SQLite)
+MAX_TERMS = 8
+
+TERM_RE = re.compile(r"\w+")
+
+
+def dialect():
+    return db.session.get_bind().dialect.name
+
+
+def parse_terms(text):
+    """Words of a free-text query, lowercased. Punctuation and operators are dropped."""
+    return TERM_RE.findall((text or "").lower())[:MAX_TERMS]
+
+
+def index_project(project):
+    """Refreshes one project's search entry (SQLite only). Caller commits."""
+    if dialect() != "sqlite": return
+    if project.id is None: db.session.flush()
+    db.session.execute(db.text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": project.id})
+    db.session.execute(db.text(f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (:id, :title, :description)"),
+                       {"id": project.id, "title": project.title, "description": project.description})
+
+
+def index_projects(project_ids):
+    """Set-based index_project for bulk writers: refreshes these projects from the table. Caller commits."""
+    if dialect() != "sqlite" or not project_ids: return
+    ids = db.bindparam("ids", expanding=True)
+    db.session.execute(db.text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :ids").bindparams(ids), {"ids": list(project_ids)})
+    db.session.execute(db.text(f"INSERT INTO {FTS_TABLE}(rowid, title, description) "
+                               f"SELECT id, title, description FROM project WHERE id IN :ids").bindparams(ids),
+                       {"ids": list(project_ids)})
+
+
+def rebuild_search_index(conn=None):
+    """
+    Re-fills the SQLite FTS table from the project table, e.g. after bulk
+    loads that bypassed the routes. Postgres needs nothing (generated column).
+    Returns: number of projects indexed, or None when there is nothing to do.
+    """
+    own_transaction = conn is None
+    conn = conn or db.session.connection()
+    if conn.dialect.name != "sqlite": return None
+    conn.execute(db.text(f"DELETE FROM {FTS_TABLE}"))
+    indexed = conn.execute(db.text(f"INSERT INTO {FTS_TABLE}(rowid, title, description) SELECT id, title, description FROM project")).rowcount
+    if own_transaction: db.session.commit()
+    return indexed
+
+
+def _matches(terms):
+    """
+    Returns: (subquery with columns id, score, or None) where a higher score is a better match.
+    Every term must match; the last one also matches as a prefix (search-as-you-type).
+    """
+    name = dialect()
+    if name == "sqlite":
+        expr = " ".join(f'"{t}"' for t in terms) + "*"
+        fts = db.literal_column(FTS_TABLE)
+        # bm25() is lower-is-better; negate it so both backends sort score DESC
+        score = -db.func.bm25(fts, TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+        return (db.select(db.literal_column("rowid").label("id"), score.label("score"))
+                .select_from(db.table(FTS_TABLE)).where(fts.op("MATCH")(expr)).subquery("hits"))
+    if name == "postgresql":
+        query = db.func.to_tsquery(TS_CONFIG, " & ".join(terms[:-1] + [terms[-1] + ":*"]))
+        vector = db.literal_column("project.search_vector")
+        # float8, so the score round-trips exactly through the page cursor
+        score = db.cast(db.func.ts_rank_cd(vector, query), db.Double)
+        return (db.select(Project.id.label("id"), score.label("score"))
+                .where(vector.op("@@")(query)).subquery("hits"))
+    return None
+
+
+def search_query(terms):
+    """
+    Returns: (query over (Project, score), score column). Callers add filters
+    and options; ranked_page() orders and pages it.
+    """
+    hits = _matches(terms)
+    if hits is not None:
+        return db.session.query(Project, hits.c.score).join(hits, hits.c.id == Project.id), hits.c.score
+
+    score = db.literal(0.0).label("score")
+    query = db.session.query(Project, score)
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(or_(Project.title.ilike(pattern), Project.description.ilike(pattern)))
+    return query, score
+
+
+def ranked_page(query, score, cursor=None, limit=20):
+    """
+    Keyset pagination on (score, id), best match first.
+    Returns: (list of (Project, score), next_cursor|None)
+    """
+    if cursor:
+        last_score, last_id = decode_rank_cursor(cursor)
+        query = query.filter(or_(score < last_score, and_(score == last_score, Project.id < last_id)))
+    rows = query.order_by(score.desc(), Project.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    project, last_score = rows[-1]
+    return rows, encode_rank_cursor(last_score, project.id)
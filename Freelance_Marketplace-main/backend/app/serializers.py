@@ -0,0 +1,107 @@
+# app/serializers.py
+
+import re
+
+from flask import current_app
+from marshmallow import fields
+
+from app.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to Flask's json provider
+    orjson = None
+
+# Compiled dump functions for the read-heavy endpoints. Each one is generated
+# once from an existing marshmallow schema instance (its dump_fields, so
+# only/exclude are honoured) and produces the same dict schema.dump() would,
+# without the per-field dispatch. Field types without a fast path fall back to
+# the field's own serialize(), so the output never drifts from the schema.
+
+_compiled = {}
+
+
+def _value_expr(field, attr, env):
+    value = f"obj.{attr}" if attr.isidentifier() else f"getattr(obj, {attr!r}, None)"
+    if isinstance(field, fields.Nested):
+        nested = field.schema
+        env_name = f"_d{len(env)}"
+        env[env_name] = compile_dumper(nested, many=False)
+        if field.many or nested.many:
+            return f"(None if (v := {value}) is None else [{env_name}(x) for x in v])"
+        return f"(None if (v := {value}) is None else {env_name}(v))"
+    if isinstance(field, fields.Integer) and not field.as_string:
+        return f"(None if (v := {value}) is None else int(v))"
+    if isinstance(field, fields.Float) and not field.as_string:
+        return f"(None if (v := {value}) is None else float(v))"
+    if type(field) is fields.DateTime and field.format in (None, "iso"):
+        return f"(None if (v := {value}) is None else v.isoformat())"
+    if type(field) is fields.String:
+        return f"(None if (v := {value}) is None else str(v))"
+    if type(field) is fields.Boolean:
+        return f"(None if (v := {value}) is None else bool(v))"
+    env_name = f"_f{len(env)}"
+    env[env_name] = field
+    return f"{env_name}.serialize({attr!r}, obj)"
+
+
+def compile_dumper(schema, many=None):
+    """
+    Returns: function(obj) -> dict (or function(objs) -> list when many)
+    equivalent to schema.dump(). Cached per schema instance.
+    """
+    many = schema.many if many is None else many
+    key = (id(schema), many)
+    if key in _compiled: return _compiled[key][1]
+
+    env = {}
+    items = []
+    for name, field in schema.dump_fields.items():
+        attr = field.attribute or name
+        items.append(f"{field.data_key or name!r}: {_value_expr(field, attr, env)}")
+    source = "def dump(obj):\n    return {" + ", ".join(items) + "}\n"
+    exec(compile(source, f"<dumper {type(schema).__name__}>", "exec"), env)
+    dump = env["dump"]
+    if many:
+        one = dump
+        dump = lambda objs: [one(o) for o in objs]
+    _compiled[key] = (schema, dump)  # keep the schema alive so its id isn't reused
+    return dump
+
+
+@timed("serialize")
+def fast_dump(schema, obj):
+    return compile_dumper(schema)(obj)
+
+
+# orjson formats some floats differently from the stdlib (1e16 vs 1e+16,
+# 1e-7 vs 1e-07, 0.00001 vs 1e-05) and writes raw UTF-8/DEL where Flask
+# escapes to ASCII. Any body that could differ is re-encoded with the stdlib,
+# so responses stay identical; the checks are plain byte scans, far cheaper
+# than the encode they guard. (NaN/Infinity aren't checked: no column behind
+# these endpoints stores them.)
+_ORJSON_EXPONENT = re.compile(rb"e-?[0-9]")
+
+
+def _orjson_safe(body):
+    return body.isascii() and b"\x7f" not in body and b"0.0000" not in body and not _ORJSON_EXPONENT.search(body)
+
+
+@timed("serialize")
+def encode(data):
+    """Serializes plain (already dumped) data exactly as jsonify would."""
+    provider = current_app.json
+    compact = provider.compact or (provider.compact is None and not current_app.debug)
+    if orjson is not None and current_app.config.get("JSON_ENCODER") == "orjson" and compact \
+            and provider.sort_keys and provider.ensure_ascii:
+        try:
+            body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        except orjson.JSONEncodeError:  # e.g. non-str keys, ints beyond 64 bits
+            body = None
+        if body is not None and _orjson_safe(body):
+            return body + b"\n"
+    return provider.response(data).get_data()
+
+
+def json_response(data, status=200):
+    return current_app.response_class(encode(data), status=status, mimetype=current_app.json.mimetype)
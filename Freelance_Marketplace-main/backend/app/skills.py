@@ -0,0 +1,135 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Skill, Project, User, project_skill, user_skill
+
+MAX_SKILL_LENGTH = 80
+
+
+def normalize_skill(name):
+    """Canonical tag form: trimmed, lowercase, inner whitespace collapsed."""
+    return " ".join(name.split()).lower()[:MAX_SKILL_LENGTH]
+
+
+def parse_skills(text):
+    """
+    Splits a free-text comma string into unique canonical tags, keeping order.
+    Returns: list[str]
+    """
+    if not text: return []
+    seen = []
+    for raw in text.split(','):
+        name = normalize_skill(raw)
+        if name and name not in seen:
+            seen.append(name)
+    return seen
+
+
+def insert_skills(names, conn=None):
+    """
+    Inserts the tag `names`, skipping any that exist, including rows a
+    concurrent request commits between our SELECT and INSERT (Skill.name is
+    unique). Postgres/SQLite: one INSERT ... ON CONFLICT DO NOTHING; other
+    dialects insert row by row in savepoints. Caller re-selects the ids.
+    """
+    conn = conn or db.session
+    rows = [{"name": n} for n in sorted(names)]
+    if not rows: return
+    bind = conn.get_bind() if hasattr(conn, "get_bind") else conn
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(bind.dialect.name)
+    if dialect_insert:
+        conn.execute(dialect_insert(Skill.__table__).on_conflict_do_nothing(index_elements=["name"]), rows)
+        return
+    for row in rows:
+        try:
+            with conn.begin_nested():
+                conn.execute(Skill.__table__.insert(), row)
+        except IntegrityError:
+            pass  # another request created it first
+
+
+def get_or_create_skills(names):
+    """Returns Skill rows for `names`, inserting any that don't exist yet (one SELECT when they all do)."""
+    if not names: return []
+    existing = {s.name: s for s in Skill.query.filter(Skill.name.in_(names)).all()}
+    missing = [n for n in names if n not in existing]
+    if missing:
+        insert_skills(missing)
+        existing.update((s.name, s) for s in Skill.query.filter(Skill.name.in_(missing)).all())
+    return [existing[n] for n in names]
+
+
+def skill_ids_by_name(names, conn=None):
+    """
+    Ids for the canonical tag `names`, inserting the missing ones in one
+    statement. Set-based counterpart of get_or_create_skills for bulk writers.
+    Returns: dict name -> id
+    """
+    conn = conn or db.session
+    names = set(names)
+    if not names: return {}
+    ids = dict(conn.execute(db.select(Skill.name, Skill.id).where(Skill.name.in_(names))).all())
+    missing = names - ids.keys()
+    if missing:
+        insert_skills(missing, conn)
+        ids.update(conn.execute(db.select(Skill.name, Skill.id).where(Skill.name.in_(missing))).all())
+    return ids
+
+
+def sync_skill_tags(obj, text):
+    """Keeps `obj.skill_tags` in step with a Project/User comma string. Caller commits."""
+    obj.skill_tags = get_or_create_skills(parse_skills(text))
+
+
+def filter_by_skills(query, names, match_all=False):
+    """
+    Restricts a Project query to rows tagged with `names`.
+    OR: any of the tags. AND: every tag. Both resolve through the
+    (skill_id, project_id) index instead of scanning required_skills.
+    """
+    names = [n for n in dict.fromkeys(normalize_skill(n) for n in names) if n]
+    if not names: return query
+
+    tagged = (
+        db.select(project_skill.c.project_id)
+        .join(Skill, Skill.id == project_skill.c.skill_id)
+        .where(Skill.name.in_(names))
+    )
+    if match_all:
+        tagged = tagged.group_by(project_skill.c.project_id).having(db.func.count() == len(names))
+    return query.filter(Project.id.in_(tagged))
+
+
+def backfill_skill_tags(chunk_size=1000, conn=None):
+    """
+    Rebuilds project_skill / user_skill from the legacy comma strings.
+    Idempotent: existing association rows are replaced. Commits unless
+    given a `conn` (a migration step's).
+    Returns: (projects_tagged, users_tagged, skills_total)
+    """
+    own_transaction = conn is None
+    conn = conn or db.session
+    sources = ((Project, Project.required_skills, project_skill, 'project_id'),
+               (User, User.skills, user_skill, 'user_id'))
+
+    parsed = {}
+    names = set()
+    for model, column, _, _ in sources:
+        rows = conn.execute(db.select(model.id, column).where(column.isnot(None))).all()
+        parsed[model] = [(row_id, parse_skills(text)) for row_id, text in rows]
+        for _, tags in parsed[model]:
+            names.update(tags)
+
+    skill_ids = skill_ids_by_name(names, conn)
+
+    counts = []
+    for model, _, table, fk in sources:
+        conn.execute(table.delete())
+        pairs = [{fk: row_id, "skill_id": skill_ids[t]} for row_id, tags in parsed[model] for t in tags]
+        for i in range(0, len(pairs), chunk_size):
+            conn.execute(table.insert(), pairs[i:i + chunk_size])
+        counts.append(sum(1 for _, tags in parsed[model] if tags))
+
+    if own_transaction: db.session.commit()
+    return counts[0], counts[1], conn.scalar(db.select(db.func.count()).select_from(Skill))
@@ -0,0 +1,81 @@
+# app/workflow.py
+
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import User, Project
+
+# Project lifecycle:
+#
+#   open --accept_bid--> in_progress --submit_work--> pending_review --approve_work--> completed
+#                                          ^                 |
+#                                          +-- needs_revision <-- request_revision
+#
+# Each transition is one conditional UPDATE ... WHERE id = :id AND status IN
+# (allowed sources). Whoever's UPDATE matches the row wins; a concurrent
+# request sees rowcount 0 and gets a 409, so no read-then-write race exists
+# between workers. User counters move with SQL-side increments in the same
+# transaction.
+
+OPEN, IN_PROGRESS, PENDING_REVIEW, NEEDS_REVISION, COMPLETED = (
+    'open', 'in_progress', 'pending_review', 'needs_revision', 'completed')
+
+TRANSITIONS = {
+    "accept_bid": ({OPEN}, IN_PROGRESS),
+    "submit_work": ({IN_PROGRESS, NEEDS_REVISION}, PENDING_REVIEW),
+    "request_revision": ({PENDING_REVIEW}, NEEDS_REVISION),
+    "approve_work": ({PENDING_REVIEW}, COMPLETED),
+}
+
+
+def transition(project, action, **values):
+    """
+    Moves `project` along `action` if it is still in one of its source states,
+    setting `values` in the same statement. Runs in the caller's transaction.
+    Returns: True if this call made the transition, False if the project had
+    already moved on (the caller should answer 409).
+    """
+    sources, target = TRANSITIONS[action]
+    result = db.session.execute(
+        db.update(Project).where(Project.id == project.id, Project.status.in_(sources)).values(status=target, **values),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.expire(project)  # next access reads the row as this transaction now sees it
+    return result.rowcount == 1
+
+
+def conflict_message(action):
+    sources, _ = TRANSITIONS[action]
+    return f"Project must be {' or '.join(sorted(s.replace('_', ' ') for s in sources))}"
+
+
+def record_acceptance(freelancer_id):
+    db.session.execute(
+        db.update(User).where(User.id == freelancer_id)
+        .values(projects_accepted=User.projects_accepted + 1),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def _percent(part, whole):
+    # numeric cast: Postgres only rounds numerics to a given scale
+    return db.func.round(db.cast(part * 100.0 / whole, db.Numeric), 1)
+
+
+def record_completion(project):
+    """
+    Counts an approved project for its freelancer: completed, and on time or
+    delayed against started_at + deadline_days (submission time = completed_at).
+    """
+    # Right-hand sides read the pre-update row, so each rate is built from the new counts
+    completed = User.projects_completed + 1
+    accepted = db.case((User.projects_accepted > 0, User.projects_accepted), else_=1)
+    values = {"projects_completed": completed, "completion_rate": _percent(completed, accepted)}
+    if project.started_at and project.deadline_days:
+        on_time = int((project.completed_at or datetime.utcnow()) <= project.started_at + timedelta(days=project.deadline_days))
+        on_time_count = db.func.coalesce(User.on_time_count, 0) + on_time
+        delayed_count = db.func.coalesce(User.delayed_count, 0) + (1 - on_time)
+        values.update(on_time_count=on_time_count, delayed_count=delayed_count,
+                      on_time_rate=_percent(on_time_count, on_time_count + delayed_count))
+    db.session.execute(db.update(User).where(User.id == project.freelancer_id).values(values),
+                       execution_options={"synchronize_session": False})
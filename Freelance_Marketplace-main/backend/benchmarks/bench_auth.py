@@ -0,0 +1,102 @@
+"""
+Auth overhead. Authenticated-request cost on an authorization-only path
+(a freelancer posting a project is refused from the token alone), with the
+identity cache on and off. Then login throughput under a concurrent burst
+at several LOGIN_HASH_CONCURRENCY caps, while another thread measures
+feed latency to show what the burst costs other traffic.
+
+    python -m benchmarks.bench_auth --rounds 500 --login-threads 8 --seconds 5
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from sqlalchemy import event
+
+from benchmarks.datagen import seed, PASSWORD, add_database_args, scratch_database_url
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--login-threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of each login burst")
+    parser.add_argument("--caps", type=int, nargs="+", default=[1, 2, 8])
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.auth import token_auth
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "auth")
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        clients, freelancers, _ = seed(db, users=2000, projects=2000)
+        engine = db.engine
+    client = app.test_client()
+
+    def login(uid):
+        return client.post("/api/auth/login", json={"email": f"user{uid}@bench.local", "password": PASSWORD})
+
+    headers = {"Authorization": f"Bearer {login(freelancers[0]).get_json()['access_token']}"}
+    body = {"title": "t", "description": "d", "budget": 10}
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *a: queries.append(1))
+
+    print(f"{'authorization-only request':<34} {'p50 ms':>8} {'queries/req':>12}")
+    for label, ttl in (("claims + identity cache", 60), ("identity cache off (TTL 0)", 0)):
+        token_auth.ttl = ttl
+        token_auth.cache.clear()
+        for _ in range(20): client.post("/api/projects", json=body, headers=headers)
+        queries.clear()
+        samples = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            assert client.post("/api/projects", json=body, headers=headers).status_code == 403
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"{label:<34} {statistics.median(samples):>8.3f} {len(queries) / args.rounds:>12.2f}")
+    token_auth.ttl = app.config["IDENTITY_CACHE_TTL"]
+
+    print(f"\nlogin burst: {args.login_threads} threads x {args.seconds}s")
+    print(f"{'hash cap':>8} {'logins/s':>9} {'429s':>6} {'login p50 ms':>13} {'feed p50 ms':>12} {'feed p95 ms':>12}")
+    idle = []
+    for _ in range(100):
+        start = time.perf_counter()
+        client.get("/api/projects")
+        idle.append((time.perf_counter() - start) * 1000)
+    print(f"{'(idle)':>8} {'':>9} {'':>6} {'':>13} {statistics.median(idle):>12.2f} {sorted(idle)[94]:>12.2f}")
+    for cap in args.caps:
+        token_auth._hash_slots = threading.BoundedSemaphore(cap)
+        stop = time.perf_counter() + args.seconds
+        logins, busy, feed = [], [0], []
+
+        def burst(i):
+            uid = freelancers[i % len(freelancers)]
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                status = login(uid).status_code
+                if status == 429: busy[0] += 1
+                else: logins.append((time.perf_counter() - start) * 1000)
+
+        def reader():
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                client.get("/api/projects")
+                feed.append((time.perf_counter() - start) * 1000)
+
+        threads = [threading.Thread(target=burst, args=(i,)) for i in range(args.login_threads)] + [threading.Thread(target=reader)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        feed.sort()
+        print(f"{cap:>8} {len(logins) / args.seconds:>9.1f} {busy[0]:>6} {statistics.median(logins):>13.1f} "
+              f"{statistics.median(feed):>12.2f} {feed[int(len(feed) * 0.95)]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
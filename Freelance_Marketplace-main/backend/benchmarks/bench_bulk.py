@@ -0,0 +1,75 @@
+"""
+Write throughput: rows/s through the one-per-request routes (POST
+/api/projects, /api/project/<id>/bid) versus the batch endpoints, driven
+through the Flask test client against a seeded database.
+
+    python -m benchmarks.bench_bulk --rows 2000
+"""
+import argparse
+import time
+
+from benchmarks.datagen import seed, PASSWORD, add_database_args, scratch_database_url
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000, help="projects, then bids, written per path")
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "bulk")
+
+    app = create_app(BenchConfig)
+    client = app.test_client()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        clients, freelancers, _ = seed(db, users=2000, projects=20000, bids_per_project=2)
+
+        def login(uid):
+            r = client.post("/api/auth/login", json={"email": f"user{uid}@bench.local", "password": PASSWORD})
+            return {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+
+        client_h = login(clients[0])
+        freelancer_h = [login(uid) for uid in freelancers[:2]]
+        projects = [{"title": f"Bulk project {i}", "description": "Synthetic bulk project " * 4, "budget": 100 + i,
+                     "required_skills": "python, flask, sql", "deadline_days": 10} for i in range(args.rows)]
+
+        def timed(label, fn):
+            start = time.perf_counter()
+            ids = fn()
+            seconds = time.perf_counter() - start
+            print(f"{label:<34} {len(ids):>6} {seconds:>8.2f} {len(ids) / seconds:>9.0f}")
+            return ids
+
+        def single_projects():
+            return [client.post("/api/projects", json=p, headers=client_h).get_json()["id"] for p in projects]
+
+        def batch_projects():
+            r = client.post("/api/projects/batch", json=projects, headers=client_h)
+            assert r.status_code == 201, r.get_json()
+            return [row["id"] for row in r.get_json()["results"]]
+
+        def single_bids(project_ids):
+            return [client.post(f"/api/project/{pid}/bid", json={"amount": 90, "proposal": "Bench bid"},
+                                headers=freelancer_h[0]).get_json()["id"] for pid in project_ids]
+
+        def batch_bids(project_ids):
+            rows = [{"project_id": pid, "amount": 90, "proposal": "Bench bid"} for pid in project_ids]
+            r = client.post("/api/bids/batch", json=rows, headers=freelancer_h[1])
+            assert r.status_code == 201, r.get_json()
+            return [row["id"] for row in r.get_json()["results"]]
+
+        print(f"{'path':<34} {'rows':>6} {'seconds':>8} {'rows/s':>9}")
+        single_ids = timed("projects: POST /projects", single_projects)
+        batch_ids = timed("projects: POST /projects/batch", batch_projects)
+        timed("bids: POST /project/<id>/bid", lambda: single_bids(single_ids))
+        timed("bids: POST /bids/batch", lambda: batch_bids(batch_ids))
+
+
+if __name__ == "__main__":
+    main()
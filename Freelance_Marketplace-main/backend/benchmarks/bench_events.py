@@ -0,0 +1,138 @@
+"""
+Server-sent events under many idle connections. Starts gunicorn with one
+gthread worker (a parked thread per stream) or, with --mode gevent, one
+gevent worker (a parked greenlet), opens --clients streams on a
+single project, then places --events bids and records, per event, how long
+until every stream has received it. Reports the worker's RSS before and after
+the streams connected, and the feed latency measured while they are open.
+
+    python -m benchmarks.bench_events --clients 2000 --events 20
+    python -m benchmarks.bench_events --clients 2000 --mode gevent
+"""
+import argparse
+import os
+import selectors
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import json
+from http.client import HTTPConnection
+
+from benchmarks.bench_startup import free_port, METRICS_TOKEN, METRICS_HEADERS
+from benchmarks.datagen import seed, PASSWORD, add_database_args, scratch_database_url
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS")) / 1024
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                 headers=dict(headers or {}, **({"Content-Type": "application/json"} if body is not None else {})))
+    resp = conn.getresponse()
+    data = resp.read()
+    conn.close()
+    return resp.status, json.loads(data) if data else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--mode", choices=["gthread", "gevent"], default="gthread")
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from config import Config
+
+    url = scratch_database_url(parser, args, "events")
+
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        clients, freelancers, open_ids = seed(db, users=max(200, args.events * 2), projects=200, bids_per_project=0)
+        db.engine.dispose()
+    project_id = open_ids[0]
+
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=url, DB_AUTO_UPGRADE="false", EVENTS_HEARTBEAT="15", SERVER_MODE=args.mode,
+               SERVER_THREADS=str(args.clients + 50), SERVER_CONNECTIONS=str(args.clients + 50), EVENTS_MAX_SUBSCRIBERS=str(args.clients),
+               METRICS_TOKEN=METRICS_TOKEN)
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-w", "1", "--timeout", "120", "-b", f"127.0.0.1:{port}",
+                               "app:create_app()"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socks = []
+    try:
+        for _ in range(200):
+            try:
+                status, stats = request(port, "GET", "/api/metrics/events", headers=METRICS_HEADERS)
+                break
+            except OSError:
+                time.sleep(0.05)
+        worker = stats["pid"]
+        before = rss_mb(worker)
+
+        sel = selectors.DefaultSelector()
+        started = time.perf_counter()
+        get = f"GET /api/project/{project_id}/events HTTP/1.1\r\nHost: x\r\nAccept: text/event-stream\r\n\r\n".encode()
+        for _ in range(args.clients):
+            s = socket.create_connection(("127.0.0.1", port))
+            s.sendall(get)
+            s.setblocking(False)
+            sel.register(s, selectors.EVENT_READ, bytearray())
+            socks.append(s)
+        while request(port, "GET", "/api/metrics/events", headers=METRICS_HEADERS)[1]["subscribers"] < args.clients:
+            time.sleep(0.05)
+        connected = time.perf_counter() - started
+        after = rss_mb(worker)
+
+        def drain(marker, timeout=30):
+            """Reads every stream until each has seen `marker`; returns seconds until the last one did."""
+            t0, pending = time.perf_counter(), set(socks)
+            while pending and time.perf_counter() - t0 < timeout:
+                for key, _ in sel.select(1):
+                    chunk = key.fileobj.recv(65536)
+                    key.data.extend(chunk)
+                    if marker in key.data:
+                        pending.discard(key.fileobj)
+                        del key.data[:]
+            return time.perf_counter() - t0 if not pending else None
+
+        drain(b"retry:")
+        fanout, feed = [], []
+        for i in range(args.events):
+            uid = freelancers[i]
+            _, login = request(port, "POST", "/api/auth/login", {"email": f"user{uid}@bench.local", "password": PASSWORD})
+            headers = {"Authorization": f"Bearer {login['access_token']}"}
+            start = time.perf_counter()
+            status, bid = request(port, "POST", f"/api/project/{project_id}/bid", {"amount": 10 + i, "proposal": "p"}, headers)
+            assert status == 201, bid
+            done = drain(f'"id":{bid["id"]},'.encode())
+            fanout.append((time.perf_counter() - start) * 1000 if done is not None else float("nan"))
+            t = time.perf_counter()
+            request(port, "GET", "/api/projects")
+            feed.append((time.perf_counter() - t) * 1000)
+
+        print(f"{args.clients} idle streams on one {args.mode} worker: connected in {connected:.2f}s, "
+              f"worker RSS {before:.0f} -> {after:.0f}MB ({(after - before) * 1024 / args.clients:.0f}KB/stream)")
+        print(f"bid -> delivered to every stream over {args.events} events: p50 {statistics.median(fanout):.0f}ms, "
+              f"max {max(fanout):.0f}ms")
+        print(f"feed request while streams are open: p50 {statistics.median(feed):.1f}ms")
+        print("broker:", request(port, "GET", "/api/metrics/events", headers=METRICS_HEADERS)[1])
+    finally:
+        for s in socks: s.close()
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Instrumentation overhead: latency of a few hot routes through the Flask
+test client with INSTRUMENTATION_ENABLED off and on (same seeded file).
+Off and on run in alternating blocks so machine drift hits both alike.
+
+    python -m benchmarks.bench_instrumentation --rounds 300
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.datagen import seed, add_database_args, scratch_database_url
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=300, help="requests per route and mode")
+    parser.add_argument("--blocks", type=int, default=10)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db, instrumentation
+    from app.models import Project
+    from config import Config
+
+    url = scratch_database_url(parser, args, "instrumentation")
+
+    def make_app(enabled):
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = url
+            INSTRUMENTATION_ENABLED = enabled
+            SLOW_QUERY_MS = 10_000
+        return create_app(BenchConfig)
+
+    app = make_app(False)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(db, users=2000, projects=5000, bids_per_project=20)
+        project_id = db.session.scalar(db.select(Project.id).where(Project.status == "open").limit(1))
+
+    routes = [
+        ("GET /api/projects", lambda c: c.get("/api/projects?limit=50")),
+        ("GET /api/project/<id>", lambda c: c.get(f"/api/project/{project_id}")),
+        ("POST /api/rank_bids", lambda c: c.post("/api/rank_bids", json={"project_id": project_id})),
+    ]
+
+    apps = {"off": app, "on": make_app(True)}
+    enabled = instrumentation._active  # module-wide switch: the last init_app wins
+    samples = {(mode, name): [] for mode in apps for name, _ in routes}
+    clients = {mode: a.test_client() for mode, a in apps.items()}
+    for block in range(args.blocks):
+        for mode, client in clients.items():
+            instrumentation._active = enabled if mode == "on" else None
+            for name, call in routes:
+                for _ in range(20 if block == 0 else 2): call(client)  # warm up
+                for _ in range(args.rounds // args.blocks):
+                    start = time.perf_counter()
+                    assert call(client).status_code == 200
+                    samples[mode, name].append((time.perf_counter() - start) * 1000)
+    off = {name: statistics.median(samples["off", name]) for name, _ in routes}
+    on = {name: statistics.median(samples["on", name]) for name, _ in routes}
+    print(f"{'route':<24} {'off ms':>8} {'on ms':>8} {'overhead':>9}")
+    for name, _ in routes:
+        print(f"{name:<24} {off[name]:>8.3f} {on[name]:>8.3f} {(on[name] / off[name] - 1) * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
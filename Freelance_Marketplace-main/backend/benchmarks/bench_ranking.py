@@ -0,0 +1,104 @@
+"""
+Ranking engine benchmark: vectorized calculate_ranked_bids vs the original
+per-bid Python loop, on synthetic in-memory bids (no database).
+
+    python -m benchmarks.bench_ranking --bids 10000 50000
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from app.models import User, Project, Bid
+from app.ranking_logic import (
+    calculate_ranked_bids, compute_features_for_bid,
+    normalize_feature_list, adjust_weights_for_priority,
+)
+
+SKILLS = ["python", "flask", "react", "javascript", "java", "go", "sql", "docker", "aws", "css"]
+
+
+def legacy_ranked_bids(project, bids, priority='balanced'):
+    """The scalar implementation the engine replaced, kept as the reference."""
+    per_bid = [(b, b.freelancer, compute_features_for_bid(b, b.freelancer, project)) for b in bids]
+    cols = {k: [f[k] for _, _, f in per_bid] for k in ("price", "timeline", "rating", "on_time_rate", "skill_match")}
+    norm_price = normalize_feature_list(cols["price"], invert=True)
+    norm_timeline = normalize_feature_list(cols["timeline"], invert=True)
+    norm_rating = normalize_feature_list(cols["rating"])
+    norm_on_time = normalize_feature_list(cols["on_time_rate"])
+    norm_skills = normalize_feature_list(cols["skill_match"])
+    weights = adjust_weights_for_priority(priority)
+    results = []
+    for i, (bid, _, _) in enumerate(per_bid):
+        score = (
+            weights["price"] * norm_price[i] +
+            weights["rating"] * norm_rating[i] +
+            weights["timeline"] * norm_timeline[i] +
+            weights["on_time_rate"] * norm_on_time[i] +
+            weights["skill_match"] * norm_skills[i]
+        ) * 10
+        freelancer = bid.freelancer
+        results.append({
+            "id": bid.id, "amount": bid.amount, "proposal": bid.proposal,
+            "proposed_timeline_days": bid.proposed_timeline_days, "created_at": bid.created_at,
+            "freelancer": {
+                "id": freelancer.id, "username": freelancer.username, "avg_rating": freelancer.avg_rating,
+                "on_time_count": freelancer.on_time_count, "delayed_count": freelancer.delayed_count,
+                "projects_completed": freelancer.projects_completed
+            },
+            "score": round(score, 1)
+        })
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results
+
+
+def make_project_bids(n, seed=7):
+    rng = random.Random(seed)
+    project = Project(id=1, title="Bench", description="", budget=1000.0,
+                      required_skills=", ".join(rng.sample(SKILLS, 4)))
+    bids = []
+    for i in range(1, n + 1):
+        user = User(id=i, username=f"f{i}", is_freelancer=True,
+                    skills=",".join(rng.sample(SKILLS, rng.randint(0, 6))),
+                    avg_rating=round(rng.uniform(0, 5), 2), on_time_rate=rng.choice([0.0, 50.0, 87.5, 100.0]),
+                    on_time_count=0, delayed_count=0, projects_completed=0)
+        bids.append(Bid(id=i, amount=rng.randint(50, 5000), proposal="", created_at=datetime(2025, 1, 1),
+                        proposed_timeline_days=rng.choice([None, 3, 7, 14, 30]),
+                        project_id=1, freelancer_id=i, freelancer=user))
+    return project, bids
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bids", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'bids':>8} {'legacy ms':>10} {'engine ms':>10} {'top-k ms':>10} {'full x':>7} {'top-k x':>8}")
+    for n in args.bids:
+        project, bids = make_project_bids(n)
+        for priority in ("balanced", "price", "time", "rating"):
+            expected = [(r["id"], r["score"]) for r in legacy_ranked_bids(project, bids, priority)]
+            got = [(r["id"], r["score"]) for r in calculate_ranked_bids(project, bids, priority)["ranked_bids"]]
+            assert got == expected, f"score mismatch at {n} bids ({priority})"
+            top = [(r["id"], r["score"]) for r in calculate_ranked_bids(project, bids, priority, args.top_k)["ranked_bids"]]
+            assert top == expected[:args.top_k], f"top-k mismatch at {n} bids ({priority})"
+
+        legacy, _ = timed(lambda: legacy_ranked_bids(project, bids), args.repeat)
+        engine, _ = timed(lambda: calculate_ranked_bids(project, bids), args.repeat)
+        top_k, _ = timed(lambda: calculate_ranked_bids(project, bids, top_k=args.top_k), args.repeat)
+        print(f"{n:>8} {legacy * 1e3:>10.1f} {engine * 1e3:>10.1f} {top_k * 1e3:>10.1f} {legacy / engine:>6.1f}x {legacy / top_k:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
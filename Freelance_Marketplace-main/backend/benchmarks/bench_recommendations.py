@@ -0,0 +1,116 @@
+"""
+Recommendation latency at scale: /api/recommendations' query over the
+open-project skill index versus a brute-force pass that loads every open
+project and scores it in Python. Each freelancer's top N is asserted
+identical between the two before anything is reported.
+
+    python -m benchmarks.bench_recommendations --open-projects 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.datagen import seed, SKILLS, add_database_args, scratch_database_url
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def brute_force(db, user, limit):
+    """Every open project scored in Python with recommend_projects' formula."""
+    from app.models import User, Project, Bid, project_skill
+    from app.recommendations import RECOMMENDATION_WEIGHTS as W, NEUTRAL, DEFAULT_DEADLINE_DAYS, freelancer_profile
+
+    skill_ids, typical_amount, typical_days = freelancer_profile(user)
+    skills = set(skill_ids)
+    rows = db.session.execute(
+        db.select(Project.id, Project.budget, Project.deadline_days, Project.client_id, User.avg_rating)
+        .join(User, User.id == Project.client_id).where(Project.status == 'open')
+    ).all()
+    tags = {}
+    for project_id, skill_id in db.session.execute(
+            db.select(project_skill.c.project_id, project_skill.c.skill_id)
+            .join(Project, Project.id == project_skill.c.project_id).where(Project.status == 'open')):
+        tags.setdefault(project_id, set()).add(skill_id)
+    bid_on = set(db.session.scalars(db.select(Bid.project_id).where(Bid.freelancer_id == user.id)))
+
+    def fit(value, typical):
+        if typical is None: return NEUTRAL
+        return 1.0 if value >= typical else value * 1.0 / typical
+
+    scored = []
+    for project_id, budget, deadline_days, client_id, avg_rating in rows:
+        project_tags = tags.get(project_id, set())
+        common = len(project_tags & skills)
+        if not common or client_id == user.id or project_id in bid_on: continue
+        score = (0.0 + W["skill_match"] * (common * 1.0 / (len(project_tags) + len(skills) - common))
+                 + W["budget_fit"] * fit(budget, typical_amount)
+                 + W["timeline_fit"] * fit(deadline_days if deadline_days is not None else DEFAULT_DEADLINE_DAYS, typical_days)
+                 + W["client_rating"] * ((avg_rating or 0.0) / 5.0))
+        scored.append((score, project_id))
+    scored.sort(reverse=True)
+    return scored[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--open-projects", type=int, default=100000)
+    parser.add_argument("--skills", type=int, default=200, help="size of the skill vocabulary")
+    parser.add_argument("--freelancers", type=int, default=200, help="freelancers sampled for the index path")
+    parser.add_argument("--baseline-freelancers", type=int, default=5, help="freelancers sampled for brute force")
+    parser.add_argument("--limit", type=int, default=20)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.models import User, open_project_skill
+    from app.recommendations import recommend_projects
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "recommendations")
+
+    vocabulary = SKILLS + [f"skill{i}" for i in range(len(SKILLS), args.skills)]
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        _, freelancers, open_projects = seed(db, users=5000, projects=int(args.open_projects / 0.6),
+                                             bids_per_project=2, skills=vocabulary)
+        postings = db.session.scalar(db.select(db.func.count()).select_from(open_project_skill))
+        print(f"seeded {len(open_projects)} open projects, {postings} postings, {len(vocabulary)} skills "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        rng = random.Random(7)
+        users = [db.session.get(User, uid) for uid in rng.sample(freelancers, args.freelancers)]
+        for user in users[:args.baseline_freelancers]:
+            got = [(row.score, row.project_id) for row in recommend_projects(user, args.limit)]
+            expected = brute_force(db, user, args.limit)
+            assert [p for _, p in got] == [p for _, p in expected], f"user {user.id}: top {args.limit} differs"
+            assert all(abs(a - b) < 1e-9 for (a, _), (b, _) in zip(got, expected)), f"user {user.id}: scores differ"
+
+        def timed(fn, sample):
+            samples = []
+            for user in sample:
+                db.session.expire_all()
+                start = time.perf_counter()
+                fn(user)
+                samples.append((time.perf_counter() - start) * 1000)
+            return samples
+
+        results = [
+            ("skill index", timed(lambda u: recommend_projects(u, args.limit), users)),
+            ("brute force", timed(lambda u: brute_force(db, u, args.limit), users[:args.baseline_freelancers])),
+        ]
+        print(f"{'path':<14} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+        for name, samples in results:
+            print(f"{name:<14} {len(samples):>5} {percentile(samples, 0.5):>9.2f} {percentile(samples, 0.95):>9.2f} "
+                  f"{statistics.mean(samples):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Bulk external-rating refresh throughput against the local stub server.
+Runs a cold pass (full pages) and a warm pass (conditional GETs -> 304).
+
+    python -m benchmarks.bench_refresh --profiles 10000 --concurrency 16
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.datagen import add_database_args, scratch_database_url
+from benchmarks.stub_server import start_subprocess
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 16, 32])
+    parser.add_argument("--per-host-rps", type=float, default=0.0, help="0 = no per-host limit")
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated server latency (s)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.models import User, ExternalProfile
+    from app.external.refresh import refresh_stale_profiles
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "refresh")
+
+    server, url_template = start_subprocess(latency=args.latency)
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(db.insert(User), [
+            {"id": i, "username": f"u{i}", "email": f"u{i}@bench.local", "password_hash": "x", "is_freelancer": True,
+             "projects_accepted": 0, "projects_completed": 0, "review_count": 0, "rating_sum": 0}
+            for i in range(1, args.profiles + 1)
+        ])
+        db.session.commit()
+
+        print(f"{'concurrency':>11} {'pass':>5} {'profiles':>9} {'seconds':>8} {'profiles/s':>11} {'304s':>6} {'failed':>7}")
+        for concurrency in args.concurrency:
+            db.session.execute(db.delete(ExternalProfile))
+            db.session.execute(db.insert(ExternalProfile), [
+                {"user_id": i, "provider": "freelancer", "external_username": f"bench{i}",
+                 "last_checked": datetime.utcnow() - timedelta(days=2)}
+                for i in range(1, args.profiles + 1)
+            ])
+            db.session.commit()
+            for label in ("cold", "warm"):
+                if label == "warm":
+                    db.session.execute(db.update(ExternalProfile).values(last_checked=datetime.utcnow() - timedelta(days=2)))
+                    db.session.commit()
+                stats = refresh_stale_profiles(timedelta(hours=24), concurrency, args.per_host_rps, args.batch_size,
+                                               url_template)
+                done = stats["refreshed"] + stats["not_modified"]
+                print(f"{concurrency:>11} {label:>5} {stats['stale']:>9} {stats['seconds']:>8.2f} "
+                      f"{done / stats['seconds']:>11.0f} {stats['not_modified']:>6} {stats['failed']:>7}")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Serialization throughput per read endpoint: marshmallow dump + jsonify versus
+the compiled dumpers with the stdlib and orjson encoders. Rows are loaded
+once up front, so only dumping and encoding are timed. Every fast path is
+asserted byte-identical to the marshmallow output before it is timed.
+
+    python -m benchmarks.bench_serialization --rounds 200
+"""
+import argparse
+import timeit
+from types import SimpleNamespace
+
+from benchmarks.datagen import seed, add_database_args, scratch_database_url
+
+
+def snapshot(obj, **extra):
+    """Plain copy of an ORM object's loaded columns, so dynamic relationships don't query while timing."""
+    data = {c.key: getattr(obj, c.key) for c in obj.__mapper__.column_attrs}
+    data.update(extra)
+    return SimpleNamespace(**data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--page", type=int, default=100, help="feed / history page size")
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from flask import jsonify
+    from sqlalchemy import func
+    from sqlalchemy.orm import joinedload, undefer
+    from app import create_app, db, routes
+    from app.models import User, Project, Bid, Review
+    from app.serializers import fast_dump, encode, orjson
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "serialization")
+
+    app = create_app(BenchConfig)
+    with app.app_context(), app.test_request_context():
+        db.drop_all()
+        db.create_all()
+        seed(db, users=2000, projects=2000, bids_per_project=40)
+
+        feed = Project.query.filter_by(status="open").options(joinedload(Project.client), undefer(Project.bid_count)) \
+            .order_by(Project.created_at.desc(), Project.id.desc()).limit(args.page).all()
+
+        project = Project.query.filter_by(status="completed").options(joinedload(Project.client), joinedload(Project.freelancer)).first()
+        bids = [snapshot(b, freelancer=b.freelancer) for b in project.bids.options(joinedload(Bid.freelancer))]
+        reviews = [snapshot(r, reviewer=r.reviewer, reviewee=r.reviewee) for r in project.reviews]
+        details = snapshot(project, client=project.client, freelancer=project.freelancer, bids=bids, reviews=reviews)
+
+        reviewee_id = db.session.query(Review.reviewee_id).group_by(Review.reviewee_id).order_by(func.count().desc()).limit(1).scalar()
+        user = db.session.get(User, reviewee_id)
+        history = Project.query.join(Bid, Project.accepted_bid_id == Bid.id).filter(Bid.freelancer_id == user.id) \
+            .options(joinedload(Project.client)).limit(args.page).all()
+        received = Review.query.filter_by(reviewee_id=user.id).options(joinedload(Review.reviewer), joinedload(Review.project)) \
+            .limit(args.page).all()
+
+        def profile(dump):
+            data = dump(routes.profile_user_schema, user)
+            data["accepted_projects"] = dump(routes.project_summaries_schema, history)
+            data["reviews_received"] = dump(routes.review_summaries_schema, received)
+            return data
+
+        marshmallow_dump = lambda schema, obj: schema.dump(obj)
+        feed_schema = routes.feed_schema(routes.FEED_FIELDS)
+        endpoints = [
+            (f"feed ({len(feed)} projects)", lambda dump: dump(feed_schema, feed)),
+            (f"project details ({len(bids)} bids)", lambda dump: dump(routes.project_schema, details)),
+            (f"profile ({len(history)}+{len(received)} entries)", profile),
+        ]
+        encoders = [("stdlib", "stdlib")] + ([("orjson", "orjson")] if orjson is not None else [])
+
+        print(f"{'endpoint':<32} {'path':<18} {'ms/op':>8} {'ops/s':>8} {'speedup':>8}")
+        for name, build in endpoints:
+            expected = jsonify(build(marshmallow_dump)).get_data()
+            baseline = timeit.timeit(lambda: jsonify(build(marshmallow_dump)).get_data(), number=args.rounds) / args.rounds
+            print(f"{name:<32} {'marshmallow':<18} {baseline * 1000:>8.3f} {1 / baseline:>8.0f} {1:>7.1f}x")
+            for label, encoder in encoders:
+                app.config["JSON_ENCODER"] = encoder
+                assert encode(build(fast_dump)) == expected, f"{name}: {label} output differs from marshmallow"
+                seconds = timeit.timeit(lambda: encode(build(fast_dump)), number=args.rounds) / args.rounds
+                print(f"{'':<32} {'compiled+' + label:<18} {seconds * 1000:>8.3f} {1 / seconds:>8.0f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Serving modes under many concurrent clients. For each SERVER_MODE (sync,
+gthread, gevent when installed) starts gunicorn with the same worker count
+and drives --clients concurrent asyncio clients over the read endpoints (feed,
+project details, profile) for --seconds, one connection per request.
+Reports requests/s, p50/p99 latency and failures.
+
+A local SQLite answers in microseconds, which hides what the modes are for,
+so the server adds --db-latency-ms of sleep to every statement to stand in
+for the round trip to a networked database (0 to turn off). With a real
+database pass --database-url (an empty one: it is dropped and reseeded) and
+--db-latency-ms 0.
+
+    python -m benchmarks.bench_serving --clients 500 --seconds 15 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from urllib.request import urlopen
+
+from benchmarks.bench_startup import free_port
+from benchmarks.datagen import seed, add_database_args, scratch_database_url
+
+
+def latency_app():
+    """gunicorn entry point: the app, with BENCH_DB_LATENCY_MS slept before each statement."""
+    from sqlalchemy import event
+    from app import create_app, db
+
+    app = create_app()
+    delay = float(os.environ.get("BENCH_DB_LATENCY_MS", 0)) / 1000
+    if delay:
+        with app.app_context():
+            # time.sleep is what a blocking driver does to the worker: gevent patches it, threads release the GIL
+            event.listen(db.engine, "before_cursor_execute", lambda *a: time.sleep(delay))
+    return app
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        data = await reader.read()
+        return int(data[9:12])
+    finally:
+        writer.close()
+
+
+async def drive(port, paths, clients, seconds, timeout):
+    latencies, failures, stop = [], {}, time.perf_counter() + seconds
+
+    async def client():
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(fetch(port, random.choice(paths)), timeout)
+            except (OSError, asyncio.TimeoutError, ValueError) as exc:
+                status = type(exc).__name__
+            if status == 200: latencies.append((time.perf_counter() - start) * 1000)
+            else: failures[status] = failures.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, failures, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=32, help="SERVER_THREADS for gthread")
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=30, help="per-request client timeout")
+    parser.add_argument("--modes", nargs="+", default=["sync", "gthread", "gevent"])
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from config import Config
+
+    url = scratch_database_url(parser, args, "serving")
+
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        clients, freelancers, open_ids = seed(db, users=1000, projects=5000, bids_per_project=5)
+        db.engine.dispose()
+    paths = (["/api/projects?limit=20"] * 2 + [f"/api/project/{pid}" for pid in random.sample(open_ids, 200)]
+             + [f"/api/user/{uid}" for uid in random.sample(freelancers, 100)])
+
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        if "gevent" in args.modes:
+            print("gevent not installed: skipping that mode")
+            args.modes.remove("gevent")
+
+    print(f"{args.clients} clients x {args.seconds:.0f}s, {args.workers} workers, {args.db_latency_ms}ms per statement")
+    print(f"{'mode':<22} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'ok':>7}  failures")
+    for mode in args.modes:
+        port = free_port()
+        # Every in-flight request can hold a connection: give the pool room for the mode's concurrency
+        pool = {"sync": 1, "gthread": args.threads, "gevent": args.clients}[mode]
+        env = dict(os.environ, DATABASE_URL=url, DB_AUTO_UPGRADE="false", SERVER_MODE=mode,
+                   SERVER_THREADS=str(args.threads), DB_POOL_SIZE=str(pool), DB_MAX_OVERFLOW="0",
+                   BENCH_DB_LATENCY_MS=str(args.db_latency_ms))
+        server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-w", str(args.workers), "-b", f"127.0.0.1:{port}",
+                                   "--backlog", "4096", "--timeout", "120", "benchmarks.bench_serving:latency_app()"],
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(400):
+                try:
+                    urlopen(f"http://127.0.0.1:{port}/api/projects?limit=1", timeout=2).read()
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            asyncio.run(drive(port, paths, min(args.clients, 50), 1, args.timeout))  # warm up
+            latencies, failures, elapsed = asyncio.run(drive(port, paths, args.clients, args.seconds, args.timeout))
+        finally:
+            server.terminate()
+            server.wait()
+        latencies.sort()
+        label = f"{mode} ({args.threads} threads)" if mode == "gthread" else mode
+        p99 = latencies[int(len(latencies) * 0.99)] if latencies else float("nan")
+        print(f"{label:<22} {len(latencies) / elapsed:>8.1f} {statistics.median(latencies) if latencies else float('nan'):>8.1f} "
+              f"{p99:>8.1f} {len(latencies):>7}  {failures or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Startup cost. Cold boot: a fresh interpreter importing the app and running
+create_app, with and without DB_AUTO_UPGRADE, plus its first request.
+Worker readiness: a local gunicorn with and without preload_app, timed from
+launch until the first response and until every worker has answered.
+
+    python -m benchmarks.bench_startup --runs 5 --workers 4
+    python -m benchmarks.bench_startup --database-url postgresql://...   # must be empty
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+# The servers started here expose /api/metrics/* to this token
+METRICS_TOKEN = "bench"
+METRICS_HEADERS = {"X-Metrics-Token": METRICS_TOKEN}
+
+BOOT = r"""
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get("/api/projects").status_code
+served = time.perf_counter()
+print(json.dumps({"import": imported - start, "create_app": created - imported, "first_request": served - created,
+                  "status": status, "scraper_loaded": "requests" in sys.modules}))
+"""
+
+
+def cold_boot(env):
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", BOOT], env=env, capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - started
+    return result
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def worker_readiness(env, workers, preload, timeout=60):
+    """Returns (seconds to first response, seconds until `workers` distinct pids answered)."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/metrics/db_pool"  # reports the answering worker's pid
+    env = dict(env, GUNICORN_PRELOAD="true" if preload else "false", METRICS_TOKEN=METRICS_TOKEN)
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "app:create_app()"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def ping(_):
+        try:
+            with urlopen(Request(url, headers=METRICS_HEADERS), timeout=2) as resp:
+                return json.load(resp)["pid"]
+        except (URLError, OSError):
+            return None
+
+    first, pids = None, set()
+    try:
+        with ThreadPoolExecutor(workers * 2) as pool:
+            # Sync workers take one request at a time, so concurrent pings spread over all of them
+            while len(pids) < workers and time.perf_counter() - started < timeout:
+                answered = {pid for pid in pool.map(ping, range(workers * 2)) if pid}
+                if answered and first is None: first = time.perf_counter() - started
+                pids |= answered
+                if not answered: time.sleep(0.01)
+        return first, time.perf_counter() - started if len(pids) >= workers else None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    from benchmarks.datagen import add_database_args, scratch_database_url, seed
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from config import Config
+
+    url = scratch_database_url(parser, args, "startup")
+
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(db, users=500, projects=2000)
+        db.engine.dispose()
+    env = dict(os.environ, DATABASE_URL=url, SERVER_MODE="sync")  # readiness pings rely on one request per worker
+
+    print(f"cold boot (median of {args.runs})      import   create_app  first req   process  scraper loaded")
+    for upgrade in ("true", "false"):
+        runs = [cold_boot(dict(env, DB_AUTO_UPGRADE=upgrade)) for _ in range(args.runs)]
+        med = lambda key: statistics.median(r[key] for r in runs) * 1000
+        assert all(r["status"] == 200 for r in runs)
+        print(f"  DB_AUTO_UPGRADE={upgrade:<5}            {med('import'):>7.0f}ms {med('create_app'):>9.0f}ms "
+              f"{med('first_request'):>8.0f}ms {med('process'):>8.0f}ms  {runs[0]['scraper_loaded']}")
+
+    print(f"gunicorn, {args.workers} sync workers (median of {args.runs})   first response   all workers ready")
+    for upgrade in ("true", "false"):
+        for preload in (False, True):
+            runs = [worker_readiness(dict(env, DB_AUTO_UPGRADE=upgrade), args.workers, preload) for _ in range(args.runs)]
+            ready = [r[1] for r in runs if r[1] is not None]
+            print(f"  DB_AUTO_UPGRADE={upgrade:<5} preload={str(preload):<5} {statistics.median(r[0] for r in runs) * 1000:>13.0f}ms "
+                  f"{statistics.median(ready) * 1000 if ready else float('nan'):>16.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Synthetic marketplace data for the benchmarks. seed() is imported by every
+benchmark; run as a module it seeds a SQLite file or --database-url at the
+requested scale, e.g. for a gunicorn-backed run of benchmarks.suite:
+
+    python -m benchmarks.datagen --sqlite /tmp/bench.db --users 20000 --projects 200000 --bids-per-project 5
+    python -m benchmarks.datagen --database-url postgresql://... --projects 200000   # 1M bids
+
+The target's tables are dropped first, so a database that already has any is
+refused unless --i-know-this-drops-tables is passed (e.g. to reseed).
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+SKILLS = ["python", "flask", "react", "javascript", "java", "go", "sql", "docker", "aws", "css",
+          "rust", "c++", "figma", "seo", "copywriting", "django", "node", "kotlin", "swift", "php"]
+PASSWORD = "bench-password"
+CHUNK = 5000  # rows per executemany; projects are generated and flushed in chunks of this size
+
+
+def add_database_args(parser):
+    """--database-url / --i-know-this-drops-tables, for benchmarks that drop and recreate the schema."""
+    parser.add_argument("--database-url", help="database to drop and reseed (default: a temp SQLite file; DATABASE_URL is ignored)")
+    parser.add_argument("--i-know-this-drops-tables", action="store_true",
+                        help="allow a --database-url that already has tables; they are dropped")
+
+
+def scratch_database_url(parser, args, name):
+    """
+    URL the benchmark may drop_all() on: --database-url if given, else a temp
+    SQLite file named after the benchmark. Refuses (parser.error) a database
+    that already has tables unless --i-know-this-drops-tables is passed.
+    """
+    if not args.database_url:
+        return "sqlite:///" + os.path.join(tempfile.mkdtemp(), f"{name}.db")
+    from sqlalchemy import create_engine, inspect
+    engine = create_engine(args.database_url)
+    try:
+        tables = sorted(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+    if tables and not args.i_know_this_drops_tables:
+        parser.error(f"{engine.url!r} already has tables ({', '.join(tables[:5])}{', ...' if len(tables) > 5 else ''}) "
+                     "and the benchmark drops them; pass --i-know-this-drops-tables to go ahead")
+    return args.database_url
+
+
+def seed(db, users=2000, projects=20000, bids_per_project=5, seed_value=11, skills=SKILLS):
+    """
+    Bulk-inserts a synthetic marketplace (about 60% of projects open, 20%
+    completed with an accepted bid and a review). Every user can log in with
+    user<id>@bench.local / PASSWORD; every fourth user is a client.
+    Returns (client_ids, freelancer_ids, open_project_ids).
+    """
+    from app.models import User, Project, Bid, Review, Skill, ExternalProfile, project_skill, user_skill
+    from app.search import rebuild_search_index
+    from app.recommendations import rebuild_open_project_index
+    from app.freelancer_stats import rebuild_freelancer_stats
+    rng = random.Random(seed_value)
+    pw_hash = generate_password_hash(PASSWORD)
+    now = datetime.utcnow()
+
+    def insert(table, rows):
+        stmt = table.insert() if hasattr(table, "c") else db.insert(table)
+        for i in range(0, len(rows), CHUNK):
+            db.session.execute(stmt, rows[i:i + CHUNK])
+
+    insert(Skill, [{"id": i + 1, "name": s} for i, s in enumerate(skills)])
+    user_rows, user_tags = [], []
+    for uid in range(1, users + 1):
+        tags = rng.sample(range(1, len(skills) + 1), rng.randint(1, 5))
+        user_rows.append({"id": uid, "username": f"user{uid}", "email": f"user{uid}@bench.local",
+                          "password_hash": pw_hash, "is_freelancer": uid % 4 != 0,
+                          "skills": ",".join(skills[t - 1] for t in tags), "avg_rating": round(rng.uniform(0, 5), 2),
+                          "projects_accepted": 0, "projects_completed": 0, "review_count": 0, "rating_sum": 0})
+        user_tags += [{"user_id": uid, "skill_id": t} for t in tags]
+    insert(User, user_rows)
+    insert(user_skill, user_tags)
+    clients = [u["id"] for u in user_rows if not u["is_freelancer"]]
+    freelancers = [u["id"] for u in user_rows if u["is_freelancer"]]
+    del user_rows, user_tags
+
+    open_ids = []
+    bid_id = 0
+    for start in range(1, projects + 1, CHUNK):
+        project_rows, project_tags, bid_rows, review_rows = [], [], [], []
+        for pid in range(start, min(start + CHUNK, projects + 1)):
+            tags = rng.sample(range(1, len(skills) + 1), rng.randint(1, 4))
+            status = rng.choice(["open", "open", "open", "in_progress", "completed"])
+            project_rows.append({"id": pid, "title": f"Project {pid}", "description": "Synthetic project " * 8,
+                                 "budget": rng.randint(50, 5000), "status": status,
+                                 "created_at": now - timedelta(minutes=pid), "client_id": rng.choice(clients),
+                                 "required_skills": ",".join(skills[t - 1] for t in tags), "deadline_days": 7,
+                                 "ranking_version": 0})
+            project_tags += [{"project_id": pid, "skill_id": t} for t in tags]
+            for fid in rng.sample(freelancers, bids_per_project):
+                bid_id += 1
+                bid_rows.append({"id": bid_id, "amount": rng.randint(50, 5000), "proposal": "Synthetic proposal",
+                                 "created_at": now, "proposed_timeline_days": rng.randint(1, 30),
+                                 "project_id": pid, "freelancer_id": fid})
+            if status == "open":
+                open_ids.append(pid)
+            elif status == "completed" and bids_per_project:
+                winner = bid_rows[-1]
+                project_rows[-1].update(freelancer_id=winner["freelancer_id"], accepted_bid_id=winner["id"])
+                review_rows.append({"rating": rng.randint(1, 5), "project_id": pid, "created_at": now,
+                                    "reviewer_id": project_rows[-1]["client_id"], "reviewee_id": winner["freelancer_id"]})
+        for table, rows in ((Project, project_rows), (project_skill, project_tags), (Bid, bid_rows), (Review, review_rows)):
+            insert(table, rows)
+
+    insert(ExternalProfile, [
+        {"user_id": uid, "provider": "freelancer", "external_username": f"ext{uid}", "rating": 4.5, "reviews": 10}
+        for uid in freelancers[::10]
+    ])
+    db.session.commit()
+    rebuild_search_index()  # bulk inserts bypass the routes that keep these current
+    rebuild_open_project_index()
+    rebuild_freelancer_stats()
+    return clients, freelancers, open_ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=20000)
+    parser.add_argument("--bids-per-project", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--sqlite", help="SQLite file to create")
+    add_database_args(parser)
+    args = parser.parse_args()
+    if bool(args.sqlite) == bool(args.database_url):
+        parser.error("pass one of --sqlite or --database-url")
+    if args.sqlite: args.database_url = "sqlite:///" + os.path.abspath(args.sqlite)
+
+    from sqlalchemy import text
+    from app import create_app, db
+    from config import Config
+
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "seed")
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        start = time.perf_counter()
+        clients, freelancers, open_ids = seed(db, args.users, args.projects, args.bids_per_project, args.seed)
+        with db.engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        print(f"{len(clients)} clients, {len(freelancers)} freelancers, {args.projects} projects ({len(open_ids)} open), "
+              f"{args.projects * args.bids_per_project} bids in {time.perf_counter() - start:.1f}s -> {db.engine.url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Query-plan regression check. Seeds a large synthetic dataset, drives each
+API route through the Flask test client, captures the SQL it issues and
+EXPLAINs every statement. Exits non-zero if any statement falls back to a
+full scan of a seeded table.
+Drops and recreates its database: a temp SQLite file unless --database-url
+names one, which must be empty (or pass --i-know-this-drops-tables).
+
+    python -m benchmarks.explain_plans                   # temp SQLite file
+    python -m benchmarks.explain_plans --database-url postgresql://...   # must be empty
+"""
+import argparse
+import sys
+
+from sqlalchemy import event, text
+
+from benchmarks.datagen import seed, PASSWORD, add_database_args, scratch_database_url
+
+SEEDED_TABLES = {"user", "project", "bid", "review", "project_skill", "user_skill", "external_profile", "open_project_skill"}
+
+
+def explain(conn, statement, params):
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).fetchall()
+        return [r[-1] for r in rows]
+    rows = conn.exec_driver_sql("EXPLAIN " + statement, params).fetchall()
+    return [r[0] for r in rows]
+
+
+def full_scans(plan, dialect):
+    bad = []
+    for line in plan:
+        if dialect == "sqlite":
+            # "SCAN project" / "SCAN project USING INDEX ..." walk the whole table or index
+            words = line.split()
+            if words[:1] == ["SCAN"] and len(words) > 1 and words[1].strip('"') in SEEDED_TABLES:
+                bad.append(line)
+        elif "Seq Scan on" in line:
+            table = line.split("Seq Scan on", 1)[1].split()[0].strip('"')
+            if table in SEEDED_TABLES:
+                bad.append(line.strip())
+    return bad
+
+
+def scenarios(client, clients, freelancers, open_projects):
+    """(name, callable) pairs exercising the main query of every route."""
+    def login(uid):
+        r = client.post("/api/auth/login", json={"email": f"user{uid}@bench.local", "password": PASSWORD})
+        return {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+
+    client_h, freelancer_h = login(clients[0]), login(freelancers[-1])
+    first_page = client.get("/api/projects")
+    cursor = first_page.headers.get("X-Next-Cursor")
+    return [
+        ("auth/login", lambda: login(freelancers[0])),
+        ("projects feed", lambda: client.get("/api/projects")),
+        ("projects feed (cursor)", lambda: client.get(f"/api/projects?cursor={cursor}")),
+        ("projects feed (skill any)", lambda: client.get("/api/projects?skill=python,rust")),
+        ("projects feed (skill all)", lambda: client.get("/api/projects?skill=python,sql&match=all")),
+        ("recommendations", lambda: client.get("/api/recommendations", headers=freelancer_h)),
+        ("project search", lambda: client.get("/api/projects/search?q=synthetic%20proj")),
+        ("project search (filtered)", lambda: client.get("/api/projects/search?q=project&min_budget=1000&skill=python")),
+        ("projects feed (revalidate)", lambda: client.get("/api/projects", headers={"If-None-Match": '"stale"'})),
+        ("project details", lambda: client.get(f"/api/project/{open_projects[5]}")),
+        ("user profile (freelancer)", lambda: client.get(f"/api/user/{freelancers[3]}")),
+        ("user profile (client)", lambda: client.get(f"/api/user/{clients[3]}")),
+        ("freelancer leaderboard", lambda: client.get("/api/freelancers/top")),
+        ("freelancer leaderboard (skill)", lambda: client.get("/api/freelancers/top?skill=python")),
+        ("rank bids", lambda: client.post("/api/rank_bids", json={"project_id": open_projects[7], "priority": "price"})),
+        ("place bid", lambda: client.post(f"/api/project/{open_projects[9]}/bid", json={"amount": 100, "proposal": "x"}, headers=freelancer_h)),
+        ("create project", lambda: client.post("/api/projects", json={"title": "t", "description": "d", "budget": 10,
+                                                                       "required_skills": "python"}, headers=client_h)),
+        ("update profile skills", lambda: client.put("/api/user/profile", json={"skills": "python,go"}, headers=freelancer_h)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--verbose", action="store_true")
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from config import Config
+
+    class PlanConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "explain")
+
+    app = create_app(PlanConfig)
+    failures = 0
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        clients, freelancers, open_projects = seed(db, users=args.users, projects=args.projects)
+        with db.engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        client = app.test_client()
+        for name, run in scenarios(client, clients, freelancers, open_projects):
+            captured = []
+            def capture(conn, cursor, statement, params, context, executemany):
+                if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                    captured.append((statement, params))
+            event.listen(db.engine, "before_cursor_execute", capture)
+            try:
+                run()
+            finally:
+                event.remove(db.engine, "before_cursor_execute", capture)
+
+            with db.engine.connect() as conn:
+                for statement, params in captured:
+                    plan = explain(conn, statement, params)
+                    bad = full_scans(plan, conn.dialect.name)
+                    if bad or args.verbose:
+                        print(f"[{'FAIL' if bad else 'ok'}] {name}: {' '.join(statement.split())[:160]}")
+                        for line in plan: print(f"        {line}")
+                    failures += bool(bad)
+            print(f"{name:<28} {len(captured):>3} statements checked")
+
+    print("FAIL" if failures else "OK", f"- {failures} statement(s) with full scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Query-count regression check. Sets up one client, one freelancer and two
+open projects, counts the statements each scenario's request issues, then
+grows the rows behind it (the freelancer's won projects, the reviews on both
+sides, the bids on each open project) and counts again, --rounds times.
+Exits non-zero if a scenario's count changed with the row count (some
+endpoint went back to a query per row) or went over the scenario's budget.
+Drops and recreates its database: a temp SQLite file unless --database-url
+names one, which must be empty (or pass --i-know-this-drops-tables).
+
+    python -m benchmarks.query_counts                    # temp SQLite file
+    python -m benchmarks.query_counts --database-url postgresql://... --growth 200   # must be empty
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from benchmarks.datagen import PASSWORD, add_database_args, scratch_database_url
+
+
+def add_history(db, client_id, freelancer_id, n):
+    """n completed projects of the client, won by the freelancer, each reviewed both ways."""
+    from app.models import Project, Bid, Review
+    now = datetime.utcnow()
+    first = (db.session.scalar(db.select(db.func.max(Project.id))) or 0) + 1
+    first_bid = (db.session.scalar(db.select(db.func.max(Bid.id))) or 0) + 1
+    ids = range(first, first + n)
+    db.session.execute(db.insert(Project), [
+        {"id": pid, "title": f"Project {pid}", "description": "History project", "budget": 100, "status": "completed",
+         "created_at": now - timedelta(minutes=pid), "client_id": client_id} for pid in ids])
+    db.session.execute(db.insert(Bid), [
+        {"id": first_bid + i, "amount": 100, "proposal": "History bid", "project_id": pid, "freelancer_id": freelancer_id}
+        for i, pid in enumerate(ids)])
+    db.session.execute(db.update(Project), [
+        {"id": pid, "freelancer_id": freelancer_id, "accepted_bid_id": first_bid + i} for i, pid in enumerate(ids)])
+    db.session.execute(db.insert(Review), [
+        {"rating": 5, "comment": "Great", "project_id": pid, "reviewer_id": reviewer, "reviewee_id": reviewee, "created_at": now}
+        for pid in ids for reviewer, reviewee in ((client_id, freelancer_id), (freelancer_id, client_id))])
+    db.session.commit()
+
+
+def add_bidders(db, project_id, n, stats):
+    """n new freelancers bidding on the project; with `stats` their freelancer_stats rows are built too."""
+    from app.models import User, Bid
+    from app.freelancer_stats import refresh_freelancer_stats
+    first = (db.session.scalar(db.select(db.func.max(User.id))) or 0) + 1
+    ids = range(first, first + n)
+    db.session.execute(db.insert(User), [
+        {"id": uid, "username": f"bidder{uid}", "email": f"bidder{uid}@bench.local", "password_hash": "-",
+         "is_freelancer": True, "avg_rating": uid % 5, "completion_rate": 90.0} for uid in ids])
+    db.session.execute(db.insert(Bid), [
+        {"amount": 100 + uid % 50, "proposal": "Bid", "proposed_timeline_days": uid % 20 + 1, "project_id": project_id,
+         "freelancer_id": uid} for uid in ids])
+    if stats: refresh_freelancer_stats(ids)
+    db.session.commit()
+
+
+def scenarios(client, client_id, freelancer_id, ranked, ranked_without_stats):
+    """(name, callable, budget): requests whose query count must not depend on the data behind them, nor exceed budget."""
+    def login(email):
+        r = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        return {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+
+    freelancer_h = login("freelancer@bench.local")
+    return [
+        ("user profile (freelancer)", lambda: client.get(f"/api/user/{freelancer_id}"), 4),
+        ("user profile (client)", lambda: client.get(f"/api/user/{client_id}"), 4),
+        ("my profile", lambda: client.get("/api/user/profile", headers=freelancer_h), 4),
+        ("project details", lambda: client.get(f"/api/project/{ranked}"), 3),
+        ("rank bids", lambda: client.post("/api/rank_bids", json={"project_id": ranked}), 1),
+        ("rank bids (no stats rows)", lambda: client.post("/api/rank_bids", json={"project_id": ranked_without_stats}), 2),
+    ]
+
+
+def count_statements(db, run):
+    """Statements issued by run(), after one warm-up call (identity cache, compiled schemas)."""
+    from app import ranking_cache
+    run()
+    ranking_cache.clear()  # count the ranking itself, not a cached body
+    captured = []
+
+    def capture(conn, cursor, statement, params, context, executemany):
+        captured.append(statement)
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        resp = run()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    if resp.status_code != 200:
+        raise RuntimeError(f"{resp.request.path} answered {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+    return len(captured)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--growth", type=int, default=50, help="rows added behind every scenario per round")
+    parser.add_argument("--rounds", type=int, default=2)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.models import User, Project
+    from config import Config
+
+    class CountConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "counts")
+
+    app = create_app(CountConfig)
+    failures = 0
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        users = [User(username=name, email=f"{name}@bench.local", is_freelancer=name == "freelancer")
+                 for name in ("client", "freelancer")]
+        for user in users: user.set_password(PASSWORD)
+        db.session.add_all(users)
+        db.session.commit()
+        client_id, freelancer_id = (u.id for u in users)
+        projects = [Project(title=f"Open {i}", description="Open project", budget=100, client_id=client_id) for i in range(2)]
+        db.session.add_all(projects)
+        db.session.commit()
+        ranked = [p.id for p in projects]
+
+        def grow(n):
+            add_history(db, client_id, freelancer_id, n)
+            add_bidders(db, ranked[0], n, stats=True)
+            add_bidders(db, ranked[1], n, stats=False)
+
+        grow(1)
+        budgets = {name: budget for name, _, budget in scenarios(app.test_client(), client_id, freelancer_id, *ranked)}
+        counts = {name: [] for name in budgets}
+        for round_ in range(args.rounds + 1):
+            if round_: grow(args.growth)
+            for name, run, _ in scenarios(app.test_client(), client_id, freelancer_id, *ranked):
+                counts[name].append(count_statements(db, run))
+
+        sizes = [1 + args.growth * r for r in range(args.rounds + 1)]
+        print(f"{'scenario':<34} {'budget':>6}  statements at {' / '.join(map(str, sizes))} rows")
+        for name, seen in counts.items():
+            bad = len(set(seen)) > 1 or max(seen) > budgets[name]
+            failures += bad
+            print(f"[{'FAIL' if bad else 'ok'}] {name:<28} {budgets[name]:>6}  {' / '.join(map(str, seen))}")
+
+    print("FAIL" if failures else "OK", f"- {failures} scenario(s) whose query count grows with the data or is over budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Concurrency stress check for the project workflow. Worker threads race
+every transition against each other through the real routes:
+  - every bid of a project is accepted at once,
+  - the freelancer submits the work several times at once,
+  - the client approves it several times at once.
+It then checks the invariants. Each transition succeeds exactly once per
+project and every loser gets a 409. projects_accepted, projects_completed
+and the on-time/delayed counters increase by exactly the number of
+transitions that succeeded. Exits non-zero on any violation.
+
+    python -m benchmarks.stress_workflow --projects 200 --workers 16
+    python -m benchmarks.stress_workflow --database-url postgresql://...   # must be empty
+"""
+import argparse
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.datagen import seed, add_database_args, scratch_database_url
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=200, help="open projects raced")
+    parser.add_argument("--bids", type=int, default=8, help="bids per project, all accepted at once")
+    parser.add_argument("--repeat", type=int, default=4, help="concurrent submits / approvals per project")
+    parser.add_argument("--workers", type=int, default=16)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db
+    from app.models import User, Project, Bid
+    from config import Config
+
+    class StressConfig(Config):
+        SQLALCHEMY_DATABASE_URI = scratch_database_url(parser, args, "workflow")
+        # SQLite serializes writers on the file lock: let them queue past the 5s default
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 60}} if SQLALCHEMY_DATABASE_URI.startswith("sqlite") else {}
+
+    app = create_app(StressConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        _, _, open_ids = seed(db, users=500, projects=int(args.projects / 0.6) + 50, bids_per_project=args.bids)
+        projects = db.session.execute(db.select(Project.id, Project.client_id).where(Project.id.in_(open_ids[:args.projects]))).all()
+        bids = db.session.execute(db.select(Bid.id, Bid.project_id, Bid.freelancer_id).where(Bid.project_id.in_([p.id for p in projects]))).all()
+        counters = ("projects_accepted", "projects_completed", "on_time_count", "delayed_count")
+        before = {row.id: row for row in db.session.execute(db.select(User.id, *(getattr(User, c) for c in counters)))}
+        tokens = {uid: create_access_token(identity=str(uid)) for uid in before}
+    client_of = {p.id: p.client_id for p in projects}
+
+    def post(path, uid, json=None):
+        with app.test_client() as client:
+            return client.post(path, json=json, headers={"Authorization": f"Bearer {tokens[uid]}"}).status_code
+
+    def race(calls):
+        rng = random.Random(5)
+        rng.shuffle(calls)
+        with ThreadPoolExecutor(args.workers) as pool:
+            return list(pool.map(lambda call: (call[0], post(*call[1:])), calls))
+
+    failures = []
+
+    def check_once(name, outcomes):
+        per_project = {}
+        for project_id, status in outcomes:
+            per_project.setdefault(project_id, Counter())[status] += 1
+        for project_id, statuses in per_project.items():
+            if statuses[200] != 1 or set(statuses) - {200, 409}:
+                failures.append(f"{name}: project {project_id} got {dict(statuses)}")
+        print(f"{name:<10} {len(outcomes):>6} requests  {sum(s == 200 for _, s in outcomes):>5} won  "
+              f"{sum(s == 409 for _, s in outcomes):>5} conflicts")
+
+    check_once("accept", race([(b.project_id, f"/api/project/{b.project_id}/accept_bid", client_of[b.project_id], {"bid_id": b.id}) for b in bids]))
+    with app.app_context():
+        winners = dict(db.session.execute(db.select(Project.id, Project.freelancer_id).where(Project.id.in_(client_of))).all())
+    check_once("submit", race([(pid, f"/api/project/{pid}/complete", winners[pid]) for pid in client_of for _ in range(args.repeat)]))
+    check_once("approve", race([(pid, f"/api/project/{pid}/accept", client_of[pid]) for pid in client_of for _ in range(args.repeat)]))
+
+    with app.app_context():
+        after = {row.id: row for row in db.session.execute(db.select(User.id, *(getattr(User, c) for c in counters)))}
+        statuses = Counter(db.session.scalars(db.select(Project.status).where(Project.id.in_(client_of))))
+    won = Counter(winners.values())
+    for uid, row in after.items():
+        gained = {c: (getattr(row, c) or 0) - (getattr(before[uid], c) or 0) for c in counters}
+        expected = won[uid]
+        if gained["projects_accepted"] != expected or gained["projects_completed"] != expected \
+                or gained["on_time_count"] + gained["delayed_count"] != expected:
+            failures.append(f"user {uid}: counters moved {gained}, expected {expected} each")
+    if statuses != Counter({"completed": len(client_of)}):
+        failures.append(f"final statuses {dict(statuses)}")
+
+    for failure in failures[:20]:
+        print("FAIL", failure)
+    print(f"{'FAILED' if failures else 'OK'} - {len(failures)} invariant violation(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
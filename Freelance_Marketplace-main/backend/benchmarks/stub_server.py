@@ -0,0 +1,115 @@
+"""
+Local stand-in for freelancer.com profile pages, for exercising the scraper,
+import jobs and bulk refresh without network access.
+
+    server = StubProfileServer(latency=0.01).start()
+    app.config["FREELANCER_PROFILE_URL"] = server.url_template
+    ...
+    server.stop()
+
+Behaviour by username: "down-*" drops the connection, "flaky-*" drops it on
+the first two requests, everything else gets a page with a rating derived
+from the name. Pages carry ETag/Last-Modified and honour conditional GETs.
+"""
+import hashlib
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+FILLER = "<p>" + "Portfolio item and profile text. " * 400 + "</p>"
+
+
+def profile_page(username):
+    digest = int(hashlib.sha1(username.encode()).hexdigest(), 16)
+    rating, reviews = 3 + (digest % 20) / 10, digest % 900
+    return (f"<html><head><title>{username}</title><script>var cfg = {{}};</script></head><body>"
+            f"{FILLER}<div class='rating'>{rating:.1f} ({reviews} reviews)</div>{FILLER * 4}</body></html>")
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients hanging up early (the scraper stops at the match) is expected
+
+
+class StubProfileServer:
+    def __init__(self, latency=0.0, port=0):
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._server = _QuietServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url_template(self):
+        return f"http://127.0.0.1:{self._server.server_port}/u/{{username}}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+            def do_GET(self):
+                username = self.path.rsplit("/", 1)[-1]
+                with stub._lock:
+                    stub.requests += 1
+                    stub._attempts[username] = attempt = stub._attempts.get(username, 0) + 1
+                if stub.latency: time.sleep(stub.latency)
+                if username.startswith("down-") or (username.startswith("flaky-") and attempt < 3):
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+
+                body = profile_page(username).encode()
+                etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                    with stub._lock: stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _serve(latency, conn):
+    server = StubProfileServer(latency=latency)
+    conn.send(server.url_template)
+    server._server.serve_forever()
+
+
+def start_subprocess(latency=0.0):
+    """
+    Runs the stub in its own process so it doesn't share the GIL with the
+    code under measurement. Returns: (process, url_template)
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(latency, child), daemon=True)
+    process.start()
+    return process, parent.recv()
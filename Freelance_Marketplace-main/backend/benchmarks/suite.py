@@ -0,0 +1,379 @@
+"""
+Benchmark suite. Microbenchmarks of the ranking and serialization hot paths,
+then end-to-end latency and throughput of every API route, written as one
+JSON document. --compare flags results whose median got slower than
+--threshold percent against a baseline run, and exits non-zero if any did.
+
+    python -m benchmarks.suite --output base.json                  # Flask test client, temp SQLite file
+    python -m benchmarks.suite --output new.json --compare base.json
+    python -m benchmarks.suite --compare base.json new.json        # compare two saved runs, nothing measured
+
+Against a local gunicorn, seed its database with benchmarks.datagen first
+and point the suite at both (write scenarios change the data, so reseed
+with --i-know-this-drops-tables before runs that get compared):
+
+    python -m benchmarks.datagen --sqlite /tmp/bench.db --projects 200000
+    DATABASE_URL=sqlite:////tmp/bench.db gunicorn -w 4 -b 127.0.0.1:8000 web_run:app
+    python -m benchmarks.suite --sqlite /tmp/bench.db --reuse --url http://127.0.0.1:8000 --concurrency 8
+
+Not covered: /user/import_freelancer_rating and /user/import_jobs/<id> start
+scraper jobs (see bench_refresh, which runs them against a stub server).
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from benchmarks.bench_startup import METRICS_TOKEN, METRICS_HEADERS
+from benchmarks.datagen import seed, PASSWORD, SKILLS, add_database_args, scratch_database_url
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"n": len(ordered), "mean_ms": round(statistics.fmean(ordered), 4), "p50_ms": round(statistics.median(ordered), 4),
+            "p95_ms": round(pick(0.95), 4), "p99_ms": round(pick(0.99), 4), "min_ms": round(ordered[0], 4)}
+
+
+def sample(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+# --- microbenchmarks ---
+
+def micro_benchmarks(app, repeat):
+    from sqlalchemy.orm import joinedload, undefer
+    from app import db, routes
+    from app.models import Project, Bid
+    from app.ranking_logic import calculate_ranked_bids, normalize_feature_list, jaccard_skill_match
+    from app.serializers import fast_dump, encode
+    from benchmarks.bench_ranking import make_project_bids
+    from benchmarks.bench_serialization import snapshot
+
+    rng = random.Random(3)
+    results = {}
+    for n in (1000, 10000):
+        project, bids = make_project_bids(n)
+        results[f"calculate_ranked_bids[{n}]"] = sample(lambda: calculate_ranked_bids(project, bids), repeat)
+        results[f"calculate_ranked_bids[{n},top20]"] = sample(lambda: calculate_ranked_bids(project, bids, top_k=20), repeat)
+    values = [rng.uniform(0, 5000) for _ in range(10000)]
+    results["normalize_feature_list[10000]"] = sample(lambda: normalize_feature_list(values, invert=True), repeat)
+    pairs = [(rng.sample(SKILLS, 4), rng.sample(SKILLS, rng.randint(0, 6))) for _ in range(1000)]
+    results["jaccard_skill_match[1000 pairs]"] = sample(lambda: [jaccard_skill_match(p, f) for p, f in pairs], repeat)
+
+    with app.app_context(), app.test_request_context():
+        feed = Project.query.filter_by(status="open").options(joinedload(Project.client), undefer(Project.bid_count)) \
+            .order_by(Project.created_at.desc(), Project.id.desc()).limit(50).all()
+        project = Project.query.filter_by(status="completed").options(joinedload(Project.client), joinedload(Project.freelancer)).first()
+        bids = [snapshot(b, freelancer=b.freelancer) for b in project.bids.options(joinedload(Bid.freelancer))]
+        reviews = [snapshot(r, reviewer=r.reviewer, reviewee=r.reviewee) for r in project.reviews]
+        details = snapshot(project, client=project.client, freelancer=project.freelancer, bids=bids, reviews=reviews)
+        feed_schema = routes.feed_schema(routes.FEED_FIELDS)
+        results["schema dump feed[50] (marshmallow)"] = sample(lambda: feed_schema.dump(feed), repeat)
+        results["schema dump feed[50] (compiled)"] = sample(lambda: fast_dump(feed_schema, feed), repeat)
+        results["schema dump details (marshmallow)"] = sample(lambda: routes.project_schema.dump(details), repeat)
+        results["schema dump details (compiled)"] = sample(lambda: fast_dump(routes.project_schema, details), repeat)
+        page = fast_dump(feed_schema, feed)
+        results["encode feed[50]"] = sample(lambda: encode(page), repeat)
+        db.session.remove()
+    return results
+
+
+# --- end to end ---
+
+_dumps = json.dumps  # HttpClient.open's `json` argument shadows the module
+
+
+class HttpResponse:
+    def __init__(self, resp):
+        self.status_code = resp.status
+        self.headers = resp.headers
+        self.data = resp.read()
+
+    def get_json(self):
+        return json.loads(self.data)
+
+
+class HttpClient:
+    """The slice of Flask's test client the scenarios use, over keep-alive HTTP (one connection per thread)."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port, self.prefix = parts.hostname, parts.port or 80, parts.path.rstrip("/")
+        self._local = threading.local()
+
+    def open(self, method, path, json=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if json is not None:
+            body = _dumps(json)
+            headers["Content-Type"] = "application/json"
+        for retry in (False, True):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                return HttpResponse(conn.getresponse())
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()  # the server dropped the keep-alive connection: reconnect once
+                self._local.conn = None
+                if retry: raise
+
+    def get(self, path, **kwargs): return self.open("GET", path, **kwargs)
+    def post(self, path, **kwargs): return self.open("POST", path, **kwargs)
+    def put(self, path, **kwargs): return self.open("PUT", path, **kwargs)
+
+
+_rng = random.Random(9)
+_rng_lock = threading.Lock()
+
+
+def rng_choice(items):
+    with _rng_lock: return _rng.choice(items)
+
+
+def scenarios(client, clients, freelancers, open_projects, rounds):
+    """
+    (name, callable) per route, in run order. Each callable makes one request
+    and returns the response. The workflow routes share `rounds` fresh
+    projects, created up front; each scenario moves every one of them a
+    step further, so they have to run in this order.
+    """
+    def login(uid):
+        r = client.post("/api/auth/login", json={"email": f"user{uid}@bench.local", "password": PASSWORD})
+        return {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+
+    client_h, freelancer_h = login(clients[0]), login(freelancers[-1])
+    cursor = client.get("/api/projects").headers.get("X-Next-Cursor")
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def take(items):
+        it = iter(items)
+        def next_item():
+            with lock: return next(it)
+        return next_item
+
+    # Fresh projects with one bid from freelancer_h, one per workflow call
+    body = {"title": "Bench workflow", "description": "d", "budget": 500, "required_skills": "python,sql"}
+    lifecycle = []
+    for _ in range(rounds):
+        pid = client.post("/api/projects", json=body, headers=client_h).get_json()["id"]
+        bid = client.post(f"/api/project/{pid}/bid", json={"amount": 400, "proposal": "p"}, headers=freelancer_h).get_json()
+        lifecycle.append((pid, bid["id"]))
+
+    def register(n):
+        name = f"bench-{os.getpid()}-{n}"
+        return client.post("/api/auth/register", json={"username": name, "email": f"{name}@bench.local",
+                                                       "password": PASSWORD, "is_freelancer": True})
+
+    def new_freelancer():
+        """Headers of a freelancer registered just now, who has no bids yet."""
+        n = next(counter)
+        register(n)
+        r = client.post("/api/auth/login", json={"email": f"bench-{os.getpid()}-{n}@bench.local", "password": PASSWORD})
+        return {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+
+    # A freelancer bids once per project, so the bid scenarios get bidders with
+    # no bids and take every target project once: `rounds` single bids, then
+    # `rounds` batches of distinct projects, as large as the open projects allow
+    if len(open_projects) < 2 * rounds:
+        raise SystemExit(f"{len(open_projects)} open projects; the bid scenarios need at least {2 * rounds} for --rounds {rounds}")
+    bid_h, batch_h = new_freelancer(), new_freelancer()
+    bid_targets = take(open_projects[:rounds])
+    batch_size = min(50, (len(open_projects) - rounds) // rounds)
+    batch_targets = take(open_projects[i:i + batch_size] for i in range(rounds, rounds + rounds * batch_size, batch_size))
+
+    def stage(path, headers, json=None):
+        nxt = take(lifecycle)
+        def run():
+            pid, bid_id = nxt()
+            return client.post(path.format(pid=pid), json=json(bid_id) if json else {}, headers=headers)
+        return run
+
+    return [
+        ("POST /auth/register", lambda: register(next(counter))),
+        ("POST /auth/login", lambda: client.post("/api/auth/login", json={"email": f"user{freelancers[0]}@bench.local", "password": PASSWORD})),
+        ("GET /projects", lambda: client.get("/api/projects")),
+        ("GET /projects (cursor)", lambda: client.get(f"/api/projects?cursor={cursor}")),
+        ("GET /projects (skill)", lambda: client.get("/api/projects?skill=python,sql&match=all")),
+        ("GET /projects (revalidate)", lambda: client.get("/api/projects", headers={"If-None-Match": '"stale"'})),
+        ("GET /projects/search", lambda: client.get("/api/projects/search?q=synthetic%20proj")),
+        ("GET /recommendations", lambda: client.get("/api/recommendations", headers=freelancer_h)),
+        ("GET /project/<id>", lambda: client.get(f"/api/project/{open_projects[5]}")),
+        ("GET /user/<id> (freelancer)", lambda: client.get(f"/api/user/{freelancers[3]}")),
+        ("GET /user/<id> (client)", lambda: client.get(f"/api/user/{clients[3]}")),
+        ("GET /user/profile", lambda: client.get("/api/user/profile", headers=freelancer_h)),
+        ("PUT /user/profile", lambda: client.put("/api/user/profile", json={"skills": "python,go"}, headers=freelancer_h)),
+        ("GET /freelancers/top", lambda: client.get("/api/freelancers/top")),
+        ("GET /freelancers/top?skill=", lambda: client.get("/api/freelancers/top?skill=python")),
+        ("POST /rank_bids", lambda: client.post("/api/rank_bids", json={"project_id": open_projects[7], "priority": "price"})),
+        ("POST /rank_bids (uncached)", lambda: client.post("/api/rank_bids", json={"project_id": rng_choice(open_projects),
+                                                                                   "limit": next(counter) % 50 + 1})),
+        ("GET /rank_bids/cache_stats", lambda: client.get("/api/rank_bids/cache_stats", headers=METRICS_HEADERS)),
+        ("GET /metrics/db_pool", lambda: client.get("/api/metrics/db_pool", headers=METRICS_HEADERS)),
+        ("POST /projects", lambda: client.post("/api/projects", json=body, headers=client_h)),
+        ("POST /projects/batch (50)", lambda: client.post("/api/projects/batch", json=[body] * 50, headers=client_h)),
+        ("PUT /project/<id>", lambda: client.put(f"/api/project/{lifecycle[0][0]}", json={"budget": 500 + next(counter) % 100},
+                                                  headers=client_h)),
+        ("POST /project/<id>/bid", lambda: client.post(f"/api/project/{bid_targets()}/bid",
+                                                        json={"amount": 100, "proposal": "x"}, headers=bid_h)),
+        (f"POST /bids/batch ({batch_size})", lambda: client.post("/api/bids/batch", json=[
+            {"project_id": pid, "amount": 100, "proposal": "x"} for pid in batch_targets()], headers=batch_h)),
+        ("POST /project/<id>/accept_bid", stage("/api/project/{pid}/accept_bid", client_h, lambda bid_id: {"bid_id": bid_id})),
+        ("POST /project/<id>/complete", stage("/api/project/{pid}/complete", freelancer_h)),
+        ("POST /project/<id>/request_revision", stage("/api/project/{pid}/request_revision", client_h)),
+        ("POST /project/<id>/complete (resubmit)", stage("/api/project/{pid}/complete", freelancer_h)),
+        ("POST /project/<id>/accept", stage("/api/project/{pid}/accept", client_h)),
+        ("POST /project/<id>/review", stage("/api/project/{pid}/review", client_h, lambda bid_id: {"rating": 5})),
+    ]
+
+
+def end_to_end(client, clients, freelancers, open_projects, rounds, concurrency):
+    results = {}
+    for name, call in scenarios(client, clients, freelancers, open_projects, rounds):
+        def one(_):
+            start = time.perf_counter()
+            resp = call()
+            elapsed = (time.perf_counter() - start) * 1000
+            if not 200 <= resp.status_code < 300:  # an error's timing says nothing about the route
+                raise RuntimeError(f"{name} answered {resp.status_code}: {resp.data[:200].decode(errors='replace')}")
+            return elapsed, resp.status_code
+        start = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(concurrency) as pool:
+                outcomes = list(pool.map(one, range(rounds)))
+        else:
+            outcomes = [one(i) for i in range(rounds)]
+        wall = time.perf_counter() - start
+        stats = summarize([ms for ms, _ in outcomes])
+        stats["rps"] = round(rounds / wall, 1)
+        stats["status"] = {str(s): n for s, n in sorted(Counter(s for _, s in outcomes).items())}
+        results[name] = stats
+        print(f"{name:<42} p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms  {stats['rps']:>8.1f} req/s  {stats['status']}",
+              file=sys.stderr)
+    return results
+
+
+# --- comparison ---
+
+def compare(baseline, current, threshold, metric):
+    """Prints every shared result and returns the names that regressed by more than `threshold` percent."""
+    if baseline.get("meta", {}).get("scale") != current.get("meta", {}).get("scale"):
+        print("warning: runs used different data scales", file=sys.stderr)
+    regressions = []
+    print(f"{'result':<52} {'base ' + metric:>14} {'new ' + metric:>14} {'change':>8}")
+    for section in ("micro", "e2e"):
+        if section not in baseline or section not in current: continue  # skipped in one of the runs
+        base, new = baseline[section], current[section]
+        for name in [n for n in new if n in base]:
+            before, after = base[name][metric], new[name][metric]
+            change = (after / before - 1) * 100 if before else 0.0
+            flag = change > threshold
+            if flag: regressions.append(f"{section}/{name}")
+            print(f"{section + '/' + name:<52} {before:>14.3f} {after:>14.3f} {change:>+7.1f}%{'  REGRESSION' if flag else ''}")
+        for name in sorted(set(base) ^ set(new)):
+            print(f"{section + '/' + name:<52} {'only in ' + ('baseline' if name in base else 'new run'):>30}")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=20000)
+    parser.add_argument("--bids-per-project", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=200, help="requests per end-to-end scenario")
+    parser.add_argument("--repeat", type=int, default=50, help="calls per microbenchmark")
+    parser.add_argument("--concurrency", type=int, default=1, help="threads issuing end-to-end requests")
+    parser.add_argument("--url", help="benchmark a running server (e.g. gunicorn) instead of the Flask test client")
+    parser.add_argument("--sqlite", help="SQLite file to use (default: a temp file)")
+    add_database_args(parser)
+    parser.add_argument("--reuse", action="store_true", help="use the already seeded database instead of reseeding")
+    parser.add_argument("--skip", choices=("micro", "e2e"), action="append", default=[])
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--compare", nargs="+", metavar="RUN.json", help="baseline to compare against; with two files, compare them only")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent slowdown flagged as a regression")
+    parser.add_argument("--metric", default="p50_ms", choices=("p50_ms", "p95_ms", "mean_ms", "min_ms"))
+    args = parser.parse_args()
+    if args.sqlite and args.database_url:
+        parser.error("pass --sqlite or --database-url, not both")
+    if args.sqlite: args.database_url = "sqlite:///" + os.path.abspath(args.sqlite)
+    if args.reuse and not args.database_url:
+        parser.error("--reuse needs the seeded database's --sqlite or --database-url")
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and at most one other run")
+    if args.compare and len(args.compare) == 2:
+        runs = [json.load(open(path)) for path in args.compare]
+        sys.exit(1 if compare(*runs, args.threshold, args.metric) else 0)
+
+    from sqlalchemy import text
+    from app import create_app, db
+    from app.models import User, Project
+    from config import Config
+
+    class SuiteConfig(Config):
+        METRICS_TOKEN = METRICS_TOKEN
+        SQLALCHEMY_DATABASE_URI = args.database_url if args.reuse else scratch_database_url(parser, args, "suite")
+
+    app = create_app(SuiteConfig)
+    with app.app_context():
+        if not args.reuse:
+            db.drop_all()
+            db.create_all()
+            seed(db, args.users, args.projects, args.bids_per_project)
+            with db.engine.begin() as conn:
+                conn.execute(text("ANALYZE"))
+        clients = db.session.scalars(db.select(User.id).where(User.email.like("%@bench.local"), ~User.is_freelancer).order_by(User.id)).all()
+        freelancers = db.session.scalars(db.select(User.id).where(User.email.like("user%@bench.local"), User.is_freelancer).order_by(User.id)).all()
+        open_projects = db.session.scalars(db.select(Project.id).where(Project.status == "open").order_by(Project.id)).all()
+        scale = {"users": len(clients) + len(freelancers), "projects": db.session.scalar(db.select(db.func.count(Project.id))),
+                 "dialect": db.engine.dialect.name}
+        db.session.remove()
+
+    run = {"meta": {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "revision": git_revision(),
+                    "python": platform.python_version(), "platform": platform.platform(), "target": args.url or "test-client",
+                    "rounds": args.rounds, "repeat": args.repeat, "concurrency": args.concurrency, "scale": scale}}
+    if "micro" not in args.skip:
+        run["micro"] = micro_benchmarks(app, args.repeat)
+    if "e2e" not in args.skip:
+        client = HttpClient(args.url) if args.url else app.test_client()
+        run["e2e"] = end_to_end(client, clients, freelancers, open_projects, args.rounds, args.concurrency)
+
+    document = json.dumps(run, indent=2)
+    if args.output:
+        with open(args.output, "w") as f: f.write(document + "\n")
+    else:
+        print(document)
+    if args.compare:
+        with open(args.compare[0]) as f: baseline = json.load(f)
+        sys.exit(1 if compare(baseline, run, args.threshold, args.metric) else 0)
+
+
+if __name__ == "__main__":
+    main()
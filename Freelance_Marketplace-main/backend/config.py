@@ -22,4 +22,82 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get('SECRET_KEY') or "dev_secret_key_1234567890!@#$"
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or "dev_jwt_secret_key_0987654321!@#$"
-    
\ No newline at end of file
+
+    # Create/upgrade the schema in create_app. Turn off in production and run
+    # `flask upgrade-db` as a release step instead (see gunicorn.conf.py)
+    DB_AUTO_UPGRADE = os.environ.get('DB_AUTO_UPGRADE', 'true').lower() in ('1', 'true', 'yes')
+
+    # Serving mode, read by gunicorn.conf.py and create_app: "gthread" (the
+    # default; SERVER_THREADS requests per worker), "gevent" (greenlets, up to
+    # SERVER_CONNECTIONS per worker; needs the optional gevent package, best for
+    # many event streams) or "sync" (opt-in; a worker serves one request at a
+    # time, so it serves no event streams). A request that queries holds a DB
+    # connection (event streams hold none), so DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # caps how many of them run at once; waits show in /api/metrics/db_pool.
+    SERVER_MODE = os.environ.get('SERVER_MODE', 'gthread')
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 16))
+    SERVER_CONNECTIONS = int(os.environ.get('SERVER_CONNECTIONS', 1000))
+
+    # Auth (app/auth.py): access tokens carry role/version claims, checked
+    # against a per-process identity cache; password checks are capped per
+    # process. PASSWORD_HASH_METHOD is werkzeug's method spec; logins rehash
+    # passwords stored with any other method.
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 10000))
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 60))  # seconds another worker may still accept a revoked token
+    LOGIN_HASH_CONCURRENCY = int(os.environ.get('LOGIN_HASH_CONCURRENCY', 2))
+    LOGIN_HASH_WAIT = float(os.environ.get('LOGIN_HASH_WAIT', 5.0))  # then 429
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+
+    # Ranking cache: bounded per-process LRU, plus an optional shared tier
+    # ("local" for the in-memory stand-in, or a redis:// URL)
+    RANKING_CACHE_SIZE = int(os.environ.get('RANKING_CACHE_SIZE', 1024))
+    RANKING_CACHE_TTL = int(os.environ.get('RANKING_CACHE_TTL', 3600))
+    RANKING_CACHE_URL = os.environ.get('RANKING_CACHE_URL')
+
+    # Server-sent events (app/events.py): /api/project/<id>/events, /api/user/events.
+    # EVENTS_URL unset = delivered within this process only; a redis:// URL
+    # shares them across workers and nodes
+    EVENTS_URL = os.environ.get('EVENTS_URL')
+    EVENTS_BUFFER = int(os.environ.get('EVENTS_BUFFER', 100))  # recent events kept per channel for Last-Event-ID
+    EVENTS_RETENTION = int(os.environ.get('EVENTS_RETENTION', 300))  # seconds
+    EVENTS_HEARTBEAT = int(os.environ.get('EVENTS_HEARTBEAT', 15))  # seconds
+    EVENTS_MAX_STREAM = int(os.environ.get('EVENTS_MAX_STREAM', 300))  # seconds, then the browser reconnects
+    EVENTS_STREAM_MAXLEN = int(os.environ.get('EVENTS_STREAM_MAXLEN', 10000))  # redis stream cap
+    # Open streams per process, then 204; unset = 0 under sync, SERVER_THREADS // 2 under gthread, no cap under gevent
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ['EVENTS_MAX_SUBSCRIBERS']) if os.environ.get('EVENTS_MAX_SUBSCRIBERS') else None
+
+    # External profile imports run as background jobs
+    IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', 2))
+    IMPORT_MAX_ATTEMPTS = int(os.environ.get('IMPORT_MAX_ATTEMPTS', 3))
+    IMPORT_RETRY_BACKOFF = float(os.environ.get('IMPORT_RETRY_BACKOFF', 2.0))
+    IMPORT_LEASE = int(os.environ.get('IMPORT_LEASE', 300))  # seconds before a 'running' job of a dead worker is retried
+    FREELANCER_PROFILE_URL = os.environ.get('FREELANCER_PROFILE_URL', "https://www.freelancer.com/u/{username}")
+
+    # Hot read endpoints encode with orjson when it is installed ("stdlib" to turn off)
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+
+    # Batch write endpoints (/api/projects/batch, /api/bids/batch) and import-data
+    BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', 5000))  # per HTTP request
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 500))  # rows per transaction
+
+    # Engine / connection pool (see app/db_pool.py). DB_POOL=null opens a
+    # connection per checkout, for running behind PgBouncer.
+    DB_POOL = os.environ.get('DB_POOL', 'queue')
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # whole seconds (engine_from_config coerces to int)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))  # Postgres only; 0 = no limit
+
+    # Request instrumentation, off by default (app/instrumentation.py): Prometheus
+    # text at /metrics, slow-query log, Server-Timing, header-triggered profiles
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 250))
+    PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')  # "X-Profile: <token>" profiles that request; unset = off
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 1.0))
+    PROFILER = os.environ.get('PROFILER', 'cprofile')  # or "pyinstrument" (optional package)
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')  # default: <instance>/profiles
+    # Per-process stats at /metrics, /api/metrics/* and /api/rank_bids/cache_stats,
+    # for "X-Metrics-Token: <token>" requests only; unset = those routes 404
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
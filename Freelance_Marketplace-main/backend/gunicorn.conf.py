@@ -0,0 +1,31 @@
+# gunicorn.conf.py -- read automatically when gunicorn starts in this directory:
+#
+#     DB_AUTO_UPGRADE=false gunicorn "app:create_app()"
+#     SERVER_MODE=gevent DB_AUTO_UPGRADE=false gunicorn "app:create_app()"
+#     SERVER_MODE=sync DB_AUTO_UPGRADE=false gunicorn "app:create_app()"   # opt-in: one request per worker
+#
+# gunicorn itself reads WEB_CONCURRENCY (workers) and PORT (bind).
+import os
+
+from config import Config
+
+# SERVER_MODE (config.py, default gthread) picks the worker type. "gthread"
+# and "gevent" keep serving while requests wait on the database, outbound HTTP
+# or an event stream (app/events.py); "sync" serves one request per worker.
+worker_class = {"sync": "sync", "gthread": "gthread", "gevent": "gevent"}[Config.SERVER_MODE]
+threads = Config.SERVER_THREADS
+worker_connections = Config.SERVER_CONNECTIONS
+
+# Build the app once in the master and fork the workers from it: imports and
+# app setup run once, and the workers share those pages copy-on-write.
+# Connections the master opened are dropped in each child (app/db_pool.py).
+# Not by default under gevent: its worker patches the stdlib (sockets, locks,
+# threads) as it starts, and the app must be imported after that.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "false" if Config.SERVER_MODE == "gevent" else "true").lower() in ("1", "true", "yes")
+
+
+def post_worker_init(worker):
+    # Import jobs left queued or running by a previous worker (app/jobs.py)
+    from app.jobs import import_queue
+    if import_queue.app is not None:
+        import_queue.resume()